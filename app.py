@@ -1,58 +1,61 @@
+import time
+
+_script_started = time.perf_counter()
+
+# 🚀 OPTIMASI: Catat durasi import library inti untuk laporan startup
+_startup_imports = {}
+_t_import = time.perf_counter()
 import streamlit as st
+_startup_imports['streamlit'] = time.perf_counter() - _t_import
+_t_import = time.perf_counter()
 from streamlit_gsheets import GSheetsConnection
+_startup_imports['streamlit_gsheets'] = time.perf_counter() - _t_import
+_t_import = time.perf_counter()
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+_startup_imports['pandas'] = time.perf_counter() - _t_import
+# plotly, fpdf, dan openpyxl TIDAK di-import di sini, lihat bento_core.lazy
+
 from datetime import datetime, timedelta
-from fpdf import FPDF
 import calendar
-from functools import lru_cache
-import hashlib
-import time
-from io import BytesIO
-
-# ============================================================
-# 🚀 RETRY LOGIC UNTUK GOOGLE SHEETS CONNECTION
-# ============================================================
-def retry_gsheet_operation(func, max_retries=3, delay=2):
-    """Retry operation jika ada connection error"""
-    for attempt in range(max_retries):
-        try:
-            return func()
-        except Exception as e:
-            error_msg = str(e).lower()
-            # Check jika error adalah connection issue
-            if any(keyword in error_msg for keyword in ['connection', 'timeout', 'remote', 'aborted']):
-                if attempt < max_retries - 1:
-                    wait_time = delay * (attempt + 1)  # Exponential backoff
-                    st.warning(f"⚠️ Koneksi terputus, mencoba lagi dalam {wait_time} detik... (Percobaan {attempt + 2}/{max_retries})")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    st.error(f"❌ Gagal setelah {max_retries} percobaan. Silakan refresh halaman dan coba lagi.")
-                    raise
-            else:
-                # Error lain, langsung raise
-                raise
-    return None
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# 🚀 Engine ledger tanpa UI: storage, CRUD, query, laporan (lihat folder bento_core/)
+from bento_core import (
+    KATEGORI_PEMASUKAN, KATEGORI_PENGELUARAN, METODE_PEMBAYARAN,
+    IMPORT_TIMINGS, lazy_import, SheetStorage, ResilientStorage, Ledger,
+    filter_data_efficient, sort_by_latest_record, search_transactions_optimized,
+    filter_by_date_range, TABLE_PAGE_SIZE, paginate_dataframe,
+    INCOME_INDEX_COLUMNS, build_income_index, slice_by_date, summarize_selection,
+    create_sankey_diagram, create_budget_vs_actual_chart, create_calendar_heatmap, build_daily_spend,
+    IMPORT_SOURCES, read_statement_file, parse_statement,
+    DUPLICATE_WINDOW_DAYS, build_duplicate_index, find_possible_duplicates, find_duplicate_clusters,
+    export_to_excel, STREAMING_EXPORT_THRESHOLD, export_to_excel_streaming, create_statement_pdf,
+    REPORT_CACHE_MAX_BYTES, ArtifactStore, ReportJobRunner, Profiler, FileArchive, ARCHIVE_KEEP_MONTHS,
+    STORAGE_METRICS, serve_metrics, new_operation_key, derive_operation_key, reconcile_wallet,
+    COMPARISON_MODES, monthly_pivot, period_months, compare_periods, rolling_averages, year_month_grid,
+    TRANSFER_MASK_COLUMN, TARGET_LINK_COLUMN, TARGET_RATE_DAYS,
+)
+from bento_core import profiling
+
+# Import inti hanya "dingin" di run pertama, run berikutnya tidak menimpa
+for _name, _seconds in _startup_imports.items():
+    IMPORT_TIMINGS.setdefault(_name, _seconds)
 
 # ============================================================
 # 🚀 OPTIMASI #1: SESSION STATE CACHING UNTUK DATA
 # ============================================================
-# Dengan caching ini, data hanya di-load 1x per session
+# Dengan caching ini, data hanya di-load 1x per session (disimpan di Ledger milik session)
 # CRUD selanjutnya menggunakan cache lokal, hanya sync ke GSheets saat perlu
 
 def init_session_state():
     """Initialize session state untuk cache data"""
-    if 'data_cache' not in st.session_state:
-        st.session_state.data_cache = {
-            'transaksi': None,
-            'dompet': None,
-            'target': None,
-            'recurring': None,
-            'last_update': None,
-            'needs_refresh': True
-        }
+    if 'ledger' not in st.session_state:
+        archive_dir = os.environ.get("BENTO_ARCHIVE_DIR")  # Kosong: arsip di worksheet 'Arsip <tahun>'
+        st.session_state.ledger = Ledger(get_sheet_storage(), FileArchive(archive_dir) if archive_dir else None)
+    if 'report_runner' not in st.session_state:
+        st.session_state.report_runner = ReportJobRunner(get_report_executor(), ArtifactStore(REPORT_CACHE_MAX_BYTES))
     if 'reset_key' not in st.session_state:
         st.session_state.reset_key = 0
     if 'filter_mode' not in st.session_state:
@@ -65,16 +68,6 @@ def init_session_state():
 
 # 1. KONFIGURASI HALAMAN
 st.set_page_config(page_title="Budget Bento Pro v15 Professional", page_icon="🍱", layout="wide")
-
-# --- KONFIGURASI KATEGORI ---
-KATEGORI_PEMASUKAN = ["Gaji", "Bonus", "Hadiah", "Pembayaran", "Penjualan", "Lainnya"]
-KATEGORI_PENGELUARAN = ["Makan", "Jajan", "Belanja", "Hiburan", "Transport", "Kesehatan", "Tagihan", "Amal", "Saving", "Lainnya"]
-KATEGORI_TRANSFER = "Transfer Internal"
-if KATEGORI_TRANSFER not in KATEGORI_PEMASUKAN:
-    KATEGORI_PEMASUKAN.append(KATEGORI_TRANSFER)
-if KATEGORI_TRANSFER not in KATEGORI_PENGELUARAN:
-    KATEGORI_PENGELUARAN.append(KATEGORI_TRANSFER)
-METODE_PEMBAYARAN = ["Cash", "Livin (Mandiri)", "Octo (CIMB)", "DANA", "Shopeepay", "Kartu Kredit"]
 # START_DATE_MONITORING sudah tidak dipakai lagi, diganti dengan Tanggal Reset per Wallet
 
 # 2. CUSTOM CSS (unchanged)
@@ -144,442 +137,226 @@ st.markdown("""
 # 3. KONEKSI DATA
 conn = st.connection("gsheets", type=GSheetsConnection)
 
+# ============================================================
+# 🚀 BACKGROUND REPORT JOBS
+# ============================================================
+# Export Excel & e-statement dikerjakan di thread pool agar UI tidak freeze.
+# Hasil disimpan per (jenis laporan, range, versi data) sehingga klik ulang langsung download.
+
+REPORT_JOB_WORKERS = 2
+
+@st.cache_resource
+def get_report_executor():
+    """Thread pool bersama untuk semua job laporan"""
+    return ThreadPoolExecutor(max_workers=REPORT_JOB_WORKERS, thread_name_prefix="bento-report")
+
+# ============================================================
+# 📈 STORAGE METRICS EXPORTER (format Prometheus)
+# ============================================================
+# BENTO_METRICS_FILE: tulis metrik ke file (mis. untuk textfile collector node_exporter)
+# BENTO_METRICS_PORT: serve metrik di http://127.0.0.1:<port>/metrics
+
+METRICS_FILE = os.environ.get("BENTO_METRICS_FILE")
+METRICS_PORT = os.environ.get("BENTO_METRICS_PORT")
+
+@st.cache_resource
+def start_metrics_exporter():
+    """Aktifkan exporter metrik storage 1x per proses server"""
+    if METRICS_FILE:
+        STORAGE_METRICS.start_textfile_writer(METRICS_FILE)
+    if METRICS_PORT:
+        return serve_metrics(STORAGE_METRICS, int(METRICS_PORT))
+    return None
+
+start_metrics_exporter()
+
+# ============================================================
+# 🚀 RATE LIMITER + CIRCUIT BREAKER GOOGLE SHEETS
+# ============================================================
+# 1 storage bersama per proses: kuota, breaker, dan antrian write dipakai semua session.
+# Retry dikerjakan thread background (lihat bento_core.resilience), UI tidak ikut menunggu.
+
+@st.cache_resource
+def get_sheet_storage():
+    """Storage Google Sheets bersama untuk semua session"""
+    return ResilientStorage(SheetStorage(conn, metrics=STORAGE_METRICS), metrics=STORAGE_METRICS)
+
 init_session_state()
 
-def load_data_from_sheets():
-    """Load data dari Google Sheets - cache dikelola di session state"""
-    try:
-        transaksi = conn.read(worksheet="Transaksi", ttl=0)
-        dompet = conn.read(worksheet="Dompet", ttl=0)
-        
-        try:
-            target = conn.read(worksheet="Target", ttl=0)
-            if target.empty:
-                target = pd.DataFrame(columns=['Nama Impian', 'Target Harga', 'Dana Terkumpul'])
-            else:
-                target['Nama Impian'] = target['Nama Impian'].fillna("").astype(str)
-                target['Target Harga'] = pd.to_numeric(target['Target Harga'], errors='coerce').fillna(0)
-                target['Dana Terkumpul'] = pd.to_numeric(target['Dana Terkumpul'], errors='coerce').fillna(0)
-        except:
-            target = pd.DataFrame(columns=['Nama Impian', 'Target Harga', 'Dana Terkumpul'])
-            target['Nama Impian'] = target['Nama Impian'].astype(str)
-        
-        # 🚀 NEW: Load Recurring Transactions
-        try:
-            recurring = conn.read(worksheet="Recurring", ttl=0)
-            if recurring.empty:
-                recurring = pd.DataFrame(columns=['Nama Item', 'Kategori', 'Nominal', 'Tipe', 'Metode Pembayaran', 'Frekuensi', 'Tanggal Mulai', 'Status'])
-            else:
-                recurring['Nominal'] = pd.to_numeric(recurring['Nominal'], errors='coerce').fillna(0)
-                recurring['Tanggal Mulai'] = pd.to_datetime(recurring['Tanggal Mulai'], errors='coerce')
-        except:
-            recurring = pd.DataFrame(columns=['Nama Item', 'Kategori', 'Nominal', 'Tipe', 'Metode Pembayaran', 'Frekuensi', 'Tanggal Mulai', 'Status'])
-        
-        # 🚀 OPTIMASI: Prepare data types sekali saja
-        if not transaksi.empty:
-            transaksi['Tanggal'] = pd.to_datetime(transaksi['Tanggal'], errors='coerce')
-            transaksi['Nominal'] = pd.to_numeric(transaksi['Nominal'], errors='coerce').fillna(0)
-            # 🚀 OPTIMASI: Pre-compute month dan year untuk filtering cepat
-            transaksi['Month'] = transaksi['Tanggal'].dt.month_name()
-            transaksi['Year'] = transaksi['Tanggal'].dt.year
-        
-        if not dompet.empty:
-            dompet['Saldo Awal'] = pd.to_numeric(dompet['Saldo Awal'], errors='coerce').fillna(0)
-            # 🚀 PERBAIKAN: Tambah kolom Tanggal Reset jika belum ada
-            if 'Tanggal Reset' not in dompet.columns:
-                dompet['Tanggal Reset'] = datetime.today().strftime('%Y-%m-%d')
-            # Parse Tanggal Reset
-            dompet['Tanggal Reset'] = pd.to_datetime(dompet['Tanggal Reset'], errors='coerce')
-            # Jika ada yang NaT, set ke hari ini
-            dompet['Tanggal Reset'] = dompet['Tanggal Reset'].fillna(pd.Timestamp.today())
-            
-        return transaksi, dompet, target, recurring
-    except Exception as e:
-        st.error(f"Error loading data: {e}")
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+def get_ledger():
+    """Ledger engine milik session ini"""
+    return st.session_state.ledger
+
+def show_load_errors():
+    """Tampilkan error load tabel yang dicatat ledger"""
+    ledger = get_ledger()
+    while ledger.load_errors:
+        st.error(ledger.load_errors.pop(0))
+
+def invalidate_cache():
+    """Tandai semua tabel perlu di-load ulang (dilakukan lazy saat tabel diminta)"""
+    get_ledger().invalidate()
+
+def get_table(name, force_refresh=False):
+    """Get 1 tabel dari cache, load dari Sheets hanya jika belum ada / perlu refresh"""
+    table = get_ledger().table(name, force_refresh=force_refresh)
+    show_load_errors()
+    return table
 
 def get_cached_data(force_refresh=False):
-    """Get data dari cache atau load baru jika perlu"""
-    if force_refresh or st.session_state.data_cache['needs_refresh']:
-        df, df_wallet, df_target, df_recurring = load_data_from_sheets()
-        st.session_state.data_cache['transaksi'] = df
-        st.session_state.data_cache['dompet'] = df_wallet
-        st.session_state.data_cache['target'] = df_target
-        st.session_state.data_cache['recurring'] = df_recurring
-        st.session_state.data_cache['last_update'] = datetime.now()
-        st.session_state.data_cache['needs_refresh'] = False
-    
-    return (
-        st.session_state.data_cache['transaksi'],
-        st.session_state.data_cache['dompet'],
-        st.session_state.data_cache['target'],
-        st.session_state.data_cache['recurring']
-    )
+    """Get semua tabel dari cache atau load baru jika perlu"""
+    if force_refresh:
+        invalidate_cache()
+    return tuple(get_table(name) for name in ('transaksi', 'dompet', 'target', 'recurring'))
+
+def update_cache(table, value):
+    """Simpan tabel ke cache session dan naikkan versi data"""
+    get_ledger().set_table(table, value)
+
+def get_data_version():
+    """Versi data saat ini, berubah setiap ada perubahan cache"""
+    return get_ledger().version
 
 # ============================================================
 # 🚀 OPTIMASI #3: EFFICIENT CRUD OPERATIONS
 # ============================================================
+# Logic CRUD ada di bento_core.Ledger, nama lama dipertahankan untuk screen di bawah
 
-def add_transaction_optimized(new_data_dict):
-    """Add transaction dengan operasi yang dioptimasi"""
-    try:
-        # Gunakan cache lokal, jangan fetch dari sheets lagi
-        df = st.session_state.data_cache['transaksi'].copy()
-        
-        # 🚀 OPTIMASI: Gunakan DataFrame.loc untuk append, lebih cepat dari concat
-        new_row = pd.DataFrame([new_data_dict])
-        
-        # Prepare new row data types
-        new_row['Tanggal'] = pd.to_datetime(new_row['Tanggal'])
-        new_row['Nominal'] = pd.to_numeric(new_row['Nominal'])
-        new_row['Month'] = new_row['Tanggal'].dt.month_name()
-        new_row['Year'] = new_row['Tanggal'].dt.year
-        
-        # Efficient append
-        df = pd.concat([df, new_row], ignore_index=True)
-        
-        # Update cache lokal dulu
-        st.session_state.data_cache['transaksi'] = df
-        
-        # Prepare untuk sync ke Google Sheets (hapus computed columns)
-        df_to_save = df.drop(columns=['Month', 'Year'], errors='ignore').copy()
-        df_to_save['Tanggal'] = pd.to_datetime(df_to_save['Tanggal']).dt.strftime('%Y-%m-%d')
-        
-        # Sync ke Google Sheets dengan retry logic
-        def update_operation():
-            return conn.update(worksheet="Transaksi", data=df_to_save)
-        
-        retry_gsheet_operation(update_operation, max_retries=3, delay=1)
-        
-        return True, "Data berhasil disimpan!"
-    except Exception as e:
-        return False, f"Error: {e}"
-
-def update_transactions_batch(updated_df, month_filter, year_filter):
-    """Update multiple transactions sekaligus (batch operation)"""
-    try:
-        # Get full data dari cache
-        orig = st.session_state.data_cache['transaksi'].copy()
-        
-        # Filter rows yang tidak diubah
-        mask = (orig['Month'] == month_filter) & (orig['Year'] == year_filter)
-        orig_kept = orig[~mask].copy()
-        
-        # Prepare updated data
-        updated_clean = updated_df.copy()
-        updated_clean['Tanggal'] = pd.to_datetime(updated_clean['Tanggal'])
-        updated_clean['Month'] = updated_clean['Tanggal'].dt.month_name()
-        updated_clean['Year'] = updated_clean['Tanggal'].dt.year
-        
-        # Combine
-        final_df = pd.concat([orig_kept, updated_clean], ignore_index=True)
-        
-        # Update cache
-        st.session_state.data_cache['transaksi'] = final_df
-        
-        # Sync ke Google Sheets dengan retry logic
-        df_to_save = final_df.drop(columns=['Month', 'Year'], errors='ignore').copy()
-        df_to_save['Tanggal'] = pd.to_datetime(df_to_save['Tanggal']).dt.strftime('%Y-%m-%d')
-        
-        def update_operation():
-            return conn.update(worksheet="Transaksi", data=df_to_save)
-        
-        retry_gsheet_operation(update_operation, max_retries=3, delay=1)
-        
-        return True, "Batch update berhasil!"
-    except Exception as e:
-        return False, f"Error: {e}"
-
-def add_internal_transfer_optimized(transfer_date, nominal, source_wallet, target_wallet, note=""):
-    """Catat top up antar wallet sebagai 2 transaksi agar saldo sumber/tujuan otomatis terhitung."""
-    try:
-        if nominal <= 0:
-            return False, "Nominal transfer harus lebih dari 0."
-        if source_wallet == target_wallet:
-            return False, "Wallet sumber dan tujuan harus berbeda."
-
-        df = st.session_state.data_cache['transaksi'].copy()
-        base_note = note.strip() if note else "Transfer antar dompet"
-
-        transfer_rows = pd.DataFrame([
-            {
-                "Tanggal": pd.to_datetime(transfer_date).strftime("%Y-%m-%d"),
-                "Item": f"Top Up ke {target_wallet}",
-                "Kategori": KATEGORI_TRANSFER,
-                "Nominal": nominal,
-                "Tipe": "Pengeluaran",
-                "Status": "Lunas",
-                "Keterangan": f"{base_note} | Dari {source_wallet} ke {target_wallet}",
-                "Metode Pembayaran": source_wallet
-            },
-            {
-                "Tanggal": pd.to_datetime(transfer_date).strftime("%Y-%m-%d"),
-                "Item": f"Top Up dari {source_wallet}",
-                "Kategori": KATEGORI_TRANSFER,
-                "Nominal": nominal,
-                "Tipe": "Pemasukan",
-                "Status": "Lunas",
-                "Keterangan": f"{base_note} | Dari {source_wallet} ke {target_wallet}",
-                "Metode Pembayaran": target_wallet
-            }
-        ])
-
-        transfer_rows['Tanggal'] = pd.to_datetime(transfer_rows['Tanggal'])
-        transfer_rows['Nominal'] = pd.to_numeric(transfer_rows['Nominal'], errors='coerce').fillna(0)
-        transfer_rows['Month'] = transfer_rows['Tanggal'].dt.month_name()
-        transfer_rows['Year'] = transfer_rows['Tanggal'].dt.year
-
-        final_df = pd.concat([df, transfer_rows], ignore_index=True)
-        st.session_state.data_cache['transaksi'] = final_df
-
-        df_to_save = final_df.drop(columns=['Month', 'Year'], errors='ignore').copy()
-        df_to_save['Tanggal'] = pd.to_datetime(df_to_save['Tanggal']).dt.strftime('%Y-%m-%d')
-
-        def update_operation():
-            return conn.update(worksheet="Transaksi", data=df_to_save)
-
-        retry_gsheet_operation(update_operation, max_retries=3, delay=1)
-        return True, f"Top up Rp {nominal:,.0f} dari {source_wallet} ke {target_wallet} berhasil!"
-    except Exception as e:
-        return False, f"Error: {e}"
+# 🚀 NEW: Op key per form agar klik ganda / submit ulang setelah timeout tidak tercatat dobel.
+# Nonce form bertahan sampai simpan berhasil, jadi isi yang sama -> key yang sama.
+
+def operation_key(form_name, payload):
+    """Op key untuk submit form ini (nonce session + isi payload)"""
+    nonce = st.session_state.setdefault(f"op_nonce_{form_name}", new_operation_key())
+    return derive_operation_key(nonce, payload)
+
+def reset_operation_key(form_name):
+    """Panggil setelah simpan berhasil: submit berikutnya adalah operasi baru"""
+    st.session_state.pop(f"op_nonce_{form_name}", None)
+
+def add_transaction_optimized(new_data_dict, op_key=None):
+    return get_ledger().add_transaction(new_data_dict, op_key=op_key)
+
+def update_transactions_batch(updated_df, month_filter, year_filter, op_key=None):
+    return get_ledger().update_transactions_batch(updated_df, month_filter, year_filter, op_key=op_key)
+
+def update_transactions_by_id(original_ids, edited_df, op_key=None):
+    return get_ledger().update_transactions_by_id(original_ids, edited_df, op_key=op_key)
+
+def add_internal_transfer_optimized(transfer_date, nominal, source_wallet, target_wallet, note="", op_key=None):
+    return get_ledger().add_internal_transfer(transfer_date, nominal, source_wallet, target_wallet, note, op_key=op_key)
+
+def add_transactions_bulk(new_rows, op_key=None):
+    return get_ledger().add_transactions_bulk(new_rows, op_key=op_key)
+
+def get_duplicate_index(df):
+    """Index duplikat di-cache per versi data"""
+    return get_ledger().derived('duplicate_index', lambda: build_duplicate_index(df))
 
 # ============================================================
-# 🚀 OPTIMASI #4: EFFICIENT FILTERING WITH INDEXING
+# 🚀 OPTIMASI #4: PAGINATION WIDGET
 # ============================================================
 
-@lru_cache(maxsize=128)
-def get_month_year_filter(month_name, year_val):
-    """Cache filter results untuk kombinasi month+year yang sama"""
-    return (month_name, year_val)
-
-def filter_data_efficient(df, month, year):
-    """Filter data dengan operasi yang lebih cepat"""
-    if df.empty:
-        return df
-    
-    # 🚀 OPTIMASI: Gunakan boolean indexing langsung, sudah pre-computed
-    mask = (df['Month'] == month) & (df['Year'] == year)
-    return df.loc[mask].copy()
-
-def sort_by_latest_record(df):
-    """Urutkan transaksi berdasarkan nomor pencatatan terbaru (record terbaru di atas)."""
-    if df.empty:
-        return df
-
-    result = df.copy()
-
-    # Prioritaskan kolom ID jika tersedia dan numerik.
-    if 'ID' in result.columns:
-        id_numeric = pd.to_numeric(result['ID'], errors='coerce')
-        if id_numeric.notna().any():
-            result['_sort_record_id'] = id_numeric
-            result = result.sort_values('_sort_record_id', ascending=False, kind='stable')
-            return result.drop(columns=['_sort_record_id'])
-
-    # Fallback ke urutan baris asli (baris terakhir dianggap pencatatan terbaru).
-    result['_sort_record_idx'] = result.index
-    result = result.sort_values('_sort_record_idx', ascending=False, kind='stable')
-    return result.drop(columns=['_sort_record_idx'])
-
-def search_transactions_optimized(df, keyword="", tipe_filter=None, kategori_filter=None):
-    """Search dengan optimasi untuk performa lebih baik"""
-    if df.empty:
-        return df
-    
-    result = df.copy()
-    
-    # 🚀 OPTIMASI: Apply filters secara berurutan, bukan create multiple masks
-    if keyword:
-        # Gunakan vectorized string operations
-        mask = result['Item'].str.contains(keyword, case=False, na=False) | \
-               result['Keterangan'].str.contains(keyword, case=False, na=False)
-        result = result[mask]
-    
-    if tipe_filter:
-        result = result[result['Tipe'].isin(tipe_filter)]
-    
-    if kategori_filter:
-        result = result[result['Kategori'].isin(kategori_filter)]
-    
-    return result
+def pagination_controls(total_rows, key, sort_options, page_size=TABLE_PAGE_SIZE):
+    """Widget sorting + nomor halaman. Return (page, sort_by, ascending)"""
+    total_pages = max(math.ceil(total_rows / page_size), 1)
+    page_key = f"{key}_page"
+    # Jaga agar nomor halaman tetap valid saat jumlah data berubah
+    if st.session_state.get(page_key, 1) > total_pages:
+        st.session_state[page_key] = total_pages
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    with c1:
+        sort_label = st.selectbox("Urutkan", list(sort_options.keys()), key=f"{key}_sort")
+    with c2:
+        ascending = st.toggle("Urutan Naik", value=False, key=f"{key}_asc")
+    with c3:
+        page = st.number_input("Halaman", min_value=1, max_value=total_pages, step=1, key=page_key)
+    st.caption(f"Halaman {page} dari {total_pages} • {total_rows:,} transaksi • {page_size} per halaman")
+    return page, sort_options[sort_label], ascending
 
 # ============================================================
-# 🚀 PHASE 1: PROFESSIONAL FEATURES
+# 🚀 REPORT JOB UI
 # ============================================================
 
-def filter_by_date_range(df, start_date, end_date):
-    """Filter data berdasarkan custom date range"""
-    if df.empty:
-        return df
-    mask = (df['Tanggal'] >= pd.Timestamp(start_date)) & (df['Tanggal'] <= pd.Timestamp(end_date))
-    return df.loc[mask].copy()
-
-def create_sankey_diagram(df_filtered):
-    """Buat Sankey diagram untuk Cash Flow visualization"""
-    if df_filtered.empty:
-        return None
-    
-    # Prepare data untuk Sankey
-    # Source: Kategori Pemasukan -> Target: Kategori Pengeluaran
-    income_data = df_filtered[df_filtered['Tipe'] == 'Pemasukan'].groupby('Kategori')['Nominal'].sum()
-    expense_data = df_filtered[df_filtered['Tipe'] == 'Pengeluaran'].groupby('Kategori')['Nominal'].sum()
-    
-    if income_data.empty or expense_data.empty:
-        return None
-    
-    # Build nodes
-    source_nodes = list(income_data.index)
-    target_nodes = list(expense_data.index)
-    all_nodes = source_nodes + ["💰 Total Pemasukan"] + target_nodes
-    
-    # Build links
-    sources = []
-    targets = []
-    values = []
-    colors = []
-    
-    # Pemasukan -> Total
-    for i, cat in enumerate(source_nodes):
-        sources.append(i)
-        targets.append(len(source_nodes))
-        values.append(income_data[cat])
-        colors.append('rgba(16, 185, 129, 0.4)')
-    
-    # Total -> Pengeluaran
-    total_income = income_data.sum()
-    total_expense = expense_data.sum()
-    proportion = total_expense / total_income if total_income > 0 else 0
-    
-    for i, cat in enumerate(target_nodes):
-        sources.append(len(source_nodes))
-        targets.append(len(source_nodes) + 1 + i)
-        values.append(expense_data[cat])
-        colors.append('rgba(239, 68, 68, 0.4)')
-    
-    # Create Sankey
-    fig = go.Figure(data=[go.Sankey(
-        node=dict(
-            pad=15,
-            thickness=20,
-            line=dict(color="black", width=0.5),
-            label=all_nodes,
-            color=['#10B981'] * len(source_nodes) + ['#3B82F6'] + ['#EF4444'] * len(target_nodes)
-        ),
-        link=dict(
-            source=sources,
-            target=targets,
-            value=values,
-            color=colors
+def get_report_runner():
+    return st.session_state.report_runner
+
+def get_cached_report(key):
+    """Ambil file laporan yang sudah pernah di-generate (None jika belum ada)"""
+    return get_report_runner().store.get(key)
+
+def submit_report_job(key, func, *args, **kwargs):
+    """Jalankan func di background. func harus menerima progress_callback dan tidak memanggil st.*"""
+    get_report_runner().submit(key, func, *args, **kwargs)
+
+def poll_report_job(key):
+    """Cek status job: 'done', 'running', 'error', atau None jika tidak ada job"""
+    return get_report_runner().poll(key)
+
+@st.fragment(run_every=1)
+def report_job_progress(key, label):
+    """Progress bar job laporan, polling tiap detik tanpa rerun seluruh halaman"""
+    status = poll_report_job(key)
+    if status == 'running':
+        job = get_report_runner().jobs[key]
+        fraction = job['done'] / job['total'] if job['total'] else 0.0
+        elapsed = time.perf_counter() - job['started']
+        st.progress(min(fraction, 1.0), text=f"⏳ {label}... {job['done']:,}/{job['total']:,} baris ({elapsed:.0f} detik)")
+    else:
+        # Selesai / gagal: rerun penuh supaya tombol download / pesan error tampil
+        st.rerun(scope="app")
+
+def render_report_job(key, label, start_button_label, button_key, file_name, mime, func, args_factory):
+    """Tombol generate -> progress background -> tombol download (langsung jika sudah di-cache)
+
+    args_factory dipanggil hanya saat tombol diklik, supaya tabel pendukung (mis. Target)
+    tidak perlu di-load selama laporan tidak diminta.
+    """
+    status = poll_report_job(key)
+    if status == 'done':
+        st.download_button(
+            label=f"💾 Download {label}", data=get_cached_report(key),
+            file_name=file_name, mime=mime, use_container_width=True, type="primary",
+            key=f"{button_key}_download"
         )
-    )])
-    
-    fig.update_layout(
-        title="💸 Cash Flow: Dari Mana & Ke Mana Uang Mengalir",
-        font=dict(size=10, color='white'),
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        height=400
-    )
-    
-    return fig
+    elif status == 'running':
+        report_job_progress(key, label)
+    else:
+        if status == 'error':
+            st.error(f"❌ Gagal membuat {label}: {get_report_runner().jobs[key]['error']}")
+        if st.button(start_button_label, use_container_width=True, key=button_key):
+            get_report_runner().clear(key)
+            submit_report_job(key, func, *args_factory())
+            st.rerun()
 
-def create_budget_vs_actual_chart(df_filtered, budget_dict):
-    """Buat chart Budget vs Actual spending per kategori"""
-    if df_filtered.empty:
-        return None
-    
-    actual = df_filtered[df_filtered['Tipe'] == 'Pengeluaran'].groupby('Kategori')['Nominal'].sum()
-    
-    categories = list(budget_dict.keys())
-    budget_values = [budget_dict[cat] for cat in categories]
-    actual_values = [actual.get(cat, 0) for cat in categories]
-    variance = [actual_values[i] - budget_values[i] for i in range(len(categories))]
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        name='Budget',
-        x=categories,
-        y=budget_values,
-        marker_color='rgba(59, 130, 246, 0.6)',
-        text=[f'Rp {v:,.0f}' for v in budget_values],
-        textposition='outside'
-    ))
-    
-    fig.add_trace(go.Bar(
-        name='Aktual',
-        x=categories,
-        y=actual_values,
-        marker_color=['rgba(239, 68, 68, 0.6)' if v > budget_values[i] else 'rgba(16, 185, 129, 0.6)' 
-                      for i, v in enumerate(actual_values)],
-        text=[f'Rp {v:,.0f}' for v in actual_values],
-        textposition='outside'
-    ))
-    
-    fig.update_layout(
-        title='📊 Budget vs Actual Spending',
-        xaxis_title=None,
-        yaxis_title='Rupiah',
-        barmode='group',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white'),
-        height=400,
-        showlegend=True,
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    )
-    
-    return fig
+# ============================================================
+# 🛠️ DEVELOPER MODE: PROFILING PER RERUN
+# ============================================================
+# Toggle di sidebar. Span load/CRUD/filter/agregat/chart/export dicatat oleh bento_core.
 
-def export_to_excel(df, df_wallet, df_target, start_date, end_date):
-    """Export data ke Excel dengan format profesional"""
-    output = BytesIO()
-    
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        # Sheet 1: Summary
-        summary_data = {
-            'Periode': [f"{start_date.strftime('%d %b %Y')} - {end_date.strftime('%d %b %Y')}"],
-            'Total Pemasukan': [df[df['Tipe'] == 'Pemasukan']['Nominal'].sum()],
-            'Total Pengeluaran': [df[df['Tipe'] == 'Pengeluaran']['Nominal'].sum()],
-            'Net Cash Flow': [df[df['Tipe'] == 'Pemasukan']['Nominal'].sum() - df[df['Tipe'] == 'Pengeluaran']['Nominal'].sum()],
-            'Jumlah Transaksi': [len(df)],
-            'Tanggal Export': [datetime.now().strftime('%d %b %Y %H:%M')]
-        }
-        pd.DataFrame(summary_data).T.to_excel(writer, sheet_name='Summary', header=False)
-        
-        # Sheet 2: All Transactions
-        df_export = df.drop(columns=['Month', 'Year'], errors='ignore').copy()
-        df_export['Tanggal'] = pd.to_datetime(df_export['Tanggal']).dt.strftime('%Y-%m-%d')
-        df_export.to_excel(writer, sheet_name='Transaksi', index=False)
-        
-        # Sheet 3: Pemasukan
-        df_income = df[df['Tipe'] == 'Pemasukan'].drop(columns=['Month', 'Year'], errors='ignore').copy()
-        if not df_income.empty:
-            df_income['Tanggal'] = pd.to_datetime(df_income['Tanggal']).dt.strftime('%Y-%m-%d')
-            df_income.to_excel(writer, sheet_name='Pemasukan', index=False)
-        
-        # Sheet 4: Pengeluaran
-        df_expense = df[df['Tipe'] == 'Pengeluaran'].drop(columns=['Month', 'Year'], errors='ignore').copy()
-        if not df_expense.empty:
-            df_expense['Tanggal'] = pd.to_datetime(df_expense['Tanggal']).dt.strftime('%Y-%m-%d')
-            df_expense.to_excel(writer, sheet_name='Pengeluaran', index=False)
-        
-        # Sheet 5: Per Kategori
-        category_summary = df.groupby(['Kategori', 'Tipe'])['Nominal'].sum().reset_index()
-        category_summary.to_excel(writer, sheet_name='Per Kategori', index=False)
-        
-        # Sheet 6: Wallet Balance
-        df_wallet.to_excel(writer, sheet_name='Saldo Dompet', index=False)
-        
-        # Sheet 7: Targets
-        if not df_target.empty:
-            df_target.to_excel(writer, sheet_name='Target Impian', index=False)
-    
-    output.seek(0)
-    return output
+TRACE_FILE = "bento_trace.jsonl"
+
+if st.session_state.get('dev_mode'):
+    profiler = Profiler(trace_path=TRACE_FILE if st.session_state.get('dev_trace') else None)
+    profiling.activate(profiler)
+else:
+    profiler = None
+    profiling.deactivate()  # Thread script bisa dipakai ulang oleh rerun berikutnya
 
 # Load data awal
-df, df_wallet_initial, df_target, df_recurring_initial = get_cached_data()
+# 🚀 OPTIMASI: Hanya Transaksi yang selalu dibutuhkan (filter periode di sidebar).
+# Tabel lain di-load oleh screen yang memakainya.
+df = get_table('transaksi')
+
+# 📴 Status sinkronisasi: mode baca saja saat Google Sheets bermasalah / Transaksi belum ter-load utuh
+sync_status = get_sheet_storage().status()
+if sync_status['state'] == 'open' or not get_ledger().writable('transaksi'):
+    st.warning(f"📴 **Mode baca saja:** Google Sheets sedang bermasalah ({sync_status['last_error'] or 'data belum ter-load'}). "
+               f"Data yang tampil berasal dari cache dan semua perubahan (input, edit, hapus, pelunasan, arsip) ditolak "
+               f"sampai koneksi pulih. Cek ulang dalam {max(sync_status['retry_in'], 1):.0f} detik.")
+elif sync_status['pending']:
+    st.info(f"⏳ Menyinkronkan {', '.join(sync_status['pending'])} ke Google Sheets di background...")
 
 # ==========================================
 # 4. SIDEBAR NAVIGATION
@@ -675,14 +452,26 @@ with st.sidebar:
     
     # Show cache status
     st.divider()
-    if st.session_state.data_cache['last_update']:
-        last_update_str = st.session_state.data_cache['last_update'].strftime('%H:%M:%S')
+    if get_ledger().last_update:
+        last_update_str = get_ledger().last_update.strftime('%H:%M:%S')
         st.caption(f"🔄 Cache: {last_update_str}")
     
     if st.button("🔄 Refresh Data", use_container_width=True):
-        df, df_wallet_initial, df_target, df_recurring_initial = get_cached_data(force_refresh=True)
+        invalidate_cache()
         st.rerun()
 
+    # ⏱️ Laporan startup: durasi import per library + durasi run sebelumnya
+    with st.expander("⏱️ Startup Timing"):
+        for module_name, seconds in sorted(IMPORT_TIMINGS.items(), key=lambda kv: kv[1], reverse=True):
+            st.caption(f"`{module_name}`: {seconds * 1000:,.0f} ms")
+        st.caption(f"Total import: {sum(IMPORT_TIMINGS.values()) * 1000:,.0f} ms")
+        if 'last_run_seconds' in st.session_state:
+            st.caption(f"Run sebelumnya: {st.session_state.last_run_seconds * 1000:,.0f} ms")
+
+    st.toggle("🛠️ Developer Mode", key="dev_mode", help="Tampilkan breakdown waktu per rerun")
+    if st.session_state.get('dev_mode'):
+        st.checkbox(f"Tulis trace ke {TRACE_FILE}", key="dev_trace")
+
 # ==========================================
 # LOGIC SCREEN
 # ==========================================
@@ -690,6 +479,7 @@ with st.sidebar:
 # ---------------- SCREEN 1: DASHBOARD ----------------
 if selected_menu == "🏠 Dashboard":
     st.title("🏠 Dashboard Utama")
+    df_wallet_initial = get_table('dompet')
     
     # Display period info
     if st.session_state.filter_mode == 'custom':
@@ -702,13 +492,19 @@ if selected_menu == "🏠 Dashboard":
     if not df.empty:
         # 🚀 NEW: Use flexible filtering based on mode
         if st.session_state.filter_mode == 'custom':
-            df_filtered = filter_by_date_range(df, start_date, end_date)
+            # Range lama otomatis membaca arsip juga
+            df_filtered = filter_by_date_range(get_ledger().history(start_date), start_date, end_date)
         else:
             df_filtered = filter_data_efficient(df, selected_month, selected_year)
 
-        # 🚀 OPTIMASI: Compute aggregations sekali saja
-        global_in = df[df['Tipe'] == 'Pemasukan']['Nominal'].sum()
-        global_out = df[df['Tipe'] == 'Pengeluaran']['Nominal'].sum()
+        # Transfer antar dompet bukan pemasukan/pengeluaran riil: pakai mask yang dihitung saat load
+        df_real = df[~df[TRANSFER_MASK_COLUMN]]
+        df_filtered_real = df_filtered[~df_filtered[TRANSFER_MASK_COLUMN]]
+
+        # 🚀 OPTIMASI: Compute aggregations sekali saja (transaksi yang diarsipkan dihitung dari ringkasan)
+        all_time_totals = get_ledger().totals_by_tipe()
+        global_in = all_time_totals.get('Pemasukan', 0)
+        global_out = all_time_totals.get('Pengeluaran', 0)
         current_balance = global_in - global_out 
         
         # Hitung periode gajian: 25 bulan lalu s.d 24 bulan ini
@@ -723,17 +519,17 @@ if selected_menu == "🏠 Dashboard":
         start_gajian = datetime(prev_year, prev_month, 25)
         end_gajian = datetime(selected_year, month_idx, 24, 23, 59, 59)
         
-        df_pengeluaran_gajian = df[
-            (df['Tipe'] == 'Pengeluaran') &
-            (df['Tanggal'] >= start_gajian) &
-            (df['Tanggal'] <= end_gajian)
+        df_pengeluaran_gajian = df_real[
+            (df_real['Tipe'] == 'Pengeluaran') &
+            (df_real['Tanggal'] >= start_gajian) &
+            (df_real['Tanggal'] <= end_gajian)
         ]
         period_out_gajian = df_pengeluaran_gajian['Nominal'].sum()
 
-        df_pemasukan_gajian = df[
-            (df['Tipe'] == 'Pemasukan') &
-            (df['Tanggal'] >= start_gajian) &
-            (df['Tanggal'] <= end_gajian)
+        df_pemasukan_gajian = df_real[
+            (df_real['Tipe'] == 'Pemasukan') &
+            (df_real['Tanggal'] >= start_gajian) &
+            (df_real['Tanggal'] <= end_gajian)
         ]
         period_in_gajian = df_pemasukan_gajian['Nominal'].sum()
 
@@ -742,19 +538,19 @@ if selected_menu == "🏠 Dashboard":
         _, last_day = calendar.monthrange(selected_year, month_idx)
         end_bulan_ini = datetime(selected_year, month_idx, last_day, 23, 59, 59)
         
-        df_pengeluaran_bulan_ini = df[
-            (df['Tipe'] == 'Pengeluaran') &
-            (df['Tanggal'] >= start_bulan_ini) &
-            (df['Tanggal'] <= end_bulan_ini)
+        df_pengeluaran_bulan_ini = df_real[
+            (df_real['Tipe'] == 'Pengeluaran') &
+            (df_real['Tanggal'] >= start_bulan_ini) &
+            (df_real['Tanggal'] <= end_bulan_ini)
         ]
         period_out_bulan_ini = df_pengeluaran_bulan_ini['Nominal'].sum()
 
-        period_in = df_filtered[df_filtered['Tipe'] == 'Pemasukan']['Nominal'].sum()
-        period_gaji = df_filtered[(df_filtered['Tipe'] == 'Pemasukan') & (df_filtered['Kategori'] == 'Gaji')]['Nominal'].sum()
-        period_out = df_filtered[df_filtered['Tipe'] == 'Pengeluaran']['Nominal'].sum()
+        period_in = df_filtered_real[df_filtered_real['Tipe'] == 'Pemasukan']['Nominal'].sum()
+        period_gaji = df_filtered_real[(df_filtered_real['Tipe'] == 'Pemasukan') & (df_filtered_real['Kategori'] == 'Gaji')]['Nominal'].sum()
+        period_out = df_filtered_real[df_filtered_real['Tipe'] == 'Pengeluaran']['Nominal'].sum()
         
-        df_utang = df[df['Status'] == 'Belum Lunas']
-        total_utang = df_utang['Nominal'].sum()
+        # 🚀 OPTIMASI: Sisa utang dari index yang di-patch tiap commit, bukan scan Status
+        total_utang = get_ledger().debts().total
 
         c1, c2 = st.columns(2)
         with c1:
@@ -781,10 +577,10 @@ if selected_menu == "🏠 Dashboard":
                 monitor_start_tracking = datetime.combine(st.session_state.monitor_period_start, datetime.min.time())
                 monitor_end_tracking = datetime.combine(st.session_state.monitor_period_end, datetime.max.time())
                 
-                df_expense_tracking = df[
-                    (df['Tanggal'] >= monitor_start_tracking) & 
-                    (df['Tanggal'] <= monitor_end_tracking) & 
-                    (df['Tipe'] == 'Pengeluaran')
+                df_expense_tracking = df_real[
+                    (df_real['Tanggal'] >= monitor_start_tracking) & 
+                    (df_real['Tanggal'] <= monitor_end_tracking) & 
+                    (df_real['Tipe'] == 'Pengeluaran')
                 ]
                 
                 total_expense_tracking = df_expense_tracking['Nominal'].sum() if not df_expense_tracking.empty else 0
@@ -834,7 +630,7 @@ if selected_menu == "🏠 Dashboard":
             with col_info2:
                 if st.button("🗑️ Nonaktifkan Tracking", key="reset_tracking_info", use_container_width=True, type="secondary"):
                     st.session_state.monitor_active = False
-                    st.session_state.selected_incomes = []
+                    st.session_state.selected_incomes = set()
                     st.rerun()
     else:
         st.info("Belum ada data transaksi.")
@@ -865,13 +661,41 @@ if selected_menu == "🏠 Dashboard":
         with c3:
             input_deskripsi = st.text_input("Item", placeholder="Cth: Kopi / Gaji", key=f"in_desk_{st.session_state.reset_key}")
             input_ket = st.text_area("Ket", height=100, key=f"in_ket_{st.session_state.reset_key}")
-            
+
+        # 🚀 NEW: Transaksi tabungan bisa langsung di-tag ke Target Impian
+        input_target = ""
+        if input_kategori == "Saving":
+            target_names = [n for n in get_table('target').get('Nama Impian', pd.Series(dtype=str)) if n]
+            if target_names:
+                pilih_target = st.selectbox("Untuk Target Impian", ["-"] + target_names, key=f"in_target_{st.session_state.reset_key}")
+                input_target = "" if pilih_target == "-" else pilih_target
+
+        # 🚀 NEW: Cek duplikat sebelum simpan
+        possible_duplicates = pd.DataFrame()
+        if input_deskripsi and input_nominal and not df.empty:
+            possible_duplicates = find_possible_duplicates(df, get_duplicate_index(df), {
+                "Tanggal": input_tanggal,
+                "Item": input_deskripsi,
+                "Nominal": input_nominal,
+                "Tipe": input_tipe,
+                "Metode Pembayaran": "-" if is_disabled else input_metode
+            })
+        confirm_duplicate = True
+        if not possible_duplicates.empty:
+            st.warning(f"⚠️ Ditemukan {len(possible_duplicates)} transaksi mirip (±{DUPLICATE_WINDOW_DAYS} hari). Pastikan ini bukan input ganda.")
+            dup_show = possible_duplicates[['Tanggal', 'Item', 'Nominal', 'Metode Pembayaran']].copy()
+            dup_show['Tanggal'] = dup_show['Tanggal'].dt.strftime('%d/%m/%Y')
+            st.dataframe(dup_show, hide_index=True, use_container_width=True)
+            confirm_duplicate = st.checkbox("Saya yakin ini bukan duplikat", key=f"in_dup_ok_{st.session_state.reset_key}")
+
         if st.button("💾 SIMPAN DATA", type="primary", use_container_width=True):
             if not input_deskripsi or input_nominal is None or input_nominal <= 0:
                 st.error("⚠️ Gagal: Nama Item harus diisi dan Nominal harus lebih dari 0!")
+            elif not confirm_duplicate:
+                st.error("⚠️ Transaksi ini terlihat duplikat. Centang konfirmasi di atas jika tetap ingin menyimpan.")
             else:
                 # 🚀 OPTIMASI: Gunakan fungsi CRUD yang dioptimasi
-                success, message = add_transaction_optimized({
+                new_data = {
                     "Tanggal": input_tanggal.strftime("%Y-%m-%d"),
                     "Item": input_deskripsi,
                     "Kategori": input_kategori,
@@ -879,14 +703,17 @@ if selected_menu == "🏠 Dashboard":
                     "Tipe": input_tipe,
                     "Status": input_status,
                     "Keterangan": input_ket,
-                    "Metode Pembayaran": "-" if is_disabled else input_metode
-                })
+                    "Metode Pembayaran": "-" if is_disabled else input_metode,
+                    TARGET_LINK_COLUMN: input_target
+                }
+                success, message = add_transaction_optimized(new_data, op_key=operation_key("input_transaksi", new_data))
                 
                 if success:
+                    reset_operation_key("input_transaksi")
                     st.session_state['sukses_simpan'] = input_deskripsi
                     st.session_state.reset_key += 1
                     # Reload dari cache yang sudah diupdate
-                    df, df_wallet_initial, df_target, df_recurring_initial = get_cached_data()
+                    df = get_table('transaksi')
                     st.rerun()
                 else:
                     st.error(message)
@@ -898,20 +725,10 @@ if selected_menu == "🏠 Dashboard":
         if df_wallet_initial.empty:
             st.warning("Data dompet belum tersedia. Tambahkan wallet terlebih dahulu di menu Dompet Saya.")
         else:
-            live_wallets_dashboard = df_wallet_initial.copy()
-            live_wallets_dashboard['Saldo Sekarang'] = 0.0
-
-            for idx, wallet_row in live_wallets_dashboard.iterrows():
-                wallet_name = wallet_row['Wallet']
-                reset_date = wallet_row['Tanggal Reset']
-
-                df_wallet_trans = df[(df['Tanggal'] >= reset_date) & (df['Metode Pembayaran'] == wallet_name)]
-                total_in = df_wallet_trans[df_wallet_trans['Tipe'] == 'Pemasukan']['Nominal'].sum()
-                total_out = df_wallet_trans[df_wallet_trans['Tipe'] == 'Pengeluaran']['Nominal'].sum()
-                live_wallets_dashboard.at[idx, 'Saldo Sekarang'] = wallet_row['Saldo Awal'] + total_in - total_out
+            live_wallets_dashboard = get_ledger().wallet_balances()
 
             wallet_options = live_wallets_dashboard['Wallet'].dropna().astype(str).tolist()
-            wallet_balance_map = {row['Wallet']: row['Saldo Sekarang'] for _, row in live_wallets_dashboard.iterrows()}
+            wallet_balance_map = dict(zip(live_wallets_dashboard['Wallet'], live_wallets_dashboard['Saldo Sekarang']))
 
             if len(wallet_options) < 1:
                 st.warning("Tambahkan minimal 1 wallet di menu Dompet Saya untuk menggunakan fitur top up.")
@@ -951,20 +768,104 @@ if selected_menu == "🏠 Dashboard":
                     elif transfer_nominal > saldo_sumber:
                         st.error("Saldo wallet sumber tidak cukup untuk top up ini.")
                     else:
+                        transfer_op_key = operation_key("top_up", [str(transfer_date), transfer_nominal, source_wallet, target_wallet, transfer_note])
                         success, message = add_internal_transfer_optimized(
                             transfer_date=transfer_date,
                             nominal=transfer_nominal,
                             source_wallet=source_wallet,
                             target_wallet=target_wallet,
-                            note=transfer_note
+                            note=transfer_note,
+                            op_key=transfer_op_key
                         )
                         if success:
+                            reset_operation_key("top_up")
                             st.success(message)
-                            df, df_wallet_initial, df_target, df_recurring_initial = get_cached_data()
+                            df = get_table('transaksi')
                             st.rerun()
                         else:
                             st.error(message)
-    
+
+    # 🚀 NEW: Import Mutasi Bank / E-Wallet
+    with st.expander("📤 Import Mutasi Bank / E-Wallet (CSV/XLSX)", expanded=False):
+        st.caption("Upload file mutasi hasil export dari aplikasi bank/e-wallet. Semua baris disimpan sekaligus dalam 1x sinkronisasi.")
+
+        c_imp1, c_imp2 = st.columns([1, 2])
+        with c_imp1:
+            import_source = st.selectbox("Sumber / Wallet", list(IMPORT_SOURCES.keys()), key="import_source")
+        with c_imp2:
+            import_file = st.file_uploader("File Mutasi", type=["csv", "xlsx", "xls"], key="import_file")
+
+        if import_file is not None:
+            try:
+                raw_statement = read_statement_file(import_file)
+            except Exception as e:
+                raw_statement = None
+                st.error(f"❌ File tidak bisa dibaca: {e}")
+
+            if raw_statement is not None and not raw_statement.empty:
+                default_mapping = IMPORT_SOURCES[import_source]
+                file_columns = list(raw_statement.columns)
+
+                def _column_index(name):
+                    return file_columns.index(name) if name in file_columns else 0
+
+                st.markdown("**🔗 Mapping Kolom**")
+                m1, m2, m3 = st.columns(3)
+                with m1:
+                    map_tanggal = st.selectbox("Kolom Tanggal", file_columns, index=_column_index(default_mapping['tanggal']), key="map_tanggal")
+                    map_item = st.selectbox("Kolom Deskripsi", file_columns, index=_column_index(default_mapping['item']), key="map_item")
+                with m2:
+                    amount_mode = st.radio(
+                        "Format Nominal", ["1 kolom (+/-)", "Debit & Kredit"],
+                        index=0 if default_mapping.get('nominal') else 1, key="map_amount_mode"
+                    )
+                    decimal_sep = st.radio(
+                        "Pemisah Desimal", [",", "."],
+                        index=0 if default_mapping.get('decimal', ',') == ',' else 1, horizontal=True, key="map_decimal"
+                    )
+                with m3:
+                    mapping = {'tanggal': map_tanggal, 'item': map_item, 'decimal': decimal_sep, 'dayfirst': default_mapping.get('dayfirst', True)}
+                    if amount_mode == "1 kolom (+/-)":
+                        mapping['nominal'] = st.selectbox("Kolom Nominal", file_columns, index=_column_index(default_mapping.get('nominal', '')), key="map_nominal")
+                    else:
+                        mapping['debit'] = st.selectbox("Kolom Debit", file_columns, index=_column_index(default_mapping.get('debit', '')), key="map_debit")
+                        mapping['kredit'] = st.selectbox("Kolom Kredit", file_columns, index=_column_index(default_mapping.get('kredit', '')), key="map_kredit")
+
+                parsed_import, dropped_rows = parse_statement(raw_statement, import_source, mapping)
+
+                if parsed_import.empty:
+                    st.warning("⚠️ Tidak ada baris valid. Cek kembali mapping kolom dan pemisah desimal.")
+                else:
+                    imp_in = parsed_import.loc[parsed_import['Tipe'] == 'Pemasukan', 'Nominal'].sum()
+                    imp_out = parsed_import.loc[parsed_import['Tipe'] == 'Pengeluaran', 'Nominal'].sum()
+                    p1, p2, p3 = st.columns(3)
+                    p1.metric("📝 Baris Valid", f"{len(parsed_import):,}", delta=f"-{dropped_rows} dibuang" if dropped_rows else None, delta_color="off")
+                    p2.metric("🟢 Pemasukan", f"Rp {imp_in:,.0f}")
+                    p3.metric("🔴 Pengeluaran", f"Rp {imp_out:,.0f}")
+
+                    st.markdown("**👀 Preview (50 baris pertama)**")
+                    st.dataframe(
+                        parsed_import.head(50),
+                        column_config={
+                            "Tanggal": st.column_config.DateColumn("Tanggal", format="DD MMM YYYY"),
+                            "Nominal": st.column_config.NumberColumn("Nominal", format="Rp %d")
+                        },
+                        hide_index=True, use_container_width=True
+                    )
+
+                    if st.button(f"✅ Import {len(parsed_import):,} Transaksi", type="primary", use_container_width=True, key="import_commit"):
+                        with st.spinner("⏳ Menyimpan ke Google Sheets..."):
+                            success, message = add_transactions_bulk(parsed_import, op_key=operation_key("import_mutasi", parsed_import))
+                        if success:
+                            reset_operation_key("import_mutasi")
+                            st.session_state['sukses_simpan'] = f"{len(parsed_import):,} transaksi dari {import_source}"
+                            df = get_table('transaksi')
+                            st.rerun()
+                        else:
+                            st.error(message)
+            elif raw_statement is not None:
+                st.warning("⚠️ File kosong.")
+
     # 🚀 NEW: Excel Export Button - Positioned after Input Transaction
     if not df_filtered.empty:
         st.markdown("<div style='margin: 20px 0;'></div>", unsafe_allow_html=True)
@@ -977,25 +878,46 @@ if selected_menu == "🏠 Dashboard":
             </div>
             """, unsafe_allow_html=True)
             
-            if st.button("📥 EXPORT KE EXCEL", type="secondary", use_container_width=True, key="export_main"):
-                with st.spinner("⏳ Mempersiapkan file Excel..."):
-                    excel_file = export_to_excel(df_filtered, df_wallet_initial, df_target, start_date, end_date)
-                    st.download_button(
-                        label="💾 Download File Excel",
-                        data=excel_file,
-                        file_name=f"BentoPro_Report_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True,
-                        type="primary"
-                    )
-                    st.success("✅ File siap didownload!")
+            export_all = st.checkbox("🌍 Export seluruh riwayat (semua periode)", value=False, key="export_all_history")
+            if export_all:
+                # Riwayat lengkap = arsip semua tahun + tabel hot (reader terpadu, cache per versi)
+                df_export_src = get_ledger().full_history()
+                export_start = df_export_src['Tanggal'].min()
+                export_end = df_export_src['Tanggal'].max()
+            else:
+                df_export_src = df_filtered
+                export_start, export_end = start_date, end_date
+            use_streaming = st.toggle(
+                "⚡ Mode Streaming (hemat memori untuk data besar)",
+                value=len(df_export_src) > STREAMING_EXPORT_THRESHOLD,
+                key="export_streaming"
+            )
+
+            export_func = export_to_excel_streaming if use_streaming else export_to_excel
+            export_key = ('excel', export_start, export_end, use_streaming, get_data_version())
+            render_report_job(
+                export_key, "File Excel", "📥 EXPORT KE EXCEL", "export_main",
+                f"BentoPro_Report_{export_start.strftime('%Y%m%d')}_{export_end.strftime('%Y%m%d')}.xlsx",
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                export_func,
+                lambda: (df_export_src, df_wallet_initial, get_table('target'), export_start, export_end)
+            )
+            export_stats = get_report_runner().store.stats.get(export_key)
+            if export_stats:
+                st.caption(f"⚡ {export_stats['rows']:,} baris dalam {export_stats['seconds']:.2f} detik ({export_stats['rows_per_sec']:,.0f} baris/detik)")
     
     st.divider()
     
     # 🚀 NEW: Cash Flow Sankey Diagram
     st.subheader("💸 Cash Flow: Dari Mana & Ke Mana Uang Mengalir")
     if not df.empty and not df_filtered.empty:
-        sankey_fig = create_sankey_diagram(df_filtered)
+        # 🚀 OPTIMASI: Figure periode aktif di-cache per versi data (tidak dibangun ulang tiap rerun).
+        # 1 slot saja: ganti periode menimpa figure lama, jadi cache tidak tumbuh per range yang dibuka
+        sankey_cache = get_ledger().derived("sankey", dict)
+        if sankey_cache.get('period') != (start_date, end_date):
+            sankey_cache['period'] = (start_date, end_date)
+            sankey_cache['fig'] = create_sankey_diagram(df_filtered)
+        sankey_fig = sankey_cache['fig']
         if sankey_fig:
             st.plotly_chart(sankey_fig, use_container_width=True)
         else:
@@ -1008,9 +930,10 @@ if selected_menu == "🏠 Dashboard":
     # GRAFIK ANALISIS CEPAT
     st.subheader("📊 Analisis Cepat")
     if not df.empty and not df_filtered.empty:
+        px = lazy_import('plotly.express')
         c_graph1, c_graph2 = st.columns([2,1])
         with c_graph1:
-            daily_stats = df_filtered.groupby(['Tanggal', 'Tipe'])['Nominal'].sum().reset_index()
+            daily_stats = df_filtered_real.groupby(['Tanggal', 'Tipe'])['Nominal'].sum().reset_index()
             fig = px.bar(daily_stats, x='Tanggal', y='Nominal', color='Tipe', barmode='group',
                          color_discrete_map={'Pemasukan': '#10B981', 'Pengeluaran': '#EF4444'})
             fig.update_layout(xaxis_title=None, yaxis_title=None, plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', 
@@ -1018,7 +941,7 @@ if selected_menu == "🏠 Dashboard":
             st.plotly_chart(fig, use_container_width=True)  # plotly_chart masih pakai use_container_width
             
         with c_graph2:
-            cat = df_filtered[df_filtered['Tipe']=='Pengeluaran'].groupby('Kategori')['Nominal'].sum().reset_index()
+            cat = df_filtered_real[df_filtered_real['Tipe']=='Pengeluaran'].groupby('Kategori')['Nominal'].sum().reset_index()
             if not cat.empty:
                 fig2 = px.pie(cat, values='Nominal', names='Kategori', hole=0.6, color_discrete_sequence=px.colors.qualitative.Prism)
                 fig2.update_layout(margin=dict(t=20, b=20, l=0, r=0), height=350, showlegend=True,
@@ -1030,24 +953,23 @@ if selected_menu == "🏠 Dashboard":
         st.write("")
         st.write("### 🌴 Analisis Pengeluaran Spesifik")
         
-        # Ambil semua tanggal yang ada pengeluarannya
-        available_dates = df_filtered[df_filtered['Tipe'] == 'Pengeluaran']['Tanggal'].dt.date.unique()
-        # Defaultnya pilih yang weekend
-        default_dates = [d for d in available_dates if d.weekday() in [5, 6]]
+        # 🚀 OPTIMASI: Seri pengeluaran harian di-cache per versi data, pilihan tanggal = lookup index.
+        # Dibangun dari riwayat lengkap (arsip + hot) supaya kalender multi-tahun tidak kehilangan tahun yang diarsip
+        daily_spend = get_ledger().derived('daily_spend', lambda: build_daily_spend(get_ledger().full_history()))
+        available_dates = daily_spend.dates(start_date, end_date)
         
         selected_dates = st.multiselect(
             "Pilih Tanggal:", 
-            options=sorted(available_dates), 
-            default=default_dates,
+            options=list(available_dates), 
+            default=list(daily_spend.weekend_dates(start_date, end_date)),  # Defaultnya pilih yang weekend
             format_func=lambda x: x.strftime('%d %b %Y')
         )
 
-        df_spesifik = df_filtered[(df_filtered['Tipe'] == 'Pengeluaran') & (df_filtered['Tanggal'].dt.date.isin(selected_dates))]
-        df_spesifik = df_spesifik[~df_spesifik['Item'].str.contains('kos', case=False, na=False)] # Tetep filter "kos" wkw
+        # Item "kos" dkk sudah dikecualikan saat seri dibangun (lihat ANALISIS_EXCLUDE_ITEMS) wkw
+        spesifik_expense = daily_spend.total_for(selected_dates)
 
-        if not df_spesifik.empty:
-            spesifik_expense = df_spesifik['Nominal'].sum()
-            total_expense = df_filtered[df_filtered['Tipe'] == 'Pengeluaran']['Nominal'].sum()
+        if spesifik_expense > 0:
+            total_expense = daily_spend.total_between(start_date, end_date)
             spesifik_pct = (spesifik_expense / total_expense) * 100 if total_expense > 0 else 0
             
             w1, w2 = st.columns(2)
@@ -1065,41 +987,125 @@ if selected_menu == "🏠 Dashboard":
                 </div>""", unsafe_allow_html=True)
             
             with st.expander("📝 Lihat Rincian Data"):
+                df_spesifik = daily_spend.rows_for(df_filtered, selected_dates)
                 df_spesifik_show = df_spesifik[['Tanggal', 'Kategori', 'Item', 'Nominal', 'Metode Pembayaran']].copy()
                 df_spesifik_show['Tanggal'] = df_spesifik_show['Tanggal'].dt.strftime('%Y-%m-%d')
                 st.dataframe(df_spesifik_show.sort_values('Tanggal', ascending=False), use_container_width=True, hide_index=True)
         else:
             st.info("Belum ada pengeluaran di tanggal yang dipilih (atau cuma bayar kos aja wkw).")
 
+        # 🚀 NEW: Kalender pengeluaran multi-tahun, dirender dari seri harian (tanpa baca baris transaksi)
+        with st.expander("📅 Kalender Pengeluaran", expanded=False):
+            spend_years = sorted(daily_spend.total_all.index.year.unique(), reverse=True)
+            heatmap_years = st.multiselect("Tahun", spend_years, default=spend_years[:2], key="heatmap_years")
+            # 1 slot per versi data (seperti Sankey): ganti pilihan tahun menimpa figure lama
+            heatmap_cache = get_ledger().derived("calendar_heatmap", dict)
+            if heatmap_cache.get('years') != tuple(sorted(heatmap_years)):
+                heatmap_cache['years'] = tuple(sorted(heatmap_years))
+                heatmap_cache['fig'] = create_calendar_heatmap(daily_spend.total_all, heatmap_years)
+            fig_calendar = heatmap_cache['fig']
+            if fig_calendar is not None:
+                st.plotly_chart(fig_calendar, use_container_width=True)  # plotly_chart masih pakai use_container_width
+            else:
+                st.caption("Pilih minimal 1 tahun.")
+
+    st.divider()
+
+    # 🚀 NEW: Perbandingan periode dari total bulanan yang sudah diagregasi (di-cache per versi data)
+    st.subheader("📈 Perbandingan Periode")
+    monthly_totals = get_ledger().monthly_totals()
+    if monthly_totals.empty:
+        st.info("Belum ada data untuk dibandingkan.")
+    else:
+        cmp_col1, cmp_col2, cmp_col3 = st.columns(3)
+        with cmp_col1:
+            compare_mode = st.selectbox("Bandingkan dengan", list(COMPARISON_MODES),
+                                        format_func=lambda mode: COMPARISON_MODES[mode][0], key="compare_mode")
+        with cmp_col2:
+            compare_by = st.radio("Per", ["Kategori", "Metode Pembayaran"], horizontal=True,
+                                  format_func=lambda by: "Wallet" if by == "Metode Pembayaran" else by, key="compare_by")
+        with cmp_col3:
+            compare_tipe = st.radio("Tipe", ["Pengeluaran", "Pemasukan"], horizontal=True, key="compare_tipe")
+
+        compare_pivot = get_ledger().derived(
+            f"monthly_pivot_{compare_by}_{compare_tipe}",
+            lambda: monthly_pivot(monthly_totals, compare_by, compare_tipe)
+        )
+        # Periode acuan = bulan dari akhir filter (mode bulanan maupun custom range)
+        current_months, previous_months = period_months(end_date, compare_mode)
+        comparison = compare_periods(compare_pivot, current_months, previous_months)
+        period_label = lambda months: (f"{months[0]:%b %Y}" if len(months) == 1
+                                       else f"{months[0]:%b %Y} - {months[-1]:%b %Y}")
+
+        total_now, total_before = comparison['Sekarang'].sum(), comparison['Sebelumnya'].sum()
+        m1, m2, m3 = st.columns(3)
+        m1.metric(period_label(current_months), f"Rp {total_now:,.0f}")
+        m2.metric(period_label(previous_months), f"Rp {total_before:,.0f}")
+        m3.metric("Perubahan", f"Rp {total_now - total_before:,.0f}",
+                  delta=f"{(total_now - total_before) / total_before * 100:+.1f}%" if total_before else None,
+                  delta_color="inverse" if compare_tipe == "Pengeluaran" else "normal")
+
+        tab_delta, tab_rolling, tab_grid = st.tabs(["📊 Selisih", "📉 Rata-rata Bergulir", "🗓️ Grid Bulanan"])
+        money_column = lambda label: st.column_config.NumberColumn(label, format="Rp %d")
+        with tab_delta:
+            st.dataframe(
+                comparison.rename_axis(compare_by).reset_index(),
+                column_config={
+                    "Sekarang": money_column(period_label(current_months)),
+                    "Sebelumnya": money_column(period_label(previous_months)),
+                    "Selisih": money_column("Selisih"),
+                    "Pertumbuhan (%)": st.column_config.NumberColumn("Pertumbuhan", format="%.1f%%"),
+                },
+                hide_index=True, use_container_width=True
+            )
+        with tab_rolling:
+            rolling = rolling_averages(compare_pivot, end_date)
+            if rolling.empty:
+                st.caption("Belum ada data sampai bulan ini.")
+            else:
+                rolling = rolling[(rolling != 0).any(axis=1)].sort_values('Bulan Ini', ascending=False)
+                st.caption(f"Nilai {end_date:%b %Y} dibandingkan rata-rata 3/6/12 bulan terakhir (termasuk bulan ini).")
+                st.dataframe(
+                    rolling.rename_axis(compare_by).reset_index(),
+                    column_config={col: money_column(col) for col in rolling.columns},
+                    hide_index=True, use_container_width=True
+                )
+        with tab_grid:
+            grid_target = st.selectbox("Grup", ["(Semua)"] + list(compare_pivot.columns), key="compare_grid_target")
+            grid = year_month_grid(compare_pivot, None if grid_target == "(Semua)" else grid_target)
+            if grid.empty:
+                st.caption("Belum ada data.")
+            else:
+                grid = grid.rename(columns=lambda m: calendar.month_abbr[m]).sort_index(ascending=False)
+                grid_view = st.radio("Tampilkan", ["Nominal", "YoY (%)"], horizontal=True, key="compare_grid_view")
+                if grid_view == "YoY (%)":
+                    # Baris diurutkan tahun terbaru di atas: tahun sebelumnya ada di baris bawahnya
+                    previous_year = grid.shift(-1)
+                    grid = (grid - previous_year) / previous_year.where(previous_year != 0) * 100
+                    grid_format = "%.1f%%"
+                else:
+                    grid_format = "Rp %d"
+                st.dataframe(
+                    grid.reset_index(),
+                    column_config={
+                        "Tahun": st.column_config.NumberColumn("Tahun", format="%d"),
+                        **{col: st.column_config.NumberColumn(col, format=grid_format) for col in grid.columns},
+                    },
+                    hide_index=True, use_container_width=True
+                )
+
 # ---------------- SCREEN 2: DOMPET SAYA ----------------
 elif selected_menu == "👛 Dompet Saya":
     st.title("👛 Monitoring Dompet")
+    df_wallet_initial = get_table('dompet')
     
     if not df_wallet_initial.empty:
-        # 🚀 PERBAIKAN: Hitung per wallet berdasarkan Tanggal Reset masing-masing
-        live_wallets = df_wallet_initial.copy()
-        
-        # Inisialisasi kolom
-        live_wallets['Total Masuk'] = 0.0
-        live_wallets['Total Keluar'] = 0.0
-        live_wallets['Saldo Sekarang'] = 0.0
-        
-        # Loop per wallet untuk hitung transaksi setelah Tanggal Reset
-        for idx, wallet_row in live_wallets.iterrows():
-            wallet_name = wallet_row['Wallet']
-            reset_date = wallet_row['Tanggal Reset']
-            
-            # Filter transaksi setelah tanggal reset untuk wallet ini
-            df_wallet_trans = df[(df['Tanggal'] >= reset_date) & (df['Metode Pembayaran'] == wallet_name)]
-            
-            # Hitung total masuk dan keluar
-            total_in = df_wallet_trans[df_wallet_trans['Tipe'] == 'Pemasukan']['Nominal'].sum()
-            total_out = df_wallet_trans[df_wallet_trans['Tipe'] == 'Pengeluaran']['Nominal'].sum()
-            
-            # Update dataframe
-            live_wallets.at[idx, 'Total Masuk'] = total_in
-            live_wallets.at[idx, 'Total Keluar'] = total_out
-            live_wallets.at[idx, 'Saldo Sekarang'] = wallet_row['Saldo Awal'] + total_in - total_out
+        # 🚀 OPTIMASI: Saldo = checkpoint terdekat (reset / awal bulan) + transaksi sesudahnya saja
+        try:
+            get_ledger().roll_checkpoints()
+        except Exception as e:
+            st.warning(f"⚠️ Checkpoint saldo belum tersimpan: {e}")
+        live_wallets = get_ledger().wallet_balances()
         
         total_aset_real = live_wallets['Saldo Sekarang'].sum()
         st.markdown(f"""
@@ -1122,6 +1128,19 @@ elif selected_menu == "👛 Dompet Saya":
                 </div>
                 """, unsafe_allow_html=True)
 
+        # 🚀 NEW: Tren saldo riil per wallet dari running balance (binary search per tanggal)
+        with st.expander("📈 Tren Saldo 90 Hari", expanded=False):
+            trend_dates = pd.date_range(end=pd.Timestamp.today().normalize(), periods=90, freq='D')
+            trend = pd.DataFrame({
+                wallet: get_ledger().balance_series(trend_dates, wallet).values
+                for wallet in live_wallets['Wallet'].dropna().astype(str)
+            }, index=trend_dates)
+            px = lazy_import('plotly.express')
+            fig_trend = px.line(trend, labels={'index': 'Tanggal', 'value': 'Saldo', 'variable': 'Wallet'})
+            fig_trend.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', height=350,
+                                    hovermode="x unified", xaxis_title=None, yaxis_title=None)
+            st.plotly_chart(fig_trend, use_container_width=True)  # plotly_chart masih pakai use_container_width
+
     st.divider()
     with st.expander("⚙️ Atur Saldo Awal (Gunakan saat sinkron ulang)"):
         st.info("💡 **Cara Reset:** Ubah 'Saldo Saat Ini' sesuai saldo RIIL dompet Anda SEKARANG (cek fisik atau cek app bank). Nilai ini akan menjadi saldo FINAL hari ini. Transaksi baru akan mulai dihitung BESOK.")
@@ -1143,18 +1162,11 @@ elif selected_menu == "👛 Dompet Saya":
                 try:
                     # 🚀 PERBAIKAN: Set Tanggal Reset ke BESOK agar transaksi hari ini tidak terhitung
                     tomorrow = (datetime.today() + timedelta(days=1)).strftime('%Y-%m-%d')
-                    edited_wallets['Tanggal Reset'] = tomorrow
-                    
-                    # Update ke Google Sheets dengan retry logic
-                    def update_operation():
-                        return conn.update(worksheet="Dompet", data=edited_wallets)
                     
-                    retry_gsheet_operation(update_operation, max_retries=3, delay=2)
-                    
-                    # Update cache dengan parsing Tanggal Reset
-                    edited_wallets['Tanggal Reset'] = pd.to_datetime(edited_wallets['Tanggal Reset'])
-                    st.session_state.data_cache['dompet'] = edited_wallets
-                    st.session_state.data_cache['needs_refresh'] = True
+                    # Catat checkpoint reset (riwayat + selisih) lalu update sheet Dompet
+                    get_ledger().reset_wallets(edited_wallets, tomorrow)
+                    # Load ulang agar Tanggal Reset ter-parse
+                    invalidate_cache()
                     
                     st.success("✅ Saldo berhasil direset!")
                     st.info(f"💡 Nilai yang Anda input adalah saldo FINAL hari ini. Perhitungan transaksi baru dimulai besok ({tomorrow}).")
@@ -1164,6 +1176,100 @@ elif selected_menu == "👛 Dompet Saya":
                     st.error(f"❌ Gagal update: {e}")
                     st.info("💡 **Tips jika gagal:**\n- Pastikan koneksi internet stabil\n- Refresh halaman dan coba lagi\n- Cek apakah Google Sheets masih dapat diakses")
 
+    # 🚀 NEW: Riwayat reset saldo untuk audit selisih catatan vs saldo riil
+    with st.expander("🧾 Riwayat Reset Saldo"):
+        reset_history = get_ledger().reset_history()
+        if reset_history.empty:
+            st.caption("Belum ada riwayat reset.")
+        else:
+            st.caption("Selisih = saldo riil yang diinput - saldo hasil hitungan transaksi. Selisih besar berarti ada transaksi yang belum dicatat.")
+            st.dataframe(
+                reset_history[['Tanggal', 'Wallet', 'Saldo', 'Selisih', 'Dicatat']],
+                column_config={
+                    "Tanggal": st.column_config.DateColumn("Berlaku Mulai", format="DD MMM YYYY"),
+                    "Saldo": st.column_config.NumberColumn("Saldo Riil", format="Rp %d"),
+                    "Selisih": st.column_config.NumberColumn("Selisih", format="Rp %d"),
+                },
+                hide_index=True, use_container_width=True
+            )
+
+    # 🚀 NEW: Rekonsiliasi - cari titik awal selisih saldo aplikasi vs saldo riil (bisection)
+    if not df_wallet_initial.empty:
+        with st.expander("🔍 Rekonsiliasi Saldo"):
+            st.caption("Masukkan beberapa saldo riil (cek riwayat di app bank / e-wallet) di akhir tanggal tertentu. "
+                       "Aplikasi mencari interval tempat selisih pertama kali muncul, lalu menyarankan 1 tanggal untuk dicek berikutnya.")
+            recon_wallet = st.selectbox("Wallet", df_wallet_initial['Wallet'].dropna().astype(str).tolist(), key="recon_wallet")
+            # Titik saldo riil disimpan per wallet di session agar tidak hilang saat rerun
+            points_key = f"recon_points_{recon_wallet}"
+            if points_key not in st.session_state:
+                st.session_state[points_key] = pd.DataFrame({'Tanggal': pd.Series(dtype='datetime64[ns]'), 'Saldo Riil': pd.Series(dtype=float)})
+            probe_key = f"recon_probe_{recon_wallet}"
+            if st.session_state.get(probe_key) is not None:
+                st.info(f"📅 Cek saldo riil **{recon_wallet}** di akhir tanggal **{st.session_state[probe_key]:%d %b %Y}**, lalu tambahkan ke tabel.")
+
+            known_balances = st.data_editor(
+                st.session_state[points_key],
+                column_config={
+                    "Tanggal": st.column_config.DateColumn("Tanggal", format="DD MMM YYYY", required=True),
+                    "Saldo Riil": st.column_config.NumberColumn("Saldo Riil (Rp)", format="Rp %d", required=True),
+                }, num_rows="dynamic", hide_index=True, use_container_width=True, key=f"recon_editor_{recon_wallet}"
+            )
+
+            if st.button("🔍 Cari Titik Selisih", key="recon_run"):
+                st.session_state[points_key] = known_balances
+                if known_balances.dropna().empty:
+                    st.warning("⚠️ Masukkan minimal 1 saldo riil.")
+                else:
+                    result = reconcile_wallet(get_ledger(), recon_wallet, known_balances)
+                    st.session_state[probe_key] = result['probe']
+                    points = result['points']
+                    if len(points) < len(known_balances.dropna()):
+                        st.caption("ℹ️ Titik sebelum checkpoint saldo pertama wallet ini diabaikan.")
+                    st.dataframe(
+                        points[['Tanggal', 'Saldo Riil', 'Saldo Aplikasi', 'Selisih', 'Cocok']],
+                        column_config={
+                            "Tanggal": st.column_config.DateColumn("Tanggal", format="DD MMM YYYY"),
+                            "Saldo Riil": st.column_config.NumberColumn("Saldo Riil", format="Rp %d"),
+                            "Saldo Aplikasi": st.column_config.NumberColumn("Saldo Aplikasi", format="Rp %d"),
+                            "Selisih": st.column_config.NumberColumn("Selisih", format="Rp %d"),
+                        },
+                        hide_index=True, use_container_width=True
+                    )
+
+                    if result['interval'] is None:
+                        st.success("✅ Semua saldo riil cocok dengan catatan aplikasi.")
+                    else:
+                        good, bad, difference = result['interval']
+                        good_label = f"{good:%d %b %Y}" if good is not None else "checkpoint pertama"
+                        st.error(f"❌ Selisih Rp {difference:,.0f} muncul setelah **{good_label}** dan sebelum akhir **{bad:%d %b %Y}**.")
+                        if result['probe'] is not None:
+                            st.info(f"📅 Persempit: cek saldo riil di akhir **{result['probe']:%d %b %Y}** lalu jalankan lagi.")
+                        else:
+                            st.info(f"🎯 Selisih terjadi pada transaksi tanggal **{bad:%d %b %Y}**.")
+
+                        candidates = result['candidates']
+                        if not candidates.empty:
+                            st.markdown("**Kandidat penyebab:**")
+                            st.dataframe(
+                                candidates[['Tanggal', 'Item', 'Kategori', 'Nominal', 'Tipe', 'Metode Pembayaran', 'Alasan']],
+                                column_config={
+                                    "Tanggal": st.column_config.DateColumn("Tanggal", format="DD MMM YYYY"),
+                                    "Nominal": st.column_config.NumberColumn("Nominal", format="Rp %d"),
+                                },
+                                hide_index=True, use_container_width=True
+                            )
+                        else:
+                            st.caption("Tidak ada transaksi yang nominalnya sama dengan selisih. Kemungkinan ada transaksi yang belum dicatat.")
+                        st.caption(f"{len(result['transactions'])} transaksi {recon_wallet} di interval ini.")
+                        st.dataframe(
+                            result['transactions'][['Tanggal', 'Item', 'Kategori', 'Nominal', 'Tipe']],
+                            column_config={
+                                "Tanggal": st.column_config.DateColumn("Tanggal", format="DD MMM YYYY"),
+                                "Nominal": st.column_config.NumberColumn("Nominal", format="Rp %d"),
+                            },
+                            hide_index=True, use_container_width=True
+                        )
+
 # ---------------- SCREEN 3: MONITOR GAJI ----------------
 elif selected_menu == "💵 Monitor Gaji":
     st.title("💵 Monitor Gaji & Pengeluaran")
@@ -1204,57 +1310,49 @@ elif selected_menu == "💵 Monitor Gaji":
             st.markdown("**💰 Pilih Pemasukan sebagai Acuan (bisa lebih dari 1)**")
             st.caption("✅ Centang pemasukan yang ingin dijadikan acuan dompet")
             
-            # Initialize session state untuk checkbox
-            if 'selected_incomes' not in st.session_state:
-                st.session_state.selected_incomes = []
+            # 🚀 OPTIMASI: Pilihan disimpan sebagai set ID transaksi (stabil walau index bergeser)
+            if not isinstance(st.session_state.get('selected_incomes'), set):
+                st.session_state.selected_incomes = set()
             
             if not df.empty:
-                df_income_period = df[
-                    (df['Tanggal'] >= monitor_start_dt) & 
-                    (df['Tanggal'] <= monitor_end_dt) & 
-                    (df['Tipe'] == 'Pemasukan')
-                ]
+                # 🚀 OPTIMASI: Index pemasukan urut tanggal di-cache per versi data, periode diambil via binary search
+                income_index = get_ledger().derived('income_index', lambda: build_income_index(df))
+                df_income_period = slice_by_date(income_index, monitor_start_dt, monitor_end_dt)
                 
                 if not df_income_period.empty:
-                    # Container untuk checkbox dengan scrollable area
-                    with st.container(height=200):
-                        selected_income_list = []
-                        
-                        for idx, row in df_income_period.iterrows():
-                            checkbox_label = f"{row['Tanggal'].strftime('%d/%m/%Y')} - {row['Item']} - Rp {row['Nominal']:,.0f}"
-                            checkbox_key = f"income_{idx}_{row['Tanggal'].strftime('%Y%m%d')}_{row['Item']}"
-                            
-                            is_checked = st.checkbox(
-                                checkbox_label,
-                                key=checkbox_key,
-                                value=checkbox_key in st.session_state.selected_incomes
-                            )
-                            
-                            if is_checked:
-                                if checkbox_key not in st.session_state.selected_incomes:
-                                    st.session_state.selected_incomes.append(checkbox_key)
-                                selected_income_list.append({
-                                    'nominal': row['Nominal'],
-                                    'item': row['Item'],
-                                    'tanggal': row['Tanggal']
-                                })
-                            else:
-                                if checkbox_key in st.session_state.selected_incomes:
-                                    st.session_state.selected_incomes.remove(checkbox_key)
+                    # 1 data_editor dengan kolom centang, bukan 1 checkbox per baris
+                    picker_df = df_income_period.copy()
+                    picker_df.insert(0, 'Pilih', picker_df['ID'].isin(st.session_state.selected_incomes))
+                    edited_picker = st.data_editor(
+                        picker_df,
+                        column_config={
+                            "Pilih": st.column_config.CheckboxColumn("✅", width="small"),
+                            "Tanggal": st.column_config.DateColumn("Tanggal", format="DD/MM/YYYY"),
+                            "Nominal": st.column_config.NumberColumn("Nominal", format="Rp %d")
+                        },
+                        disabled=INCOME_INDEX_COLUMNS,
+                        column_order=["Pilih", "Tanggal", "Item", "Nominal"],
+                        hide_index=True, use_container_width=True, height=200,  # data_editor masih pakai use_container_width
+                        key=f"income_picker_{monitor_start}_{monitor_end}_{get_data_version()}"
+                    )
+                    
+                    checked_ids = set(edited_picker.loc[edited_picker['Pilih'], 'ID'])
+                    # Pilihan di luar periode ini tetap diingat
+                    st.session_state.selected_incomes = (st.session_state.selected_incomes - set(picker_df['ID'])) | checked_ids
+                    gaji_nominal, selected_count, selected_items = summarize_selection(df_income_period, checked_ids)
                     
                     # Hitung total dari pemasukan yang dipilih
-                    if selected_income_list:
-                        gaji_nominal = sum([inc['nominal'] for inc in selected_income_list])
-                        if len(selected_income_list) == 1:
-                            gaji_item = selected_income_list[0]['item']
+                    if selected_count:
+                        if selected_count == 1:
+                            gaji_item = selected_items[0]
                         else:
-                            gaji_item = f"{len(selected_income_list)} Pemasukan Dipilih"
+                            gaji_item = f"{selected_count} Pemasukan Dipilih"
                         
                         # Simpan info ke session state untuk dashboard
                         st.session_state.monitor_active = True
                         st.session_state.monitor_total = gaji_nominal
-                        st.session_state.monitor_items = ", ".join([inc['item'] for inc in selected_income_list])
-                        st.session_state.monitor_count = len(selected_income_list)
+                        st.session_state.monitor_items = ", ".join(selected_items)
+                        st.session_state.monitor_count = selected_count
                         st.session_state.monitor_period_start = monitor_start
                         st.session_state.monitor_period_end = monitor_end
                     else:
@@ -1284,7 +1382,8 @@ elif selected_menu == "💵 Monitor Gaji":
         df_expense_period = df[
             (df['Tanggal'] >= monitor_start_dt) & 
             (df['Tanggal'] <= monitor_end_dt) & 
-            (df['Tipe'] == 'Pengeluaran')
+            (df['Tipe'] == 'Pengeluaran') &
+            ~df[TRANSFER_MASK_COLUMN]
         ]
         
         total_expense = df_expense_period['Nominal'].sum() if not df_expense_period.empty else 0
@@ -1329,14 +1428,8 @@ elif selected_menu == "💵 Monitor Gaji":
         
         with col4:
             # Hitung saving sebelum periode (saldo sebelum periode monitoring dimulai)
-            df_before_period = df[df['Tanggal'] < monitor_start_dt]
-            
-            if not df_before_period.empty:
-                income_before = df_before_period[df_before_period['Tipe'] == 'Pemasukan']['Nominal'].sum()
-                expense_before = df_before_period[df_before_period['Tipe'] == 'Pengeluaran']['Nominal'].sum()
-                saving_before = income_before - expense_before
-            else:
-                saving_before = 0
+            totals_before = get_ledger().totals_by_tipe(before=monitor_start_dt)
+            saving_before = totals_before.get('Pemasukan', 0) - totals_before.get('Pengeluaran', 0)
             
             st.markdown(f"""
             <div class="bento-card-warning" style="height:140px;">
@@ -1352,6 +1445,7 @@ elif selected_menu == "💵 Monitor Gaji":
         st.subheader("3️⃣ Breakdown Pengeluaran dalam Periode")
         
         if not df_expense_period.empty:
+            px = lazy_import('plotly.express')
             col_chart1, col_chart2 = st.columns([3, 2])
             
             with col_chart1:
@@ -1470,7 +1564,7 @@ elif selected_menu == "💰 Budget Planner":
             st.write("")
             st.write("")
             if st.button("📥 Catat Pemasukan", use_container_width=True):
-                success, message = add_transaction_optimized({
+                gaji_data = {
                     "Tanggal": datetime.today().strftime("%Y-%m-%d"),
                     "Item": "Gaji Bulanan",
                     "Kategori": "Gaji",
@@ -1479,10 +1573,12 @@ elif selected_menu == "💰 Budget Planner":
                     "Status": "Lunas",
                     "Keterangan": "Budget Planner",
                     "Metode Pembayaran": "Livin (Mandiri)"
-                })
+                }
+                success, message = add_transaction_optimized(gaji_data, op_key=operation_key("catat_gaji", gaji_data))
                 if success:
+                    reset_operation_key("catat_gaji")
                     st.toast("Gaji berhasil dicatat!", icon="✅")
-                    df, df_wallet_initial, df_target, df_recurring_initial = get_cached_data()
+                    df = get_table('transaksi')
                     st.rerun()
                 else:
                     st.error(message)
@@ -1536,7 +1632,7 @@ elif selected_menu == "💰 Budget Planner":
                 
                 # Show variance details
                 with st.expander("📋 Lihat Detail Variance"):
-                    actual = df_budget_period[df_budget_period['Tipe'] == 'Pengeluaran'].groupby('Kategori')['Nominal'].sum()
+                    actual = df_budget_period[(df_budget_period['Tipe'] == 'Pengeluaran') & ~df_budget_period[TRANSFER_MASK_COLUMN]].groupby('Kategori')['Nominal'].sum()
                     
                     for cat in allocations.keys():
                         budget_val = allocations[cat]
@@ -1568,6 +1664,7 @@ elif selected_menu == "💰 Budget Planner":
 # ---------------- SCREEN 5: TRANSAKSI RUTIN (RECURRING) ----------------
 elif selected_menu == "🔄 Transaksi Rutin":
     st.title("🔄 Transaksi Rutin (Recurring)")
+    df_recurring_initial = get_table('recurring')
     st.markdown("Kelola transaksi yang berulang setiap bulan seperti langganan, tagihan, atau gaji tetap.")
     
     # Display existing recurring transactions
@@ -1633,14 +1730,8 @@ elif selected_menu == "🔄 Transaksi Rutin":
                     
                     df_recurring_updated = pd.concat([df_recurring_initial, new_recurring], ignore_index=True)
                     
-                    # Update to Google Sheets
-                    def update_operation():
-                        return conn.update(worksheet="Recurring", data=df_recurring_updated)
-                    
-                    retry_gsheet_operation(update_operation, max_retries=3, delay=1)
-                    
-                    # Update cache
-                    st.session_state.data_cache['recurring'] = df_recurring_updated
+                    # Update to Google Sheets + cache
+                    get_ledger().save_table('recurring', df_recurring_updated)
                     
                     st.success(f"✅ Transaksi rutin '{rec_nama}' berhasil ditambahkan!")
                     time.sleep(1)
@@ -1674,12 +1765,7 @@ elif selected_menu == "🔄 Transaksi Rutin":
             
             if st.button("💾 Simpan Perubahan", type="primary"):
                 try:
-                    def update_operation():
-                        return conn.update(worksheet="Recurring", data=edited_recurring)
-                    
-                    retry_gsheet_operation(update_operation, max_retries=3, delay=1)
-                    
-                    st.session_state.data_cache['recurring'] = edited_recurring
+                    get_ledger().save_table('recurring', edited_recurring)
                     st.success("✅ Perubahan berhasil disimpan!")
                     time.sleep(1)
                     st.rerun()
@@ -1689,40 +1775,55 @@ elif selected_menu == "🔄 Transaksi Rutin":
 # ---------------- SCREEN 6: TARGET IMPIAN ----------------
 elif selected_menu == "🎯 Target Impian":
     st.title("🎯 Target & Wishlist")
+    df_target = get_table('target')
     st.markdown("Pantau progress tabunganmu untuk mencapai impian besar (Gadget, Liburan, Kendaraan, dll).")
     
     if not df_target.empty:
-        for i, row in df_target.iterrows():
+        # 🚀 OPTIMASI: Progres, laju menabung, dan ETA semua target dihitung 1x dari TargetIndex
+        progress_target = get_ledger().target_progress()
+        for _, row in progress_target.iterrows():
             nama = row['Nama Impian']
             harga = row['Target Harga']
-            kumpul = row['Dana Terkumpul']
-            
-            if harga > 0:
-                pct = min(kumpul / harga, 1.0)
-            else:
-                pct = 0
+            kumpul = row['Terkumpul']
+            pct = row['Progress (%)'] / 100
             pct_display = int(pct * 100)
-            
+
+            if row['Sisa'] <= 0 and harga > 0:
+                eta_text = "🎉 Tercapai!"
+            elif pd.notna(row['ETA']):
+                eta_text = f"ETA: {row['ETA']:%b %Y}"
+            else:
+                eta_text = f"ETA: - (belum ada setoran {TARGET_RATE_DAYS} hari terakhir)"
+
             st.markdown(f"""
             <div style="background-color: #1a1a1a; padding: 20px; border-radius: 16px; margin-bottom: 5px; border: 1px solid rgba(255,255,255,0.05);">
                 <div style="display: flex; justify-content: space-between; margin-bottom: 5px;">
                     <span style="font-weight: 600; font-size: 18px;">{nama}</span>
                     <span style="color: #10B981; font-weight: bold;">{pct_display}%</span>
                 </div>
-                <div style="display: flex; justify-content: space-between; font-size: 12px; opacity: 0.7; margin-bottom: 15px;">
+                <div style="display: flex; justify-content: space-between; font-size: 12px; opacity: 0.7; margin-bottom: 5px;">
                     <span>Terkumpul: Rp {kumpul:,.0f}</span>
                     <span>Target: Rp {harga:,.0f}</span>
                 </div>
+                <div style="display: flex; justify-content: space-between; font-size: 12px; opacity: 0.7; margin-bottom: 15px;">
+                    <span>Dana awal Rp {row['Dana Awal']:,.0f} + transaksi Rp {row['Dari Transaksi']:,.0f} · ~Rp {row['Tabungan / Bulan']:,.0f}/bulan</span>
+                    <span>{eta_text}</span>
+                </div>
             """, unsafe_allow_html=True)
             st.progress(pct)
             st.markdown("</div>", unsafe_allow_html=True)
+
+        untracked = get_ledger().targets().untracked(df_target)
+        if untracked:
+            st.warning(f"⚠️ Ada transaksi ber-tag target yang tidak ada di daftar: {', '.join(untracked)}. Ubah tag-nya di menu Data Lengkap.")
     else:
         st.info("Kamu belum memiliki target impian. Yuk buat satu di bawah!")
 
     st.divider()
     
     with st.expander("⚙️ Kelola Target Impian", expanded=True):
-        st.info("💡 **Cara Edit:** Tambahkan impian baru di baris kosong paling bawah. Update jumlah tabunganmu di kolom 'Dana Terkumpul'.")
+        st.info("💡 **Cara Edit:** Tambahkan impian baru di baris kosong paling bawah. Setoran otomatis terhitung dari transaksi kategori Saving yang di-tag ke target (form input / kolom Target di Data Lengkap).")
+        st.caption("'Dana Terkumpul' di sini = dana awal di luar transaksi (mis. tabungan sebelum pakai aplikasi). Mengganti nama target memutus tag transaksinya.")
         edited_target = st.data_editor(
             df_target,
             column_config={
@@ -1738,12 +1839,7 @@ elif selected_menu == "🎯 Target Impian":
         if st.button("💾 Simpan Target", type="primary"):
             with st.spinner("⏳ Menyimpan ke Google Sheets..."):
                 try:
-                    def update_operation():
-                        return conn.update(worksheet="Target", data=edited_target)
-                    
-                    retry_gsheet_operation(update_operation, max_retries=3, delay=1)
-                    
-                    st.session_state.data_cache['target'] = edited_target
+                    get_ledger().save_table('target', edited_target)
                     st.success("✅ Target impian berhasil diperbarui!")
                     time.sleep(1)
                     st.rerun()
@@ -1762,141 +1858,97 @@ elif selected_menu == "📁 Data Lengkap":
         df_filtered_view = pd.DataFrame()
 
     # E-STATEMENT PDF
-    if not df_filtered_view.empty:
+    if not df.empty:
         st.markdown("### 📥 Download E-Statement (PDF)")
-        st.caption(f"Cetak laporan resmi keuanganmu ala Bank untuk bulan {selected_month} {selected_year}.")
-        
-        def create_pdf(df_laporan, month, year):
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_auto_page_break(auto=True, margin=15)
-            
-            pdf.set_font("Arial", 'B', 16)
-            pdf.set_text_color(37, 99, 235)
-            pdf.cell(0, 8, "BENTO PRO OPTIMIZED", ln=True, align='R')
-            pdf.set_font("Arial", '', 10)
-            pdf.set_text_color(100, 100, 100)
-            pdf.cell(0, 5, "PERSONAL FINANCE STATEMENT", ln=True, align='R')
-            pdf.ln(5)
-            
-            pdf.set_font("Arial", 'B', 12)
-            pdf.set_text_color(0, 0, 0)
-            pdf.cell(0, 6, "Laporan Rekening / Statement of Account", ln=True, align='L')
-            
-            month_idx = list(calendar.month_name).index(month)
-            last_day = calendar.monthrange(int(year), month_idx)[1]
-            pdf.set_font("Arial", '', 10)
-            pdf.cell(0, 6, f"Periode: 01 {month} {year} - {last_day} {month} {year}", ln=True, align='L')
-            pdf.ln(5)
-            
-            pdf.set_font("Arial", '', 10)
-            pdf.cell(30, 6, "Jenis Produk", border=0)
-            pdf.cell(0, 6, ": Bento Finance Tracker", border=0, ln=True)
-            pdf.cell(30, 6, "Nama", border=0)
-            pdf.cell(0, 6, ": Pengguna Utama", border=0, ln=True)
-            pdf.cell(30, 6, "Mata Uang", border=0)
-            pdf.cell(0, 6, ": IDR", border=0, ln=True)
-            pdf.ln(5)
-            
-            pdf.set_font("Arial", 'B', 9)
-            pdf.set_fill_color(37, 99, 235)
-            pdf.set_text_color(255, 255, 255)
-            pdf.cell(20, 8, "Tanggal", border=1, fill=True, align='C')
-            pdf.cell(75, 8, "Deskripsi", border=1, fill=True, align='C')
-            pdf.cell(30, 8, "Debit", border=1, fill=True, align='C')
-            pdf.cell(30, 8, "Kredit", border=1, fill=True, align='C')
-            pdf.cell(35, 8, "Saldo", border=1, fill=True, align='C')
-            pdf.ln()
-            
-            df_sorted = df_laporan.sort_values('Tanggal', ascending=True).copy()
-            pdf.set_font("Arial", '', 8)
-            pdf.set_text_color(0, 0, 0)
-            running_balance = 0
-            total_kredit = 0
-            total_debit = 0
-            
-            for i, row in df_sorted.iterrows():
-                tgl = pd.to_datetime(row['Tanggal']).strftime('%d/%m/%Y')
-                desc_raw = f"{row['Item']} ({row['Metode Pembayaran']})"
-                desc = desc_raw[:45]
-                debit_str = ""
-                kredit_str = ""
-                
-                if row['Tipe'] == 'Pengeluaran':
-                    nom = row['Nominal']
-                    debit_str = f"{nom:,.2f}"
-                    total_debit += nom
-                    running_balance -= nom
-                else:
-                    nom = row['Nominal']
-                    kredit_str = f"{nom:,.2f}"
-                    total_kredit += nom
-                    running_balance += nom
-                    
-                saldo_str = f"{running_balance:,.2f}"
-                pdf.cell(20, 7, tgl, border=1, align='C')
-                pdf.cell(75, 7, desc, border=1, align='L')
-                pdf.cell(30, 7, debit_str, border=1, align='R')
-                pdf.cell(30, 7, kredit_str, border=1, align='R')
-                pdf.cell(35, 7, saldo_str, border=1, align='R')
-                pdf.ln()
-
-            pdf.ln(5)
-            pdf.set_font("Arial", 'B', 9)
-            pdf.cell(40, 6, "Total Debit", border=0)
-            pdf.cell(50, 6, f"IDR {total_debit:,.2f}", border=0, ln=True)
-            pdf.cell(40, 6, "Total Kredit", border=0)
-            pdf.cell(50, 6, f"IDR {total_kredit:,.2f}", border=0, ln=True)
-            pdf.cell(40, 6, "Net Saldo Bulan Ini", border=0)
-            pdf.cell(50, 6, f"IDR {running_balance:,.2f}", border=0, ln=True)
-            
-            pdf.ln(10)
-            pdf.set_font("Arial", 'I', 8)
-            pdf.set_text_color(150, 150, 150)
-            pdf.cell(0, 5, "IMPORTANT!", ln=True)
-            pdf.cell(0, 5, "Dokumen e-statement ini di-generate secara otomatis oleh sistem aplikasi Bento Pro.", ln=True)
-            pdf.cell(0, 5, "Data keuangan Anda bersifat rahasia. Jangan membagikannya dengan alasan apa pun.", ln=True)
-            
-            return pdf.output(dest='S').encode('latin-1')
-
-        pdf_bytes = create_pdf(df_filtered_view, selected_month, selected_year)
-        st.download_button(
-            label="📄 Download E-Statement (.pdf)", data=pdf_bytes,
-            file_name=f"E-Statement_BentoPro_{selected_month}_{selected_year}.pdf",
-            mime="application/pdf", use_container_width=True
+        st.caption("Cetak laporan resmi keuanganmu ala Bank untuk rentang tanggal dan wallet pilihan.")
+
+        col_st1, col_st2, col_st3 = st.columns(3)
+        with col_st1:
+            statement_start = st.date_input("Dari Tanggal", value=start_date.date(), key="statement_start")
+        with col_st2:
+            statement_end = st.date_input("Sampai Tanggal", value=end_date.date(), key="statement_end")
+        with col_st3:
+            statement_wallet = st.selectbox("Wallet", ["Semua Wallet"] + METODE_PEMBAYARAN, key="statement_wallet")
+
+        statement_start_dt = datetime.combine(statement_start, datetime.min.time())
+        statement_end_dt = datetime.combine(statement_end, datetime.max.time())
+        wallet_filter = None if statement_wallet == "Semua Wallet" else statement_wallet
+
+        # PDF di-generate di background hanya saat diminta, lalu di-cache per (range, wallet, versi data)
+        statement_key = ('statement', statement_start, statement_end, wallet_filter, get_data_version())
+        wallet_suffix = f"_{wallet_filter.split(' ')[0]}" if wallet_filter else ""
+        render_report_job(
+            statement_key, "E-Statement", "📄 Siapkan E-Statement", "prepare_statement",
+            f"E-Statement_BentoPro_{statement_start.strftime('%Y%m%d')}_{statement_end.strftime('%Y%m%d')}{wallet_suffix}.pdf",
+            "application/pdf",
+            create_statement_pdf,
+            lambda: (get_ledger().history(statement_start_dt), statement_start_dt, statement_end_dt, wallet_filter,
+                     *get_ledger().statement_balances(statement_start_dt, statement_end_dt, wallet_filter))
         )
         st.divider()
 
-    # TIGA TAB UTAMA
-    tab_tabel, tab_cari, tab_utang = st.tabs(["📋 Tabel (Edit & Hapus)", "🔍 Cari & Filter", "💸 Kelola Utang"])
+    # 🚀 NEW: Arsip transaksi lama agar sheet Transaksi tetap kecil
+    with st.expander("🗄️ Arsip Transaksi Lama", expanded=False):
+        ledger = get_ledger()
+        archived_years = ledger.archived_years()
+        st.caption(f"Sheet Transaksi berisi {len(df):,} baris. "
+                   f"Arsip: {', '.join(map(str, archived_years)) if archived_years else 'belum ada'}.")
+        st.caption("Utang 'Belum Lunas' dan transaksi sejak Tanggal Reset wallet paling awal tetap di sheet Transaksi. "
+                   "Pencarian global, total all-time, dan e-statement tetap membaca arsip.")
+        default_cutoff = (pd.Timestamp.today() - pd.DateOffset(months=ARCHIVE_KEEP_MONTHS)).date()
+        archive_cutoff = st.date_input("Arsipkan transaksi sebelum bulan", value=default_cutoff, key="archive_cutoff")
+        if st.button("🗄️ Arsipkan Sekarang", key="archive_commit"):
+            with st.spinner("⏳ Memindahkan transaksi ke arsip..."):
+                success, message = ledger.archive_before(archive_cutoff)
+            if success:
+                st.toast(message, icon="🗄️")
+                st.rerun()
+            else:
+                st.warning(message)
+
+    # TAB UTAMA
+    tab_tabel, tab_cari, tab_utang, tab_duplikat = st.tabs(["📋 Tabel (Edit & Hapus)", "🔍 Cari & Filter", "💸 Kelola Utang", "🧬 Cek Duplikat"])
 
     # TAB 1: TABEL TRANSAKSI
     with tab_tabel:
-        st.info("💡 **Cara Edit:** Klik sel untuk mengubah teks. **Cara Hapus:** Centang kotak paling kiri, lalu klik ikon 🗑️ di atas tabel. Jangan lupa klik Simpan.")
+        st.info("💡 **Cara Edit:** Klik sel untuk mengubah teks. **Cara Hapus:** Centang kotak paling kiri, lalu klik ikon 🗑️ di atas tabel. Simpan dulu sebelum pindah halaman.")
+        st.caption("🔄 Transfer antar dompet: ubah Tanggal/Nominal/Status atau hapus salah satu baris, pasangannya ikut disesuaikan.")
         if not df_filtered_view.empty:
-            cols_to_show = ["Tanggal", "Item", "Kategori", "Nominal", "Tipe", "Status", "Keterangan", "Metode Pembayaran"]
-            df_to_edit = df_filtered_view[cols_to_show].copy()
+            table_sort_options = {"Terbaru Dicatat": "ID", "Tanggal": "Tanggal", "Nominal": "Nominal", "Item": "Item"}
+            page, sort_by, ascending = pagination_controls(len(df_filtered_view), "tabel_page", table_sort_options)
+
+            # 🚀 OPTIMASI: Hanya halaman aktif yang dikirim ke browser
+            cols_to_show = ["ID", "Tanggal", "Item", "Kategori", "Nominal", "Tipe", "Status", "Keterangan", "Metode Pembayaran", TARGET_LINK_COLUMN]
+            df_page, _ = paginate_dataframe(df_filtered_view[cols_to_show], page, sort_by=sort_by, ascending=ascending)
             semua_kategori = list(dict.fromkeys(KATEGORI_PEMASUKAN + KATEGORI_PENGELUARAN))
+            # Tag lama (mis. target yang sudah di-rename) tetap jadi opsi agar tidak terhapus saat simpan
+            semua_target = list(dict.fromkeys([""] + list(get_table('target').get('Nama Impian', [])) + list(df_filtered_view[TARGET_LINK_COLUMN])))
             
             edited_df = st.data_editor(
-                df_to_edit,
+                df_page,
                 column_config={
+                    "ID": st.column_config.NumberColumn("ID", disabled=True),
                     "Tanggal": st.column_config.DateColumn("Tanggal", format="DD MMM YYYY", required=True),
                     "Nominal": st.column_config.NumberColumn("Nominal", format="Rp %d", required=True),
                     "Tipe": st.column_config.SelectboxColumn("Tipe", options=["Pemasukan", "Pengeluaran"], required=True),
                     "Kategori": st.column_config.SelectboxColumn("Kategori", options=semua_kategori, required=True),
                     "Status": st.column_config.SelectboxColumn("Status", options=["Lunas", "Belum Lunas"], required=True),
-                    "Metode Pembayaran": st.column_config.SelectboxColumn("Metode", options=["-"] + METODE_PEMBAYARAN, required=True)
+                    "Metode Pembayaran": st.column_config.SelectboxColumn("Metode", options=["-"] + METODE_PEMBAYARAN, required=True),
+                    TARGET_LINK_COLUMN: st.column_config.SelectboxColumn("Target", options=semua_target)
                 },
-                num_rows="dynamic", hide_index=False, use_container_width=True, key="editor_transaksi_lengkap"  # data_editor masih pakai use_container_width
+                num_rows="dynamic", hide_index=True, use_container_width=True,  # data_editor masih pakai use_container_width
+                key=f"editor_transaksi_lengkap_{page}_{sort_by}_{ascending}_{get_data_version()}"
             )
             
             if st.button("💾 Simpan Perubahan Data", type="primary"):
-                # 🚀 OPTIMASI: Gunakan batch update
-                success, message = update_transactions_batch(edited_df, selected_month, selected_year)
+                # 🚀 OPTIMASI: Edit dipetakan balik lewat ID, hanya halaman ini yang diproses
+                success, message = update_transactions_by_id(
+                    df_page['ID'].tolist(), edited_df, op_key=operation_key("edit_transaksi", edited_df)
+                )
                 if success:
+                    reset_operation_key("edit_transaksi")
                     st.toast("✅ Perubahan tabel berhasil disimpan!", icon="🍱")
-                    df, df_wallet_initial, df_target, df_recurring_initial = get_cached_data()
+                    df = get_table('transaksi')
                     st.rerun()
                 else:
                     st.error(message)
@@ -1908,7 +1960,7 @@ elif selected_menu == "📁 Data Lengkap":
         st.markdown("### 🔍 Rekap & Pencarian Spesifik")
         
         search_global = st.toggle("🌍 Cari di seluruh riwayat data (semua bulan)", value=False)
-        df_source = df.copy() if search_global else df_filtered_view.copy()
+        df_source = get_ledger().full_history() if search_global else df_filtered_view  # Termasuk arsip
         
         if not df_source.empty:
             c1, c2, c3 = st.columns(3)
@@ -1926,8 +1978,9 @@ elif selected_menu == "📁 Data Lengkap":
             st.divider()
             
             # Hitung Total
-            tot_in = df_result[df_result['Tipe'] == 'Pemasukan']['Nominal'].sum()
-            tot_out = df_result[df_result['Tipe'] == 'Pengeluaran']['Nominal'].sum()
+            df_result_real = df_result[~df_result[TRANSFER_MASK_COLUMN]]
+            tot_in = df_result_real[df_result_real['Tipe'] == 'Pemasukan']['Nominal'].sum()
+            tot_out = df_result_real[df_result_real['Tipe'] == 'Pengeluaran']['Nominal'].sum()
             jum_trans = len(df_result)
             
             cc1, cc2, cc3 = st.columns(3)
@@ -1937,9 +1990,12 @@ elif selected_menu == "📁 Data Lengkap":
             
             st.write("")
             
+            search_sort_options = {"Tanggal": "Tanggal", "Nominal": "Nominal", "Item": "Item", "Terbaru Dicatat": "ID"}
+            page, sort_by, ascending = pagination_controls(jum_trans, "cari_page", search_sort_options)
             cols_show = ["Tanggal", "Item", "Kategori", "Nominal", "Tipe", "Metode Pembayaran", "Keterangan"]
+            df_result_page, _ = paginate_dataframe(df_result, page, sort_by=sort_by, ascending=ascending)
             st.dataframe(
-                df_result[cols_show].sort_values('Tanggal', ascending=False),
+                df_result_page[cols_show],
                 column_config={
                     "Tanggal": st.column_config.DateColumn("Tanggal", format="DD MMM YYYY"),
                     "Nominal": st.column_config.NumberColumn("Nominal", format="Rp %d")
@@ -1951,77 +2007,52 @@ elif selected_menu == "📁 Data Lengkap":
 
     # TAB 3: TABEL UTANG
     with tab_utang:
-        st.info("💡 Ubah Status ke **'Lunas'** DAN pilih **Metode Pembayaran** (sumber dana). Lalu klik Update.")
-        st.caption("⚙️ Cara Kerja: Saat tanggungan dilunasi, saldo dompet yang dipilih akan otomatis berkurang sesuai nominal utang.")
-        df_unpaid = df[df['Status'] == 'Belum Lunas'].copy()
+        st.info("💡 Isi **Bayar Sekarang** untuk cicilan, atau centang **Lunasi** untuk melunasi sisa utang. Pilih **Metode Pembayaran** (sumber dana), lalu klik Update.")
+        st.caption("⚙️ Cara Kerja: Pembayaran mengurangi saldo dompet yang dipilih. Cicilan dicatat sebagai transfer dari dompet ke akun utang di tanggal bayar: sisa utang berkurang, pengeluaran tetap tercatat 1x di bulan utang dibuat.")
+        # 🚀 OPTIMASI: Daftar utang dari DebtIndex (di-patch tiap commit), bukan scan ulang Status
+        df_unpaid = get_ledger().debts().table()
         
         if not df_unpaid.empty:
+            df_unpaid['Bayar Sekarang'] = 0.0
+            df_unpaid['Lunasi'] = False
+            df_unpaid['Metode Pembayaran'] = "-"
             editor = st.data_editor(
                 df_unpaid,
                 column_config={
-                    "Status": st.column_config.SelectboxColumn(options=["Belum Lunas", "Lunas"], required=True),
-                    "Metode Pembayaran": st.column_config.SelectboxColumn(options=METODE_PEMBAYARAN, required=True),
-                    "Nominal": st.column_config.NumberColumn(format="Rp %d"),
+                    "Bayar Sekarang": st.column_config.NumberColumn("Bayar Sekarang", format="Rp %d", min_value=0),
+                    "Lunasi": st.column_config.CheckboxColumn("Lunasi"),
+                    "Metode Pembayaran": st.column_config.SelectboxColumn(options=["-"] + METODE_PEMBAYARAN, required=True),
+                    "Total Awal": st.column_config.NumberColumn(format="Rp %d"),
+                    "Sudah Dibayar": st.column_config.NumberColumn(format="Rp %d"),
+                    "Sisa": st.column_config.NumberColumn(format="Rp %d"),
+                    "Progress (%)": st.column_config.ProgressColumn("Progress", format="%.0f%%", min_value=0, max_value=100),
                     "Tanggal": st.column_config.DateColumn(format="DD MMM YYYY")
                 },
-                disabled=["Tanggal", "Item", "Nominal", "Kategori", "Tipe", "ID"], 
-                column_order=["Tanggal", "Item", "Nominal", "Status", "Metode Pembayaran"],
-                hide_index=True, use_container_width=True, key="utang_editor"  # data_editor masih pakai use_container_width
+                disabled=["Tanggal", "Item", "Total Awal", "Sudah Dibayar", "Sisa", "Progress (%)", "Kategori", "ID"],
+                column_order=["Tanggal", "Item", "Total Awal", "Sudah Dibayar", "Sisa", "Progress (%)", "Bayar Sekarang", "Lunasi", "Metode Pembayaran"],
+                hide_index=True, use_container_width=True, key=f"utang_editor_{get_data_version()}"  # data_editor masih pakai use_container_width
             )
+            st.caption(f"Total sisa utang: **Rp {get_ledger().debts().total:,.0f}** dari {len(df_unpaid)} tanggungan")
+            payment_date = st.date_input("Tanggal Bayar (untuk cicilan)", value=datetime.today(), key="utang_tanggal_bayar")
             
             if st.button("🔄 Update Pelunasan", type="primary"):
                 with st.spinner("⏳ Menyimpan perubahan..."):
                     try:
-                        # Gunakan cache lokal
-                        orig = st.session_state.data_cache['transaksi'].copy()
-                        orig_no_compute = orig.drop(columns=['Month', 'Year'], errors='ignore').copy()
-                        orig_no_compute['Tanggal_Match'] = pd.to_datetime(orig_no_compute['Tanggal'], errors='coerce').dt.strftime('%Y-%m-%d')
-                        changes_count = 0
-                        
-                        payment_summary = {}  # Track total per payment method
-                        
-                        for i, row in editor.iterrows():
-                            if row['Status'] == 'Lunas':
-                                if row['Metode Pembayaran'] == "-" or row['Metode Pembayaran'] is None:
-                                    st.warning(f"⚠️ Harap pilih Metode Pembayaran untuk item: {row['Item']}")
-                                    continue
-                                
-                                target_date = pd.to_datetime(row['Tanggal']).strftime('%Y-%m-%d')
-                                mask = ((orig_no_compute['Tanggal_Match'] == target_date) & (orig_no_compute['Item'] == row['Item']) & 
-                                        (orig_no_compute['Nominal'] == row['Nominal']) & (orig_no_compute['Status'] == 'Belum Lunas'))
-                                
-                                if mask.any():
-                                    orig_no_compute.loc[mask, 'Status'] = 'Lunas'
-                                    orig_no_compute.loc[mask, 'Metode Pembayaran'] = row['Metode Pembayaran']
-                                    changes_count += 1
-                                    
-                                    # Track payment per wallet
-                                    wallet = row['Metode Pembayaran']
-                                    if wallet not in payment_summary:
-                                        payment_summary[wallet] = 0
-                                    payment_summary[wallet] += row['Nominal']
-                        
-                        if changes_count > 0:
-                            orig_no_compute = orig_no_compute.drop(columns=['Tanggal_Match'])
-                            orig_no_compute['Tanggal'] = pd.to_datetime(orig_no_compute['Tanggal']).dt.strftime('%Y-%m-%d')
-                            
-                            # Update dengan retry logic
-                            def update_operation():
-                                return conn.update(worksheet="Transaksi", data=orig_no_compute)
-                            
-                            retry_gsheet_operation(update_operation, max_retries=3, delay=1)
-                            
-                            # Update cache transaksi dengan data yang sudah di-update
-                            # Re-parse dan tambahkan computed columns
-                            cache_df = orig_no_compute.copy()
-                            cache_df['Tanggal'] = pd.to_datetime(cache_df['Tanggal'], errors='coerce')
-                            cache_df['Nominal'] = pd.to_numeric(cache_df['Nominal'], errors='coerce').fillna(0)
-                            cache_df['Month'] = cache_df['Tanggal'].dt.month_name()
-                            cache_df['Year'] = cache_df['Tanggal'].dt.year
-                            st.session_state.data_cache['transaksi'] = cache_df
-                            st.session_state.data_cache['last_update'] = datetime.now()
-                            
-                            st.success(f"✅ Berhasil melunasi {changes_count} transaksi!")
+                        paying = editor[editor['Lunasi'] | (editor['Bayar Sekarang'].fillna(0) > 0)]
+                        # Lunasi = bayar seluruh sisa (Bayar kosong); selain itu cicilan sebesar Bayar Sekarang
+                        payments = paying[['ID', 'Item', 'Metode Pembayaran']].assign(
+                            Bayar=paying['Bayar Sekarang'].where(~paying['Lunasi'])
+                        )
+                        ok, message, payment_summary, missing_method = get_ledger().pay_debts(
+                            payments, payment_date, op_key=operation_key("pelunasan", payments.assign(Tanggal_Bayar=str(payment_date)))
+                        )
+                        if ok:
+                            reset_operation_key("pelunasan")
+                        for item in missing_method:
+                            st.warning(f"⚠️ Harap pilih Metode Pembayaran untuk item: {item}")
+
+                        if ok:
+                            st.success(f"✅ {message}")
                             
                             # Show payment summary
                             if payment_summary:
@@ -2038,10 +2069,71 @@ elif selected_menu == "📁 Data Lengkap":
                             with col2:
                                 if st.button("🔄 Refresh & Tutup", type="primary", use_container_width=True):
                                     st.rerun()
+                        elif message:
+                            st.error(f"❌ {message}")
                         else:
-                            st.info("💡 Tidak ada perubahan. Pastikan Anda sudah mengubah Status ke 'Lunas' dan memilih Metode Pembayaran.")
+                            st.info("💡 Tidak ada perubahan. Pastikan Anda sudah mengisi Bayar Sekarang / mencentang Lunasi dan memilih Metode Pembayaran.")
                     except Exception as e:
                         st.error(f"❌ Error Update: {e}")
                         st.info("💡 Refresh halaman dan coba lagi jika koneksi bermasalah.")
         else:
             st.success("🎉 Tidak ada tanggungan utang saat ini!")
+
+    # TAB 4: CEK DUPLIKAT
+    with tab_duplikat:
+        st.markdown("### 🧬 Transaksi Terindikasi Duplikat")
+        st.caption("Transaksi dengan Item, Nominal, Tipe, dan Metode yang sama dalam rentang hari yang berdekatan (seluruh riwayat).")
+
+        dup_window = st.number_input("Toleransi selisih tanggal (hari)", min_value=0, max_value=30, value=DUPLICATE_WINDOW_DAYS, step=1, key="dup_window")
+
+        if not df.empty:
+            df_dup_clusters = find_duplicate_clusters(df, dup_window)
+            if df_dup_clusters.empty:
+                st.success("🎉 Tidak ada transaksi duplikat!")
+            else:
+                n_clusters = df_dup_clusters['Cluster'].nunique()
+                extra_rows = len(df_dup_clusters) - n_clusters
+                extra_nominal = df_dup_clusters['Nominal'].sum() - df_dup_clusters.groupby('Cluster')['Nominal'].first().sum()
+
+                d1, d2, d3 = st.columns(3)
+                d1.metric("🧬 Kelompok Duplikat", f"{n_clusters:,}")
+                d2.metric("📝 Baris Berlebih", f"{extra_rows:,}")
+                d3.metric("💸 Potensi Nominal Ganda", f"Rp {extra_nominal:,.0f}")
+
+                st.dataframe(
+                    df_dup_clusters[['Cluster', 'Tanggal', 'Item', 'Nominal', 'Tipe', 'Metode Pembayaran', 'Keterangan']].sort_values(['Cluster', 'Tanggal']),
+                    column_config={
+                        "Tanggal": st.column_config.DateColumn("Tanggal", format="DD MMM YYYY"),
+                        "Nominal": st.column_config.NumberColumn("Nominal", format="Rp %d")
+                    },
+                    hide_index=True, use_container_width=True
+                )
+                st.info("💡 Hapus baris yang ganda lewat tab **📋 Tabel (Edit & Hapus)** pada bulan yang sesuai.")
+        else:
+            st.info("Belum ada data transaksi.")
+
+# ⏱️ Catat durasi run ini untuk laporan startup di sidebar
+st.session_state.last_run_seconds = time.perf_counter() - _script_started
+
+# 🛠️ Panel profiling: breakdown waktu rerun ini (hanya di Developer Mode)
+if profiler is not None:
+    with st.sidebar:
+        with st.expander("🛠️ Profiling Rerun Ini", expanded=True):
+            df_spans, ms_per_category = profiler.summary()
+            wall_ms = profiler.wall_ms()
+            st.caption(f"Wall time: {wall_ms:,.0f} ms • {len(df_spans)} span")
+            for category, ms in ms_per_category.items():
+                st.caption(f"`{category}`: {ms:,.0f} ms")
+            st.caption(f"`render/lainnya`: {max(wall_ms - ms_per_category.sum(), 0):,.0f} ms")
+            if not df_spans.empty:
+                st.dataframe(
+                    df_spans[['name', 'category', 'ms', 'rows', 'cache']].sort_values('ms', ascending=False),
+                    column_config={"ms": st.column_config.NumberColumn("ms", format="%.1f")},
+                    hide_index=True, use_container_width=True
+                )
+        with st.expander("📈 Storage Metrics"):
+            metrics_text = STORAGE_METRICS.render()
+            st.code(metrics_text, language="text")
+            st.download_button("💾 Download metrics.prom", metrics_text, file_name="metrics.prom",
+                               mime="text/plain", use_container_width=True)
+    profiling.deactivate()
@@ -0,0 +1,56 @@
+"""Bento core: engine ledger tanpa Streamlit
+
+Dipakai oleh app.py (UI), tapi bisa juga di-import langsung untuk batch job,
+benchmark, atau script migrasi:
+
+    from bento_core import Ledger, MemoryStorage
+    ledger = Ledger(MemoryStorage({"Transaksi": df}))
+    ledger.add_transaction({...})
+"""
+from .config import KATEGORI_PEMASUKAN, KATEGORI_PENGELUARAN, KATEGORI_TRANSFER, METODE_PEMBAYARAN, ANALISIS_EXCLUDE_ITEMS
+from .lazy import IMPORT_TIMINGS, lazy_import
+from .profiling import Profiler, span, timed
+from .metrics import STORAGE_METRICS, StorageMetrics, serve_metrics
+from .storage import retry_operation, SheetStorage, MemoryStorage, FlakyStorage
+from .resilience import (
+    BackendUnavailable, is_retryable_error, jittered_backoff, TokenBucket, CircuitBreaker, ResilientStorage,
+)
+from .archive import ARCHIVE_SUMMARY_COLUMNS, ARCHIVE_KEEP_MONTHS, SheetArchive, FileArchive, month_start, summarize_archive
+from .checkpoints import CHECKPOINT_COLUMNS, seed_checkpoints, latest_checkpoints, balances_at, month_end_checkpoints
+from .running import RunningBalance
+from .transfers import (
+    TRANSFER_ID_COLUMN, TRANSFER_MASK_COLUMN, TRANSFER_SYNC_COLUMNS, transfer_id_for, mark_transfers,
+    link_transfer_pairs, sync_transfer_partners, with_transfer_partners,
+)
+from .comparison import (
+    MONTHLY_TOTAL_COLUMNS, COMPARISON_MODES, ROLLING_WINDOWS, build_monthly_totals, monthly_pivot,
+    period_months, compare_periods, rolling_averages, year_month_grid,
+)
+from .debts import (
+    DEBT_ID_COLUMN, DEBT_STATUS, DEBT_COLUMNS, DEBT_ACCOUNT, debt_link_for, debt_ids_from_links, mark_debts, DebtIndex,
+    apply_debt_payments,
+)
+from .targets import TARGET_LINK_COLUMN, TARGET_ROW_COLUMNS, TARGET_RATE_DAYS, mark_targets, TargetIndex
+from .ledger import (
+    TABLE_NAMES, WORKSHEETS, TARGET_COLUMNS, RECURRING_COLUMNS, OP_KEY_COLUMN,
+    new_operation_key, derive_operation_key, RecentKeyIndex,
+    next_transaction_id, ensure_transaction_ids, prepare_transaksi, touched_rows, to_sheet_format, Ledger,
+)
+from .queries import (
+    get_month_year_filter, filter_data_efficient, sort_by_latest_record, search_transactions_optimized,
+    filter_by_date_range, INCOME_INDEX_COLUMNS, build_income_index, slice_by_date, summarize_selection,
+    TABLE_PAGE_SIZE, paginate_dataframe, compute_wallet_balances,
+)
+from .charts import build_cash_flow_links, create_sankey_diagram, create_budget_vs_actual_chart, create_calendar_heatmap
+from .spending import compile_exclusion, DailySpend, build_daily_spend
+from .importer import IMPORT_SOURCES, IMPORT_KATEGORI_RULES, parse_amount_series, guess_kategori, read_statement_file, parse_statement
+from .duplicates import (
+    DUPLICATE_WINDOW_DAYS, normalize_item_text, transaction_fingerprints, build_duplicate_index,
+    find_possible_duplicates, find_duplicate_clusters,
+)
+from .reconcile import RECONCILE_TOLERANCE, reconcile_points, divergence_interval, next_probe_date, find_candidates, reconcile_wallet
+from .reports import (
+    export_to_excel, STREAMING_EXPORT_THRESHOLD, EXPORT_CHUNK_SIZE, compute_export_aggregates,
+    export_to_excel_streaming, prepare_statement_rows, iter_statement_pages, create_statement_pdf,
+)
+from .jobs import REPORT_CACHE_MAX_BYTES, ArtifactStore, ReportJobRunner
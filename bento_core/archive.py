@@ -0,0 +1,65 @@
+"""Arsip transaksi lama (cold store per tahun) + ringkasan yang tetap disimpan di sheet utama
+
+Transaksi periode tertutup dipindah dari sheet Transaksi ke arsip per tahun, jadi
+sheet yang di-download / di-upload tiap simpan tetap kecil. Ringkasan per bulan x
+wallet x kategori x tipe tetap "panas" untuk total all-time tanpa membaca arsip.
+"""
+import os
+
+import pandas as pd
+
+ARCHIVE_SUMMARY_COLUMNS = ['Periode', 'Metode Pembayaran', 'Kategori', 'Tipe', 'Nominal', 'Jumlah', 'ID Max']
+ARCHIVE_KEEP_MONTHS = 12  # Default: transaksi lebih tua dari 12 bulan boleh diarsipkan
+
+class SheetArchive:
+    """Arsip per tahun di worksheet 'Arsip <tahun>' pada storage yang sama"""
+
+    def __init__(self, storage, prefix="Arsip"):
+        self.storage = storage
+        self.prefix = prefix
+
+    def worksheet(self, year):
+        return f"{self.prefix} {year}"
+
+    def read(self, year):
+        return self.storage.read(self.worksheet(year))
+
+    def write(self, year, df):
+        self.storage.update(self.worksheet(year), df)
+
+class FileArchive:
+    """Arsip per tahun sebagai CSV terkompresi gzip di 1 folder (transaksi_<tahun>.csv.gz)"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, year):
+        return os.path.join(self.directory, f"transaksi_{year}.csv.gz")
+
+    def read(self, year):
+        path = self.path(year)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_csv(path, compression='gzip', keep_default_na=False, na_values=[''])
+
+    def write(self, year, df):
+        # Tulis ke file sementara lalu rename agar arsip tidak pernah setengah jadi
+        tmp_path = f"{self.path(year)}.tmp"
+        df.to_csv(tmp_path, index=False, compression='gzip')
+        os.replace(tmp_path, self.path(year))
+
+def month_start(date):
+    """Awal bulan dari tanggal (jam 00:00)"""
+    return pd.Timestamp(date).to_period('M').to_timestamp()
+
+def summarize_archive(rows):
+    """Ringkasan transaksi arsip per Periode (YYYY-MM) x wallet x kategori x tipe"""
+    if rows.empty:
+        return pd.DataFrame(columns=ARCHIVE_SUMMARY_COLUMNS)
+    keyed = rows.assign(Periode=rows['Tanggal'].dt.strftime('%Y-%m'))
+    keyed['Metode Pembayaran'] = keyed['Metode Pembayaran'].fillna("-")
+    summary = keyed.groupby(['Periode', 'Metode Pembayaran', 'Kategori', 'Tipe'], dropna=False).agg(
+        Nominal=('Nominal', 'sum'), Jumlah=('ID', 'size'), **{'ID Max': ('ID', 'max')}
+    ).reset_index()
+    return summary[ARCHIVE_SUMMARY_COLUMNS]
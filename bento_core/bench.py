@@ -0,0 +1,178 @@
+"""Benchmark hot path ledger di atas data sintetis
+
+Contoh:
+    python -m bento_core.bench --sizes 1000 10000 100000
+    python -m bento_core.bench --sizes 100000 --save-baseline bench_baseline.json
+    python -m bento_core.bench --sizes 100000 --compare bench_baseline.json
+
+Tiap case dilaporkan: waktu terbaik (detik), throughput (baris/detik), dan peak memory
+(MB, diukur tracemalloc di run terpisah agar overhead-nya tidak masuk ke waktu).
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from .ledger import Ledger
+from .storage import MemoryStorage
+from .synthetic import generate_ledger
+from .queries import filter_data_efficient, filter_by_date_range, search_transactions_optimized
+from .charts import build_cash_flow_links
+from .reports import STREAMING_EXPORT_THRESHOLD, export_to_excel, export_to_excel_streaming, create_statement_pdf
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_REPEATS = 3
+REGRESSION_THRESHOLD = 1.2   # Lebih lambat dari baseline x1.2 dianggap regresi
+EXPORT_DAYS = 90             # Range laporan Excel (hari terakhir)
+STATEMENT_DAYS = 30          # Range e-statement PDF (hari terakhir)
+
+def build_cases(tables):
+    """Daftar (nama, fungsi tanpa argumen, jumlah baris yang diproses)"""
+    ledger = Ledger(MemoryStorage(tables))
+    df = ledger.table('transaksi')
+    df_wallet = ledger.table('dompet')
+    df_target = ledger.table('target')
+
+    end_date = df['Tanggal'].max()
+    month, year = end_date.month_name(), end_date.year
+    df_month = filter_data_efficient(df, month, year)
+    export_start = end_date - pd.Timedelta(days=EXPORT_DAYS)
+    statement_start = end_date - pd.Timedelta(days=STATEMENT_DAYS)
+    # Sama seperti app: exporter menerima baris periode laporan saja, bukan seluruh ledger
+    df_export = filter_by_date_range(df, export_start, end_date)
+    exporter = export_to_excel_streaming if len(df_export) > STREAMING_EXPORT_THRESHOLD else export_to_excel
+
+    wallets = df_wallet['Wallet'].tolist()
+
+    def load_parse():
+        Ledger(MemoryStorage(tables)).table('transaksi')
+
+    def wallet_balances():
+        # Jalur app: checkpoint terdekat + transaksi sesudahnya, dari ledger yang baru di-load
+        Ledger(MemoryStorage(tables)).wallet_balances(end_date)
+
+    def balance_at():
+        # Saldo berjalan dibangun 1x, lalu 1 binary search per wallet (+ global)
+        fresh = Ledger(MemoryStorage(tables))
+        fresh.balance_at(end_date)
+        for wallet in wallets:
+            fresh.balance_at(end_date, wallet)
+
+    return [
+        ('load_parse', load_parse, len(df)),
+        ('filter_data_efficient', lambda: filter_data_efficient(df, month, year), len(df)),
+        ('filter_by_date_range', lambda: filter_by_date_range(df, export_start, end_date), len(df)),
+        ('search_transactions', lambda: search_transactions_optimized(df, "kopi", ["Pengeluaran"]), len(df)),
+        ('wallet_balances', wallet_balances, len(df)),
+        ('balance_at', balance_at, len(df)),
+        ('sankey_links', lambda: build_cash_flow_links(df_month), len(df_month)),
+        ('excel_export', lambda: exporter(df_export, df_wallet, df_target, export_start, end_date), len(df_export)),
+        ('statement_pdf', lambda: create_statement_pdf(df, statement_start, end_date), len(filter_by_date_range(df, statement_start, end_date))),
+    ]
+
+def time_case(func, repeats):
+    """Waktu terbaik dari beberapa kali run"""
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def peak_memory_mb(func):
+    """Peak alokasi Python selama 1 run (MB)"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeats=DEFAULT_REPEATS, seed=42, measure_memory=True, only=None, log=print):
+    """Jalankan semua case untuk tiap ukuran ledger. Return dict hasil (siap di-dump ke JSON)"""
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'repeats': repeats,
+            'seed': seed,
+        },
+        'sizes': {},
+    }
+    for n_rows in sizes:
+        tables = generate_ledger(n_rows, seed=seed)
+        size_result = {}
+        for name, func, rows in build_cases(tables):
+            if only and name not in only:
+                continue
+            try:
+                seconds = time_case(func, repeats)
+            except ImportError as e:
+                # Library opsional (plotly/fpdf/openpyxl) belum terpasang
+                log(f"{n_rows:>9,} {name:<22} dilewati ({e})")
+                continue
+            entry = {'seconds': seconds, 'rows': rows, 'rows_per_sec': rows / seconds if seconds > 0 else None}
+            if measure_memory:
+                entry['peak_mb'] = peak_memory_mb(func)
+            size_result[name] = entry
+            log(format_entry(n_rows, name, entry))
+        results['sizes'][str(n_rows)] = size_result
+    return results
+
+def format_entry(n_rows, name, entry):
+    line = f"{n_rows:>9,} {name:<22} {entry['seconds'] * 1000:>10,.1f} ms"
+    if entry.get('rows_per_sec'):
+        line += f" {entry['rows_per_sec']:>14,.0f} baris/s"
+    if 'peak_mb' in entry:
+        line += f" {entry['peak_mb']:>9,.1f} MB"
+    return line
+
+def compare_with_baseline(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Bandingkan waktu dengan baseline. Return list (size, case, rasio, regresi?)"""
+    rows = []
+    for size, cases in results['sizes'].items():
+        for name, entry in cases.items():
+            base = baseline.get('sizes', {}).get(size, {}).get(name)
+            if not base or not base['seconds']:
+                continue
+            ratio = entry['seconds'] / base['seconds']
+            rows.append((size, name, ratio, ratio > threshold))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark bento_core di atas ledger sintetis")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Jumlah transaksi per ledger")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', nargs='+', help="Jalankan case tertentu saja")
+    parser.add_argument('--no-memory', action='store_true', help="Lewati pengukuran peak memory")
+    parser.add_argument('--save-baseline', metavar='PATH', help="Simpan hasil sebagai baseline JSON")
+    parser.add_argument('--compare', metavar='PATH', help="Bandingkan dengan baseline JSON")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.repeats, args.seed, not args.no_memory, args.only)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline disimpan ke {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        comparison = compare_with_baseline(results, baseline, args.threshold)
+        print(f"\nDibandingkan dengan {args.compare} (regresi jika > x{args.threshold:.2f}):")
+        for size, name, ratio, regressed in comparison:
+            flag = "❌ REGRESI" if regressed else "✅"
+            print(f"{int(size):>9,} {name:<22} x{ratio:>6.2f} {flag}")
+        if any(regressed for *_, regressed in comparison):
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Builder figure Plotly untuk dashboard (tanpa UI)"""
+import pandas as pd
+
+from .lazy import lazy_import
+from .profiling import timed
+from .transfers import TRANSFER_ID_COLUMN, TRANSFER_MASK_COLUMN
+
+SANKEY_LINK_COLORS = {
+    'income': 'rgba(16, 185, 129, 0.4)',
+    'expense': 'rgba(239, 68, 68, 0.4)',
+    'transfer': 'rgba(139, 92, 246, 0.4)',
+    'balance': 'rgba(148, 163, 184, 0.3)',
+}
+SANKEY_NODE_COLORS = {'in': '#10B981', 'wallet': '#3B82F6', 'out': '#EF4444', 'extra': '#94A3B8'}
+SANKEY_SURPLUS_NODE = "💰 Sisa / Tabungan"
+SANKEY_DEFICIT_NODE = "🏦 Pakai Saldo"
+
+def _transfer_links(transfers):
+    """Link wallet -> wallet dari pasangan kaki transfer (Transfer ID sama)
+
+    Kaki tanpa pasangan di periode ini (transfer sepihak / pasangan di luar periode)
+    jadi link ke "Transfer Keluar" atau dari "Transfer Masuk".
+    """
+    linked = transfers[TRANSFER_ID_COLUMN] != ""
+    legs = transfers.assign(_pair=transfers[TRANSFER_ID_COLUMN].where(linked, 'unlinked-' + transfers['ID'].astype(str)))
+    out_legs = legs.loc[legs['Tipe'] == 'Pengeluaran', ['_pair', 'Metode Pembayaran', 'Nominal']]
+    in_legs = legs.loc[legs['Tipe'] == 'Pemasukan', ['_pair', 'Metode Pembayaran', 'Nominal']]
+    paired = out_legs.merge(in_legs, on='_pair', how='outer', suffixes=(' Sumber', ' Tujuan'))
+    source = [('wallet', w) if isinstance(w, str) else ('extra', "↘️ Transfer Masuk") for w in paired['Metode Pembayaran Sumber']]
+    target = [('wallet', w) if isinstance(w, str) else ('extra', "↗️ Transfer Keluar") for w in paired['Metode Pembayaran Tujuan']]
+    value = paired['Nominal Sumber'].fillna(paired['Nominal Tujuan']).values
+    return pd.DataFrame({'source': source, 'target': target, 'value': value, 'kind': 'transfer'})
+
+@timed('aggregate')
+def build_cash_flow_links(df_filtered):
+    """Link Sankey 3 level: kategori pemasukan -> wallet -> kategori pengeluaran
+
+    Satu groupby (Tipe, Kategori, Wallet) untuk semua transaksi non-transfer. Transfer
+    Internal tidak dihitung sebagai pemasukan/pengeluaran, tapi jadi link wallet -> wallet.
+    Selisih masuk/keluar per wallet jadi link ke "Sisa / Tabungan" atau dari "Pakai Saldo".
+    Node = tuple (level, label) agar label yang sama di level berbeda tidak tergabung.
+    """
+    columns = ['source', 'target', 'value', 'kind']
+    if df_filtered.empty:
+        return pd.DataFrame(columns=columns)
+    rows = df_filtered[df_filtered['Tipe'].isin(['Pemasukan', 'Pengeluaran'])]
+    rows = rows.assign(**{'Metode Pembayaran': rows['Metode Pembayaran'].fillna('-').astype(str)})
+    is_transfer = rows[TRANSFER_MASK_COLUMN]
+
+    grouped = rows[~is_transfer].groupby(['Tipe', 'Kategori', 'Metode Pembayaran'])['Nominal'].sum()
+    grouped = grouped[grouped > 0].reset_index()
+    income = grouped[grouped['Tipe'] == 'Pemasukan']
+    expense = grouped[grouped['Tipe'] == 'Pengeluaran']
+    parts = [
+        pd.DataFrame({'source': list(zip(['in'] * len(income), income['Kategori'])),
+                      'target': list(zip(['wallet'] * len(income), income['Metode Pembayaran'])),
+                      'value': income['Nominal'].values, 'kind': 'income'}),
+        pd.DataFrame({'source': list(zip(['wallet'] * len(expense), expense['Metode Pembayaran'])),
+                      'target': list(zip(['out'] * len(expense), expense['Kategori'])),
+                      'value': expense['Nominal'].values, 'kind': 'expense'}),
+    ]
+    if is_transfer.any():
+        transfers = _transfer_links(rows[is_transfer])
+        parts.append(transfers.groupby(['source', 'target'], as_index=False, sort=False)['value'].sum().assign(kind='transfer'))
+
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    links = pd.concat(parts, ignore_index=True)
+
+    # Net per wallet (masuk - keluar, termasuk transfer) -> node sisa / pakai saldo
+    inflow = links.groupby(links['target'])['value'].sum()
+    outflow = links.groupby(links['source'])['value'].sum()
+    wallets = [node for node in inflow.index.union(outflow.index) if node[0] == 'wallet']
+    net = inflow.reindex(wallets, fill_value=0) - outflow.reindex(wallets, fill_value=0)
+    surplus, deficit = net[net > 0], -net[net < 0]
+    balance = pd.DataFrame({
+        'source': list(surplus.index) + [('extra', SANKEY_DEFICIT_NODE)] * len(deficit),
+        'target': [('extra', SANKEY_SURPLUS_NODE)] * len(surplus) + list(deficit.index),
+        'value': list(surplus.values) + list(deficit.values),
+        'kind': 'balance',
+    })
+    return pd.concat([links, balance], ignore_index=True)[columns]
+
+@timed('chart')
+def create_sankey_diagram(df_filtered):
+    """Sankey Cash Flow 3 level: kategori pemasukan -> wallet -> kategori pengeluaran"""
+    links = build_cash_flow_links(df_filtered)
+    if links.empty or not (links['kind'] == 'expense').any():
+        return None
+
+    nodes, codes = pd.factorize(pd.concat([links['source'], links['target']], ignore_index=True))
+    source_idx, target_idx = nodes[:len(links)], nodes[len(links):]
+    go = lazy_import('plotly.graph_objects')
+    fig = go.Figure(data=[go.Sankey(
+        node=dict(
+            pad=15,
+            thickness=20,
+            line=dict(color="black", width=0.5),
+            label=[label for _, label in codes],
+            color=[SANKEY_NODE_COLORS[level] for level, _ in codes]
+        ),
+        link=dict(
+            source=source_idx,
+            target=target_idx,
+            value=links['value'].values,
+            color=links['kind'].map(SANKEY_LINK_COLORS).values
+        )
+    )])
+    
+    fig.update_layout(
+        title="💸 Cash Flow: Dari Mana & Ke Mana Uang Mengalir",
+        font=dict(size=10, color='white'),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=450
+    )
+    
+    return fig
+
+@timed('chart')
+def create_budget_vs_actual_chart(df_filtered, budget_dict):
+    """Buat chart Budget vs Actual spending per kategori"""
+    if df_filtered.empty:
+        return None
+    
+    actual = df_filtered[(df_filtered['Tipe'] == 'Pengeluaran') & ~df_filtered[TRANSFER_MASK_COLUMN]].groupby('Kategori')['Nominal'].sum()
+    
+    categories = list(budget_dict.keys())
+    budget_values = [budget_dict[cat] for cat in categories]
+    actual_values = [actual.get(cat, 0) for cat in categories]
+    variance = [actual_values[i] - budget_values[i] for i in range(len(categories))]
+    
+    go = lazy_import('plotly.graph_objects')
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        name='Budget',
+        x=categories,
+        y=budget_values,
+        marker_color='rgba(59, 130, 246, 0.6)',
+        text=[f'Rp {v:,.0f}' for v in budget_values],
+        textposition='outside'
+    ))
+    
+    fig.add_trace(go.Bar(
+        name='Aktual',
+        x=categories,
+        y=actual_values,
+        marker_color=['rgba(239, 68, 68, 0.6)' if v > budget_values[i] else 'rgba(16, 185, 129, 0.6)' 
+                      for i, v in enumerate(actual_values)],
+        text=[f'Rp {v:,.0f}' for v in actual_values],
+        textposition='outside'
+    ))
+    
+    fig.update_layout(
+        title='📊 Budget vs Actual Spending',
+        xaxis_title=None,
+        yaxis_title='Rupiah',
+        barmode='group',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        height=400,
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    
+    return fig
+
+@timed('chart')
+def create_calendar_heatmap(daily_total, years):
+    """Heatmap kalender (minggu x hari) per tahun dari seri total pengeluaran harian"""
+    years = sorted(years)
+    if daily_total.empty or not years:
+        return None
+
+    go = lazy_import('plotly.graph_objects')
+    make_subplots = lazy_import('plotly.subplots').make_subplots
+    fig = make_subplots(rows=len(years), cols=1, subplot_titles=[str(y) for y in years], vertical_spacing=0.08)
+    day_names = ['Sen', 'Sel', 'Rab', 'Kam', 'Jum', 'Sab', 'Min']
+
+    for row, year in enumerate(years, start=1):
+        days = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq='D')
+        values = daily_total.reindex(days, fill_value=0)
+        # Kolom = minggu ke-n sejak Senin pertama sebelum/pada 1 Januari
+        week = (days.dayofyear - 1 + days[0].dayofweek) // 7
+        fig.add_trace(go.Heatmap(
+            x=week,
+            y=days.dayofweek,
+            z=values.values,
+            text=[f"{d:%d %b %Y}: Rp {v:,.0f}" for d, v in zip(days, values.values)],
+            hoverinfo='text',
+            colorscale='Reds',
+            zmin=0,
+            zmax=float(daily_total.max()),
+            showscale=(row == 1),
+            xgap=2, ygap=2,
+        ), row=row, col=1)
+        fig.update_yaxes(tickvals=list(range(7)), ticktext=day_names, autorange='reversed', row=row, col=1)
+        fig.update_xaxes(showticklabels=False, row=row, col=1)
+
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        height=180 * len(years) + 40,
+        margin=dict(t=40, b=10, l=10, r=10)
+    )
+    return fig
@@ -0,0 +1,130 @@
+"""Checkpoint saldo wallet: saldo tercatat per tanggal, dipakai sebagai titik awal hitung saldo
+
+Checkpoint bertanggal T = saldo di AWAL hari T (transaksi sebelum T sudah termasuk).
+Jenis checkpoint:
+- 'awal'        : dibuat dari Saldo Awal + Tanggal Reset di sheet Dompet (migrasi)
+- 'reset'       : saat "Atur Saldo Awal", Selisih = saldo riil - saldo hitungan (drift)
+- 'akhir_bulan' : saldo hitungan di awal tiap bulan, dibuat ulang jika transaksi lama diedit
+Saldo di tanggal berapa pun = checkpoint terdekat sebelumnya + transaksi sesudahnya.
+"""
+from datetime import datetime
+
+import pandas as pd
+
+from .archive import month_start
+from .profiling import timed
+from .queries import compute_wallet_balances
+
+CHECKPOINT_COLUMNS = ['Wallet', 'Tanggal', 'Saldo', 'Jenis', 'Selisih', 'Dicatat']
+CHECKPOINT_PRIORITY = {'akhir_bulan': 0, 'awal': 1, 'reset': 2}  # Tanggal sama: reset paling dipercaya
+BALANCE_COLUMNS = ['Tanggal', 'Nominal', 'Tipe', 'Metode Pembayaran']
+
+def empty_checkpoints():
+    checkpoints = pd.DataFrame(columns=CHECKPOINT_COLUMNS)
+    checkpoints['Tanggal'] = pd.to_datetime(checkpoints['Tanggal'])
+    return checkpoints
+
+def load_checkpoints(raw):
+    """Siapkan tipe data sheet Checkpoint Saldo"""
+    if raw.empty:
+        return empty_checkpoints()
+    checkpoints = raw.reindex(columns=CHECKPOINT_COLUMNS)
+    checkpoints['Tanggal'] = pd.to_datetime(checkpoints['Tanggal'], errors='coerce')
+    checkpoints['Saldo'] = pd.to_numeric(checkpoints['Saldo'], errors='coerce').fillna(0)
+    checkpoints['Selisih'] = pd.to_numeric(checkpoints['Selisih'], errors='coerce').fillna(0)
+    checkpoints['Jenis'] = checkpoints['Jenis'].fillna('reset').astype(str)
+    return sort_checkpoints(checkpoints.dropna(subset=['Wallet', 'Tanggal']))
+
+def checkpoints_to_sheet(checkpoints):
+    to_save = checkpoints[CHECKPOINT_COLUMNS].copy()
+    to_save['Tanggal'] = to_save['Tanggal'].dt.strftime('%Y-%m-%d')
+    return to_save
+
+def seed_checkpoints(df_wallet, checkpoints):
+    """Checkpoint 'awal' dari sheet Dompet untuk wallet yang belum punya checkpoint sama sekali"""
+    if df_wallet.empty:
+        return checkpoints
+    missing = df_wallet[~df_wallet['Wallet'].isin(checkpoints['Wallet'])]
+    if missing.empty:
+        return checkpoints
+    seeded = pd.DataFrame({
+        'Wallet': missing['Wallet'].values,
+        'Tanggal': pd.to_datetime(missing['Tanggal Reset']).dt.normalize().values,
+        'Saldo': missing['Saldo Awal'].astype(float).values,
+        'Jenis': 'awal',
+        'Selisih': 0.0,
+        'Dicatat': datetime.now().strftime('%Y-%m-%d %H:%M'),
+    })
+    return sort_checkpoints(pd.concat([checkpoints, seeded], ignore_index=True))
+
+def sort_checkpoints(checkpoints):
+    order = checkpoints['Jenis'].map(CHECKPOINT_PRIORITY).fillna(0)
+    return (checkpoints.assign(_prio=order)
+            .sort_values(['Wallet', 'Tanggal', '_prio'], kind='stable')
+            .drop(columns='_prio').reset_index(drop=True))
+
+def latest_checkpoints(checkpoints, before):
+    """Checkpoint terakhir per wallet dengan Tanggal <= before, format seperti sheet Dompet
+
+    Kolom 'Saldo Awal' + 'Tanggal Reset' agar langsung bisa dipakai compute_wallet_balances.
+    """
+    eligible = checkpoints[checkpoints['Tanggal'] <= pd.Timestamp(before)]
+    latest = eligible.groupby('Wallet', sort=False).tail(1)  # Sudah urut Tanggal + prioritas
+    return latest.rename(columns={'Saldo': 'Saldo Awal', 'Tanggal': 'Tanggal Reset'})[
+        ['Wallet', 'Saldo Awal', 'Tanggal Reset', 'Jenis']
+    ].reset_index(drop=True)
+
+@timed('aggregate')
+def balances_at(df, checkpoints, date):
+    """Saldo tiap wallet di AKHIR hari `date` = checkpoint terdekat + delta transaksi sesudahnya"""
+    end = pd.Timestamp(date).normalize() + pd.Timedelta(days=1)
+    base = latest_checkpoints(checkpoints, end)
+    if base.empty or df.empty:
+        return compute_wallet_balances(df.iloc[:0], base)
+    # Delta scan: hanya baris antara checkpoint paling tua yang dipakai dan `date`
+    window = df.loc[(df['Tanggal'] >= base['Tanggal Reset'].min()) & (df['Tanggal'] < end), BALANCE_COLUMNS]
+    return compute_wallet_balances(window, base)
+
+@timed('aggregate')
+def month_end_checkpoints(df, checkpoints, today=None):
+    """Checkpoint 'akhir_bulan' yang belum ada: awal tiap bulan yang sudah lewat sejak checkpoint terakhir"""
+    current_month = month_start(today or datetime.today())
+    new_rows = []
+    for wallet, cps in checkpoints.groupby('Wallet', sort=False):
+        last = cps.iloc[-1]
+        first_boundary = month_start(last['Tanggal']) + pd.offsets.MonthBegin(1)
+        if first_boundary > current_month:
+            continue
+        boundaries = pd.date_range(first_boundary, current_month, freq='MS')
+        rows = df.loc[(df['Metode Pembayaran'] == wallet) & (df['Tanggal'] >= last['Tanggal']) & (df['Tanggal'] < current_month)]
+        signed = rows['Nominal'].where(rows['Tipe'] == 'Pemasukan', 0) - rows['Nominal'].where(rows['Tipe'] == 'Pengeluaran', 0)
+        # Net per bulan -> saldo kumulatif di tiap batas bulan
+        net_per_month = signed.groupby(rows['Tanggal'].dt.to_period('M').dt.to_timestamp()).sum()
+        cumulative = net_per_month.reindex(boundaries - pd.offsets.MonthBegin(1), fill_value=0).cumsum()
+        new_rows.append(pd.DataFrame({
+            'Wallet': wallet,
+            'Tanggal': boundaries,
+            'Saldo': float(last['Saldo']) + cumulative.values,
+            'Jenis': 'akhir_bulan',
+            'Selisih': 0.0,
+            'Dicatat': datetime.now().strftime('%Y-%m-%d %H:%M'),
+        }))
+    if not new_rows:
+        return checkpoints.iloc[:0]
+    return pd.concat(new_rows, ignore_index=True)
+
+def stale_month_end_mask(checkpoints, before, after):
+    """Checkpoint 'akhir_bulan' yang tidak valid lagi karena transaksi sebelum tanggalnya berubah
+
+    before / after: versi lama & baru dari baris yang diubah 1 commit (bukan seluruh ledger).
+    """
+    old_side, new_side = before.set_index('ID')[BALANCE_COLUMNS], after.set_index('ID')[BALANCE_COLUMNS]
+    # Edit yang tidak menyentuh kolom saldo (mis. Item / Keterangan) tidak membuat checkpoint basi
+    common = old_side.index.intersection(new_side.index)
+    same = common[(old_side.loc[common] == new_side.loc[common]).all(axis=1).to_numpy()]
+    changed = pd.concat([old_side.drop(index=same), new_side.drop(index=same)], ignore_index=True)
+    if checkpoints.empty or changed.empty:
+        return pd.Series(False, index=checkpoints.index)
+    earliest = changed.groupby('Metode Pembayaran')['Tanggal'].min()
+    affected_from = checkpoints['Wallet'].map(earliest)
+    return (checkpoints['Jenis'] == 'akhir_bulan') & affected_from.notna() & (checkpoints['Tanggal'] > affected_from)
@@ -0,0 +1,93 @@
+"""Perbandingan antar periode (MoM, YoY, rolling 3/6/12 bulan) dari total bulanan yang sudah diagregasi
+
+Ledger cukup di-groupby sekali per versi data menjadi total per bulan x tipe x kategori x
+wallet (ditambah Ringkasan Arsip, yang memang sudah bulanan). Semua perbandingan dan
+rata-rata bergulir dihitung dari pivot kecil (bulan x grup), bukan dari baris transaksi,
+jadi grid 5 tahun tetap interaktif.
+"""
+import pandas as pd
+
+from .config import KATEGORI_TRANSFER
+from .profiling import timed
+
+MONTHLY_TOTAL_COLUMNS = ['Periode', 'Tipe', 'Kategori', 'Metode Pembayaran', 'Nominal']
+COMPARISON_MODES = {
+    'mom': ("Bulan lalu (MoM)", 1, 1),     # (label, panjang periode, jarak mundur) dalam bulan
+    'yoy': ("Tahun lalu (YoY)", 1, 12),
+    'rolling3': ("3 bulan vs 3 bulan sebelumnya", 3, 3),
+    'rolling6': ("6 bulan vs 6 bulan sebelumnya", 6, 6),
+    'rolling12': ("12 bulan vs 12 bulan sebelumnya", 12, 12),
+}
+ROLLING_WINDOWS = (3, 6, 12)
+
+@timed('aggregate')
+def build_monthly_totals(df, ringkasan=None):
+    """Total Nominal per Periode (awal bulan) x Tipe x Kategori x Metode Pembayaran, termasuk arsip"""
+    keys = ['Periode', 'Tipe', 'Kategori', 'Metode Pembayaran']
+    parts = []
+    if not df.empty:
+        rows = df.loc[df['Tanggal'].notna(), ['Tanggal', 'Tipe', 'Kategori', 'Metode Pembayaran', 'Nominal']]
+        parts.append(rows.assign(Periode=rows['Tanggal'].dt.to_period('M').dt.to_timestamp()).drop(columns='Tanggal'))
+    if ringkasan is not None and not ringkasan.empty:
+        parts.append(ringkasan.assign(Periode=pd.to_datetime(ringkasan['Periode'], format='%Y-%m'))[MONTHLY_TOTAL_COLUMNS])
+    if not parts:
+        return pd.DataFrame(columns=MONTHLY_TOTAL_COLUMNS)
+    combined = pd.concat(parts, ignore_index=True)
+    combined['Metode Pembayaran'] = combined['Metode Pembayaran'].fillna("-")
+    return combined.groupby(keys, dropna=False)['Nominal'].sum().reset_index()[MONTHLY_TOTAL_COLUMNS]
+
+def monthly_pivot(monthly, by='Kategori', tipe='Pengeluaran', include_transfer=False):
+    """Pivot bulan (semua bulan berurutan, kosong = 0) x grup (Kategori / Metode Pembayaran)"""
+    rows = monthly[monthly['Tipe'] == tipe]
+    if not include_transfer:
+        rows = rows[rows['Kategori'] != KATEGORI_TRANSFER]
+    if rows.empty:
+        return pd.DataFrame(dtype=float)
+    pivot = rows.pivot_table(index='Periode', columns=by, values='Nominal', aggfunc='sum', fill_value=0)
+    months = pd.date_range(pivot.index.min(), pivot.index.max(), freq='MS')
+    return pivot.reindex(months, fill_value=0).astype(float)
+
+def period_months(month, mode):
+    """(bulan periode sekarang, bulan periode pembanding) untuk mode di COMPARISON_MODES"""
+    _, length, lag = COMPARISON_MODES[mode]
+    end = pd.Timestamp(month).to_period('M').to_timestamp()
+    current = pd.date_range(end=end, periods=length, freq='MS')
+    previous = pd.date_range(end=end - pd.DateOffset(months=lag), periods=length, freq='MS')
+    return current, previous
+
+def compare_periods(pivot, current, previous):
+    """Total per grup di 2 periode + selisih & pertumbuhan (%; NaN jika periode pembanding 0)
+
+    Bulan yang tidak ada di pivot dianggap 0. Diurutkan dari selisih absolut terbesar.
+    """
+    now = pivot.reindex(current, fill_value=0).sum()
+    before = pivot.reindex(previous, fill_value=0).sum()
+    result = pd.DataFrame({'Sekarang': now, 'Sebelumnya': before})
+    result['Selisih'] = result['Sekarang'] - result['Sebelumnya']
+    result['Pertumbuhan (%)'] = (result['Selisih'] / result['Sebelumnya'].where(result['Sebelumnya'] != 0)) * 100
+    result = result[(result['Sekarang'] != 0) | (result['Sebelumnya'] != 0)]
+    order = result['Selisih'].abs().sort_values(ascending=False, kind='stable').index
+    return result.loc[order]
+
+def rolling_averages(pivot, month, windows=ROLLING_WINDOWS):
+    """Nilai bulan `month` per grup + rata-rata N bulan terakhir yang berakhir di bulan tsb"""
+    month = pd.Timestamp(month).to_period('M').to_timestamp()
+    if pivot.empty or month < pivot.index.min():
+        return pd.DataFrame()
+    # Perpanjang pivot sampai `month` agar bulan tanpa transaksi tetap terhitung 0
+    months = pd.date_range(pivot.index.min(), max(pivot.index.max(), month), freq='MS')
+    pivot = pivot.reindex(months, fill_value=0)
+    result = pd.DataFrame({'Bulan Ini': pivot.loc[month]})
+    for window in windows:
+        window_start = month - pd.DateOffset(months=window - 1)
+        result[f'Rata-rata {window} Bln'] = pivot.loc[window_start:month].mean()
+    return result
+
+def year_month_grid(pivot, column=None):
+    """Grid Tahun x Bulan (1..12) dari total semua grup, atau 1 grup saja"""
+    series = pivot.sum(axis=1) if column is None else pivot.get(column, pd.Series(0.0, index=pivot.index))
+    if series.empty:
+        return pd.DataFrame()
+    grid = series.groupby([series.index.year, series.index.month]).sum().unstack()
+    grid.index.name, grid.columns.name = 'Tahun', 'Bulan'
+    return grid.reindex(columns=range(1, 13))
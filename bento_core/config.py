@@ -0,0 +1,13 @@
+"""Konfigurasi kategori & metode pembayaran"""
+
+KATEGORI_PEMASUKAN = ["Gaji", "Bonus", "Hadiah", "Pembayaran", "Penjualan", "Lainnya"]
+KATEGORI_PENGELUARAN = ["Makan", "Jajan", "Belanja", "Hiburan", "Transport", "Kesehatan", "Tagihan", "Amal", "Saving", "Lainnya"]
+KATEGORI_TRANSFER = "Transfer Internal"
+if KATEGORI_TRANSFER not in KATEGORI_PEMASUKAN:
+    KATEGORI_PEMASUKAN.append(KATEGORI_TRANSFER)
+if KATEGORI_TRANSFER not in KATEGORI_PENGELUARAN:
+    KATEGORI_PENGELUARAN.append(KATEGORI_TRANSFER)
+# Item yang tidak dihitung di Analisis Pengeluaran Spesifik (cocok sebagian, tidak peka huruf besar/kecil)
+ANALISIS_EXCLUDE_ITEMS = ("kos",)
+METODE_PEMBAYARAN = ["Cash", "Livin (Mandiri)", "Octo (CIMB)", "DANA", "Shopeepay", "Kartu Kredit"]
+# START_DATE_MONITORING sudah tidak dipakai lagi, diganti dengan Tanggal Reset per Wallet
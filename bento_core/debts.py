@@ -0,0 +1,174 @@
+"""Utang (tanggungan 'Belum Lunas'): index sisa utang, cicilan, dan pelunasan massal vectorized
+
+Utang = transaksi berstatus 'Belum Lunas' (Metode '-'). Baris utang asal tidak pernah diubah
+Nominal-nya, jadi pengeluaran tetap tercatat 1x di bulan utang dibuat. Cicilan dicatat sebagai
+sepasang Transfer Internal dari wallet pembayar ke akun utang '-' (keduanya menunjuk utang asal
+lewat kolom 'Utang ID'): saldo wallet berkurang, tapi tidak dihitung sebagai pengeluaran baru.
+Sisa utang = Nominal asal - total cicilan.
+Pelunasan penuh tanpa cicilan cukup mengubah Status + Metode Pembayaran baris utang asal.
+"""
+import numpy as np
+import pandas as pd
+
+from .config import KATEGORI_TRANSFER
+from .profiling import timed
+from .transfers import TRANSFER_ID_COLUMN, transfer_id_for
+
+DEBT_ID_COLUMN = 'Utang ID'
+DEBT_STATUS = 'Belum Lunas'
+DEBT_COLUMNS = ['ID', 'Tanggal', 'Item', 'Kategori', 'Nominal', 'Keterangan']
+DEBT_TOLERANCE = 0.5  # Sisa < Rp 0.5 dianggap lunas (pembulatan)
+DEBT_ACCOUNT = '-'  # Metode Pembayaran utang: kaki masuk cicilan dicatat ke akun ini
+
+def debt_link_for(debt_id):
+    """Isi kolom Utang ID untuk cicilan dari utang ber-ID debt_id"""
+    return f"UTG-{int(debt_id)}"
+
+def debt_ids_from_links(links):
+    """Kebalikan debt_link_for (vectorized), NaN untuk baris tanpa link"""
+    return pd.to_numeric(links.str.slice(4), errors='coerce')
+
+def mark_debts(df):
+    """Pastikan kolom Utang ID ada (string, kosong = bukan cicilan)"""
+    if DEBT_ID_COLUMN not in df.columns:
+        df[DEBT_ID_COLUMN] = ""
+    df[DEBT_ID_COLUMN] = df[DEBT_ID_COLUMN].fillna("").astype(str)
+    return df
+
+def _debt_rows(df):
+    """(utang belum lunas, cicilan) dari tabel transaksi / baris yang berubah, keduanya kecil
+
+    Cicilan = kaki keluar (Pengeluaran, wallet pembayar) dari pasangan transfer ber-Utang ID.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=DEBT_COLUMNS), pd.DataFrame(columns=['ID', 'Debt', 'Nominal'])
+    unpaid = df.loc[df['Status'] == DEBT_STATUS, DEBT_COLUMNS]
+    links = df[DEBT_ID_COLUMN] if DEBT_ID_COLUMN in df.columns else pd.Series("", index=df.index)
+    is_installment = (links != "") & (df['Tipe'] == 'Pengeluaran')
+    installments = pd.DataFrame({
+        'ID': df.loc[is_installment, 'ID'],
+        'Debt': debt_ids_from_links(links[is_installment]),
+        'Nominal': df.loc[is_installment, 'Nominal'],
+    })
+    return unpaid, installments
+
+class DebtIndex:
+    """Utang belum lunas per ID + cicilan per utang, di-patch tiap commit transaksi
+
+    outstanding: utang 'Belum Lunas' (index ID) urut Tanggal, Nominal = nilai awal utang;
+    total: jumlah sisa utang (nilai awal - cicilan).
+    """
+
+    def __init__(self, df):
+        unpaid, installments = _debt_rows(df)
+        self.outstanding = unpaid.set_index('ID').sort_values('Tanggal', kind='stable')
+        self.installments = installments.set_index('ID')
+        self._update_total()
+
+    def __len__(self):
+        return len(self.outstanding)
+
+    def _update_total(self):
+        self.total = float(self.remaining().sum())
+
+    @timed('aggregate')
+    def patch(self, before, after):
+        """Terapkan baris yang berubah di 1 commit (versi lama -> versi baru), bukan diff seluruh ledger"""
+        old_unpaid, old_inst = _debt_rows(before)
+        new_unpaid, new_inst = _debt_rows(after)
+        removed = pd.concat([old_unpaid['ID'], new_unpaid['ID']])
+        if len(removed):
+            outstanding = self.outstanding.drop(index=removed, errors='ignore')
+            self.outstanding = pd.concat([outstanding, new_unpaid.set_index('ID')]).sort_values('Tanggal', kind='stable')
+        removed = pd.concat([old_inst['ID'], new_inst['ID']])
+        if len(removed):
+            installments = self.installments.drop(index=removed, errors='ignore')
+            self.installments = pd.concat([installments, new_inst.set_index('ID')])
+        self._update_total()
+
+    def paid_by_debt(self):
+        """Total cicilan per ID utang asal"""
+        return self.installments.groupby('Debt')['Nominal'].sum()
+
+    def remaining(self):
+        """Sisa per utang belum lunas (index ID) = nilai awal - total cicilan"""
+        paid = self.outstanding.index.map(self.paid_by_debt()).fillna(0.0) if len(self.outstanding) else 0.0
+        return (self.outstanding['Nominal'] - paid).astype(float)
+
+    def table(self):
+        """Daftar utang belum lunas + Sisa, Sudah Dibayar, Total Awal, Progress (%)"""
+        table = self.outstanding.rename(columns={'Nominal': 'Total Awal'})
+        table.insert(table.columns.get_loc('Total Awal'), 'Sisa', self.remaining())
+        table['Sudah Dibayar'] = table['Total Awal'] - table['Sisa']
+        table['Progress (%)'] = np.where(table['Total Awal'] > 0, table['Sudah Dibayar'] / table['Total Awal'] * 100, 0.0)
+        return table.reset_index()
+
+def _installment_pairs(source, amount, wallets, payment_date, first_id, op_key, op_key_column):
+    """Sepasang baris Transfer Internal per cicilan: wallet pembayar -> akun utang '-'"""
+    n = len(source)
+    out_ids = np.arange(first_id, first_id + 2 * n, 2)
+    common = {
+        'Tanggal': payment_date,
+        'Item': source['Item'].astype(str).values + " (cicilan)",
+        'Kategori': KATEGORI_TRANSFER,
+        'Nominal': amount,
+        'Status': 'Lunas',
+        'Keterangan': [f"Cicilan utang #{int(debt_id)}" for debt_id in source['ID']],
+        'Month': payment_date.month_name(),
+        'Year': payment_date.year,
+        op_key_column: op_key,
+        DEBT_ID_COLUMN: [debt_link_for(debt_id) for debt_id in source['ID']],
+        TRANSFER_ID_COLUMN: [transfer_id_for(out_id) for out_id in out_ids],
+    }
+    out_legs = pd.DataFrame({**common, 'Tipe': 'Pengeluaran', 'Metode Pembayaran': wallets, 'ID': out_ids})
+    in_legs = pd.DataFrame({**common, 'Tipe': 'Pemasukan', 'Metode Pembayaran': DEBT_ACCOUNT, 'ID': out_ids + 1})
+    # Kaki keluar & masuk tiap cicilan berurutan
+    return pd.concat([out_legs, in_legs]).sort_values('ID', kind='stable')
+
+@timed('crud')
+def apply_debt_payments(df, payments, payment_date, first_id, op_key, op_key_column, paid=None):
+    """Terapkan pembayaran utang (vectorized) ke salinan tabel transaksi
+
+    payments: kolom ID, Bayar (NaN / >= sisa = lunas penuh, selain itu harus > 0), Metode Pembayaran.
+    paid: total cicilan per ID utang (DebtIndex.paid_by_debt), untuk menghitung sisa.
+    Return (tabel_baru, jumlah_utang_dibayar, total_per_wallet). ValueError jika ada Bayar <= 0.
+    """
+    bayar = pd.to_numeric(payments['Bayar'], errors='coerce')
+    if (payments['Bayar'].notna() & ~(bayar > 0)).any():
+        raise ValueError("Nominal bayar harus lebih dari 0")
+    result = df.copy()
+    positions = pd.Series(np.arange(len(result)), index=result['ID'])
+    payments = payments[payments['ID'].isin(positions.index)]
+    pos = positions.loc[payments['ID']].to_numpy()
+    payments = payments.assign(_pos=pos)
+    # Hanya utang yang masih 'Belum Lunas' yang diproses
+    payments = payments[result['Status'].to_numpy()[pos] == DEBT_STATUS]
+    if payments.empty:
+        return result, 0, {}
+
+    already_paid = payments['ID'].map(paid).fillna(0.0).to_numpy(dtype=float) if paid is not None else np.zeros(len(payments))
+    remaining = result['Nominal'].to_numpy(dtype=float)[payments['_pos'].to_numpy()] - already_paid
+    amount = payments['Bayar'].to_numpy(dtype=float)
+    full = np.isnan(amount) | (amount >= remaining - DEBT_TOLERANCE)
+    amount = np.where(full, remaining, amount)
+    all_pos = payments['_pos'].to_numpy()
+    wallets = payments['Metode Pembayaran'].to_numpy()
+    status_col, method_col, key_col = (result.columns.get_loc(c) for c in ['Status', 'Metode Pembayaran', op_key_column])
+
+    # Lunas penuh tanpa cicilan: baris utang asal langsung jadi pengeluaran dari wallet pembayar
+    direct = full & (already_paid == 0)
+    result.iloc[all_pos[direct], method_col] = wallets[direct]
+    # Lunas penuh: Status baris utang asal berubah (yang sudah dicicil tetap di akun utang '-')
+    result.iloc[all_pos[full], status_col] = 'Lunas'
+    result.iloc[all_pos[full], key_col] = op_key
+
+    # Cicilan (termasuk pelunasan sisa utang yang sudah pernah dicicil): pasangan transfer baru
+    via_transfer = ~direct
+    if via_transfer.any():
+        source = result.iloc[all_pos[via_transfer]]
+        pairs = _installment_pairs(source, amount[via_transfer], wallets[via_transfer],
+                                   pd.Timestamp(payment_date).normalize(), first_id, op_key, op_key_column)
+        result = pd.concat([result, pairs], ignore_index=True)
+
+    per_wallet = pd.Series(amount, index=wallets).groupby(level=0).sum()
+    return result, len(payments), {wallet: float(total) for wallet, total in per_wallet.items()}
@@ -0,0 +1,62 @@
+"""Deteksi transaksi duplikat lewat fingerprint index"""
+import pandas as pd
+
+from .profiling import timed
+
+DUPLICATE_WINDOW_DAYS = 1  # Selisih hari maksimal agar dianggap duplikat
+
+def normalize_item_text(items):
+    """Normalisasi nama item: lowercase, tanpa tanda baca, spasi dirapikan"""
+    return items.fillna('').astype(str).str.lower().str.replace(r'[^0-9a-z]+', ' ', regex=True).str.strip()
+
+def transaction_fingerprints(df):
+    """Hash 64-bit dari (item, nominal, wallet, tipe) yang sudah dinormalisasi. Tanggal dicek terpisah (fuzzy)."""
+    key = pd.DataFrame({
+        'item': normalize_item_text(df['Item']),
+        'nominal': pd.to_numeric(df['Nominal'], errors='coerce').fillna(0).round(0).astype('int64'),
+        'metode': df['Metode Pembayaran'].fillna('-').astype(str).str.strip().str.lower(),
+        'tipe': df['Tipe'].fillna('').astype(str)
+    }, index=df.index)
+    return pd.util.hash_pandas_object(key, index=False)
+
+@timed('aggregate')
+def build_duplicate_index(df):
+    """Index fingerprint -> (Tanggal, row) terurut, untuk lookup cepat tanpa scan pairwise"""
+    index = pd.DataFrame({
+        'fp': transaction_fingerprints(df).to_numpy(),
+        'Tanggal': pd.to_datetime(df['Tanggal']).to_numpy(),
+        'row': df.index
+    })
+    return index.sort_values(['fp', 'Tanggal'], kind='stable').set_index('fp')
+
+def find_possible_duplicates(df, index, entry, window_days=DUPLICATE_WINDOW_DAYS):
+    """Cari transaksi yang mirip dengan entry (dict 1 transaksi baru) dalam window hari"""
+    if df.empty:
+        return df
+    fp = transaction_fingerprints(pd.DataFrame([entry])).iloc[0]
+    if fp not in index.index:
+        return df.iloc[0:0]
+    candidates = index.loc[[fp]]
+    delta = (candidates['Tanggal'] - pd.Timestamp(entry['Tanggal'])).abs()
+    return df.loc[candidates.loc[delta <= pd.Timedelta(days=window_days), 'row']]
+
+@timed('aggregate')
+def find_duplicate_clusters(df, window_days=DUPLICATE_WINDOW_DAYS):
+    """Kelompokkan semua transaksi duplikat di seluruh ledger dalam satu pass (sort + diff)"""
+    if df.empty:
+        return df.assign(Cluster=pd.Series(dtype='int64'))
+
+    work = pd.DataFrame({
+        'fp': transaction_fingerprints(df),
+        'Tanggal': pd.to_datetime(df['Tanggal'])
+    }, index=df.index).sort_values(['fp', 'Tanggal'], kind='stable')
+
+    same_fp = work['fp'].eq(work['fp'].shift())
+    close = work['Tanggal'].diff().le(pd.Timedelta(days=window_days))
+    cluster_id = (~(same_fp & close)).cumsum()
+    cluster_size = cluster_id.map(cluster_id.value_counts())
+    dup_ids = cluster_id[cluster_size > 1]
+
+    result = df.loc[dup_ids.index].copy()
+    result['Cluster'] = pd.factorize(dup_ids.to_numpy())[0] + 1
+    return result
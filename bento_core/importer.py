@@ -0,0 +1,95 @@
+"""Import mutasi bank / e-wallet (CSV/XLSX) ke format tabel Transaksi"""
+import pandas as pd
+
+# Mapping kolom default per sumber. 'nominal' = 1 kolom bertanda (+/-),
+# 'debit'/'kredit' = 2 kolom terpisah. 'decimal' = pemisah desimal di file.
+IMPORT_SOURCES = {
+    "Livin (Mandiri)": {'tanggal': 'Tanggal', 'item': 'Keterangan', 'debit': 'Debit', 'kredit': 'Kredit', 'dayfirst': True, 'decimal': ','},
+    "Octo (CIMB)": {'tanggal': 'Transaction Date', 'item': 'Description', 'debit': 'Debit', 'kredit': 'Credit', 'dayfirst': True, 'decimal': '.'},
+    "DANA": {'tanggal': 'Tanggal', 'item': 'Deskripsi', 'nominal': 'Nominal', 'dayfirst': True, 'decimal': ','},
+    "Shopeepay": {'tanggal': 'Waktu', 'item': 'Deskripsi', 'nominal': 'Jumlah', 'dayfirst': False, 'decimal': ','},
+}
+
+# Tebakan kategori dari kata kunci di deskripsi (case-insensitive)
+IMPORT_KATEGORI_RULES = {
+    'Pengeluaran': {
+        'Makan': ['gofood', 'grabfood', 'shopeefood', 'resto', 'warung', 'cafe', 'kopi'],
+        'Transport': ['gojek', 'goride', 'grab', 'maxim', 'bensin', 'pertamina', 'krl', 'parkir', 'tol'],
+        'Tagihan': ['pln', 'listrik', 'pulsa', 'paket data', 'bpjs', 'indihome', 'pdam', 'token'],
+        'Belanja': ['tokopedia', 'shopee', 'lazada', 'indomaret', 'alfamart', 'supermarket'],
+        'Hiburan': ['netflix', 'spotify', 'youtube', 'bioskop', 'cgv', 'xxi'],
+    },
+    'Pemasukan': {
+        'Gaji': ['gaji', 'payroll', 'salary'],
+        'Bonus': ['bonus', 'thr', 'insentif'],
+    },
+}
+
+def parse_amount_series(values, decimal=','):
+    """Parse kolom nominal teks ('Rp 1.250.000,00', '-50.000', '(12.000)', '15.000 DB') secara vectorized"""
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.to_numeric(values, errors='coerce')
+
+    text = values.fillna('').astype(str).str.strip()
+    upper = text.str.upper()
+    negative = text.str.startswith('-') | (text.str.startswith('(') & text.str.endswith(')')) | upper.str.endswith(('DB', ' D'))
+
+    thousands = '.' if decimal == ',' else ','
+    cleaned = text.str.replace(thousands, '', regex=False)
+    if decimal == ',':
+        cleaned = cleaned.str.replace(',', '.', regex=False)
+    cleaned = cleaned.str.replace(r'[^0-9.]', '', regex=True)
+
+    amount = pd.to_numeric(cleaned, errors='coerce')
+    return amount.where(~negative, -amount)
+
+def guess_kategori(items, tipe):
+    """Tebak kategori dari deskripsi, default 'Lainnya'"""
+    kategori = pd.Series('Lainnya', index=items.index, dtype=object)
+    lowered = items.fillna('').astype(str).str.lower()
+    for tipe_name, rules in IMPORT_KATEGORI_RULES.items():
+        tipe_mask = tipe == tipe_name
+        for kat, keywords in rules.items():
+            pattern = '|'.join(keywords)
+            mask = tipe_mask & (kategori == 'Lainnya') & lowered.str.contains(pattern, regex=True)
+            kategori = kategori.mask(mask, kat)
+    return kategori
+
+def read_statement_file(uploaded_file):
+    """Baca file mutasi CSV/XLSX jadi DataFrame mentah (semua kolom sebagai teks)"""
+    name = uploaded_file.name.lower()
+    if name.endswith(('.xlsx', '.xls')):
+        return pd.read_excel(uploaded_file, dtype=str)
+    return pd.read_csv(uploaded_file, dtype=str, sep=None, engine='python')
+
+def parse_statement(raw, source, mapping):
+    """Ubah file mutasi mentah ke format tabel Transaksi
+
+    Return (transaksi_baru, jumlah_baris_dibuang).
+    """
+    tanggal = pd.to_datetime(raw[mapping['tanggal']], dayfirst=mapping.get('dayfirst', True), errors='coerce').dt.normalize()
+    decimal = mapping.get('decimal', ',')
+
+    if mapping.get('nominal'):
+        signed = parse_amount_series(raw[mapping['nominal']], decimal)
+    else:
+        debit = parse_amount_series(raw[mapping['debit']], decimal).abs().fillna(0)
+        kredit = parse_amount_series(raw[mapping['kredit']], decimal).abs().fillna(0)
+        signed = kredit - debit
+
+    tipe = pd.Series('Pemasukan', index=raw.index, dtype=object).mask(signed < 0, 'Pengeluaran')
+    items = raw[mapping['item']].fillna('').astype(str).str.strip().str.slice(0, 100)
+
+    result = pd.DataFrame({
+        'Tanggal': tanggal,
+        'Item': items,
+        'Kategori': guess_kategori(items, tipe),
+        'Nominal': signed.abs(),
+        'Tipe': tipe,
+        'Status': 'Lunas',
+        'Keterangan': f"Import {source}",
+        'Metode Pembayaran': source,
+    })
+
+    valid = result['Tanggal'].notna() & result['Nominal'].gt(0)
+    return result.loc[valid].reset_index(drop=True), int((~valid).sum())
@@ -0,0 +1,88 @@
+"""Background job laporan + cache file hasil (tanpa UI)"""
+from io import BytesIO
+import time
+
+from .profiling import bind
+
+REPORT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+class ArtifactStore:
+    """Cache file laporan (bytes) per key, buang entry paling lama jika melebihi max_bytes"""
+
+    def __init__(self, max_bytes=REPORT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.items = {}  # key -> bytes file laporan yang sudah jadi
+        self.stats = {}  # key -> statistik export (rows/detik)
+
+    def get(self, key):
+        return self.items.get(key)
+
+    def put(self, key, data, stats=None):
+        self.items.pop(key, None)
+        self.items[key] = data
+        if stats is not None:
+            self.stats[key] = stats
+        total_size = sum(len(v) for v in self.items.values())
+        while total_size > self.max_bytes and len(self.items) > 1:
+            oldest_key = next(iter(self.items))
+            total_size -= len(self.items.pop(oldest_key))
+            self.stats.pop(oldest_key, None)
+
+class ReportJobRunner:
+    """Jalankan fungsi laporan di executor, simpan hasilnya ke ArtifactStore
+
+    Fungsi laporan harus menerima progress_callback(done, total).
+    """
+
+    def __init__(self, executor, store=None):
+        self.executor = executor
+        self.store = store if store is not None else ArtifactStore()
+        self.jobs = {}  # key -> job laporan yang sedang berjalan
+
+    def submit(self, key, func, *args, **kwargs):
+        """Mulai job, diabaikan jika hasil sudah ada atau job yang sama sedang berjalan"""
+        if self.store.get(key) is not None:
+            return
+        existing = self.jobs.get(key)
+        if existing is not None and existing['error'] is None:
+            return
+
+        job = {'done': 0, 'total': 0, 'error': None, 'started': time.perf_counter()}
+
+        def progress_callback(done, total):
+            job['done'] = done
+            job['total'] = total
+
+        # Span job background ikut tercatat di profiler rerun yang men-submit
+        job['future'] = self.executor.submit(bind(func), *args, progress_callback=progress_callback, **kwargs)
+        self.jobs[key] = job
+
+    def poll(self, key):
+        """Cek status job: 'done', 'running', 'error', atau None jika tidak ada job"""
+        if self.store.get(key) is not None:
+            return 'done'
+        job = self.jobs.get(key)
+        if job is None:
+            return None
+        if job['error'] is not None:
+            return 'error'
+        if not job['future'].done():
+            return 'running'
+
+        try:
+            result = job['future'].result()
+        except Exception as e:
+            job['error'] = str(e)
+            return 'error'
+        stats = None
+        if isinstance(result, tuple):  # export streaming mengembalikan (file, stats)
+            result, stats = result
+        if isinstance(result, BytesIO):
+            result = result.getvalue()
+        self.store.put(key, result, stats)
+        del self.jobs[key]
+        return 'done'
+
+    def clear(self, key):
+        """Lupakan job (mis. yang gagal) agar bisa di-submit ulang"""
+        self.jobs.pop(key, None)
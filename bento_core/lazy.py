@@ -0,0 +1,17 @@
+"""Lazy import untuk library berat (plotly, fpdf, openpyxl)"""
+import importlib
+import sys
+import time
+
+# Durasi import per modul (detik). Modul ini di-cache Python, jadi nilainya
+# bertahan di semua rerun Streamlit dalam 1 proses server.
+IMPORT_TIMINGS = {}
+
+def lazy_import(module_name):
+    """Import modul berat hanya saat pertama kali dipakai, catat durasinya"""
+    module = sys.modules.get(module_name)
+    if module is None:
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        IMPORT_TIMINGS[module_name] = time.perf_counter() - started
+    return module
@@ -0,0 +1,935 @@
+"""Ledger engine: cache tabel, versi data, dan operasi CRUD tanpa UI"""
+from collections import OrderedDict
+from datetime import datetime
+import hashlib
+import json
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from .archive import ARCHIVE_SUMMARY_COLUMNS, SheetArchive, month_start, summarize_archive
+from .checkpoints import (
+    empty_checkpoints, load_checkpoints, checkpoints_to_sheet, seed_checkpoints, sort_checkpoints,
+    latest_checkpoints, balances_at, month_end_checkpoints, stale_month_end_mask,
+)
+from .comparison import build_monthly_totals
+from .config import KATEGORI_TRANSFER
+from .debts import DEBT_ID_COLUMN, DEBT_STATUS, DebtIndex, apply_debt_payments, debt_link_for, mark_debts
+from .profiling import span, timed
+from .resilience import BackendUnavailable
+from .running import RunningBalance
+from .targets import TARGET_LINK_COLUMN, TargetIndex, mark_targets
+from .transfers import (
+    TRANSFER_ID_COLUMN, TRANSFER_MASK_COLUMN, transfer_id_for, mark_transfers, link_transfer_pairs,
+    sync_transfer_partners, with_transfer_partners,
+)
+
+TABLE_NAMES = ['transaksi', 'dompet', 'target', 'recurring', 'ringkasan', 'checkpoint']
+WORKSHEETS = {
+    'transaksi': "Transaksi", 'dompet': "Dompet", 'target': "Target", 'recurring': "Recurring",
+    'ringkasan': "Ringkasan Arsip", 'checkpoint': "Checkpoint Saldo",
+}
+TARGET_COLUMNS = ['Nama Impian', 'Target Harga', 'Dana Terkumpul']
+RECURRING_COLUMNS = ['Nama Item', 'Kategori', 'Nominal', 'Tipe', 'Metode Pembayaran', 'Frekuensi', 'Tanggal Mulai', 'Status']
+OP_KEY_COLUMN = 'Op Key'  # Key operasi terakhir yang menulis baris ini, disimpan ke sheet
+RECENT_OP_KEYS = 2000     # Jumlah op key terbaru yang diingat untuk dedupe replay
+
+# ============================================================
+# OPERATION KEY (IDEMPOTENT WRITE)
+# ============================================================
+
+def new_operation_key():
+    """Op key acak untuk 1 operasi tulis"""
+    return uuid.uuid4().hex
+
+def derive_operation_key(nonce, payload):
+    """Op key deterministik dari nonce form + isi payload
+
+    Submit ulang isi yang sama (klik ganda, retry setelah timeout) menghasilkan key yang
+    sama sehingga tidak tercatat dobel. Isi berbeda -> key berbeda.
+    """
+    if isinstance(payload, pd.DataFrame):
+        digest = f"{list(payload.columns)}|{len(payload)}|{int(pd.util.hash_pandas_object(payload, index=False).sum())}"
+    else:
+        digest = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha1(f"{nonce}|{digest}".encode('utf-8')).hexdigest()[:20]
+
+class RecentKeyIndex:
+    """Index op key terbaru (LRU terbatas) -> hasil operasi, lookup O(1)"""
+
+    def __init__(self, maxlen=RECENT_OP_KEYS):
+        self.maxlen = maxlen
+        self._items = OrderedDict()  # key -> {'result': (ok, msg), 'synced': bool}
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        return self._items.get(key)
+
+    def add(self, key, result, synced=False):
+        self._items[key] = {'result': result, 'synced': synced}
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxlen:
+            self._items.popitem(last=False)
+
+    def mark_synced(self, key):
+        if key in self._items:
+            self._items[key]['synced'] = True
+
+    def seed(self, keys, result):
+        """Isi dari op key yang sudah tersimpan di sheet (dipanggil saat load)"""
+        for key in keys:
+            if key not in self._items:
+                self.add(key, result, synced=True)
+
+# ============================================================
+# LOADER PER TABEL
+# ============================================================
+
+def next_transaction_id(df):
+    """ID berikutnya untuk transaksi baru (max ID + 1)"""
+    if df.empty or 'ID' not in df.columns:
+        return 1
+    max_id = pd.to_numeric(df['ID'], errors='coerce').max()
+    return 1 if pd.isna(max_id) else int(max_id) + 1
+
+def ensure_transaction_ids(df, id_floor=0):
+    """Pastikan setiap transaksi punya ID numerik unik, dipakai untuk mapping edit & seleksi
+
+    id_floor: ID terbesar yang sudah dipakai di arsip, ID baru selalu di atasnya.
+    """
+    ids = pd.to_numeric(df['ID'], errors='coerce') if 'ID' in df.columns else pd.Series(float('nan'), index=df.index)
+    missing = ids.isna() | ids.duplicated()
+    if missing.any():
+        start = max(next_transaction_id(df.assign(ID=ids.where(~missing))), id_floor + 1)
+        ids = ids.copy()
+        ids[missing] = range(start, start + int(missing.sum()))
+    df['ID'] = ids.astype('int64')
+    return df
+
+def prepare_transaksi(transaksi):
+    """Siapkan tipe data + kolom bantu (Month, Year, Is Transfer) sekali saja"""
+    if not transaksi.empty:
+        transaksi['Tanggal'] = pd.to_datetime(transaksi['Tanggal'], errors='coerce')
+        transaksi['Nominal'] = pd.to_numeric(transaksi['Nominal'], errors='coerce').fillna(0)
+        # 🚀 OPTIMASI: Pre-compute month dan year untuk filtering cepat
+        transaksi['Month'] = transaksi['Tanggal'].dt.month_name()
+        transaksi['Year'] = transaksi['Tanggal'].dt.year
+        transaksi = ensure_transaction_ids(transaksi)
+        if OP_KEY_COLUMN not in transaksi.columns:
+            transaksi[OP_KEY_COLUMN] = ""
+        transaksi[OP_KEY_COLUMN] = transaksi[OP_KEY_COLUMN].fillna("").astype(str)
+        # Mask transfer dihitung sekali di sini, pasangan transfer lama langsung diberi Transfer ID
+        transaksi = link_transfer_pairs(mark_transfers(transaksi))
+        transaksi = mark_targets(mark_debts(transaksi))
+    return transaksi
+
+def to_sheet_format(df):
+    """Buang kolom bantu & format tanggal sebelum ditulis ke storage"""
+    df_to_save = df.drop(columns=['Month', 'Year', TRANSFER_MASK_COLUMN], errors='ignore').copy()
+    df_to_save['Tanggal'] = pd.to_datetime(df_to_save['Tanggal']).dt.strftime('%Y-%m-%d')
+    return df_to_save
+
+def touched_rows(old_df, new_df, ids):
+    """(versi lama, versi baru) dari baris ber-ID `ids` yang isinya benar-benar berubah
+
+    Dasar patch index (saldo berjalan, utang, target, checkpoint) per commit: hanya baris
+    yang disentuh operasi yang dibandingkan, bukan diff seluruh ledger. Baris yang sama persis
+    di kedua sisi (mis. hanya op key yang ditulis ulang editor) dibuang.
+    """
+    ids = list(ids)
+    before = old_df[old_df['ID'].isin(ids)]
+    after = new_df[new_df['ID'].isin(ids)]
+    if before.empty or after.empty:
+        return before, after
+    cols = [c for c in before.columns if c in after.columns and c not in ('ID', OP_KEY_COLUMN)]
+    old_side, new_side = before.set_index('ID')[cols], after.set_index('ID')[cols]
+    common = old_side.index.intersection(new_side.index)
+    old_side, new_side = old_side.loc[common], new_side.loc[common]
+    same = ((old_side == new_side) | (old_side.isna() & new_side.isna())).all(axis=1)
+    unchanged = same.index[same.to_numpy()]
+    return before[~before['ID'].isin(unchanged)], after[~after['ID'].isin(unchanged)]
+
+def load_transaksi(storage):
+    """Load sheet Transaksi + siapkan tipe data sekali saja"""
+    return prepare_transaksi(storage.read(WORKSHEETS['transaksi']))
+
+def load_dompet(storage):
+    """Load sheet Dompet (saldo awal + tanggal reset per wallet)"""
+    dompet = storage.read(WORKSHEETS['dompet'])
+    if not dompet.empty:
+        dompet['Saldo Awal'] = pd.to_numeric(dompet['Saldo Awal'], errors='coerce').fillna(0)
+        # 🚀 PERBAIKAN: Tambah kolom Tanggal Reset jika belum ada
+        if 'Tanggal Reset' not in dompet.columns:
+            dompet['Tanggal Reset'] = datetime.today().strftime('%Y-%m-%d')
+        # Parse Tanggal Reset
+        dompet['Tanggal Reset'] = pd.to_datetime(dompet['Tanggal Reset'], errors='coerce')
+        # Jika ada yang NaT, set ke hari ini
+        dompet['Tanggal Reset'] = dompet['Tanggal Reset'].fillna(pd.Timestamp.today())
+    return dompet
+
+def load_target(storage):
+    """Load sheet Target, kosong jika sheet belum ada"""
+    try:
+        target = storage.read(WORKSHEETS['target'])
+        if target.empty:
+            target = pd.DataFrame(columns=TARGET_COLUMNS)
+        else:
+            target['Nama Impian'] = target['Nama Impian'].fillna("").astype(str)
+            target['Target Harga'] = pd.to_numeric(target['Target Harga'], errors='coerce').fillna(0)
+            target['Dana Terkumpul'] = pd.to_numeric(target['Dana Terkumpul'], errors='coerce').fillna(0)
+    except BackendUnavailable:
+        raise  # Backend down: jangan anggap sheet kosong, Ledger tetap pakai cache lama
+    except:
+        target = pd.DataFrame(columns=TARGET_COLUMNS)
+        target['Nama Impian'] = target['Nama Impian'].astype(str)
+    return target
+
+def load_recurring(storage):
+    """Load sheet Recurring, kosong jika sheet belum ada"""
+    try:
+        recurring = storage.read(WORKSHEETS['recurring'])
+        if recurring.empty:
+            recurring = pd.DataFrame(columns=RECURRING_COLUMNS)
+        else:
+            recurring['Nominal'] = pd.to_numeric(recurring['Nominal'], errors='coerce').fillna(0)
+            recurring['Tanggal Mulai'] = pd.to_datetime(recurring['Tanggal Mulai'], errors='coerce')
+    except BackendUnavailable:
+        raise  # Backend down: jangan anggap sheet kosong, Ledger tetap pakai cache lama
+    except:
+        recurring = pd.DataFrame(columns=RECURRING_COLUMNS)
+    return recurring
+
+def load_ringkasan(storage):
+    """Load sheet Ringkasan Arsip, kosong jika belum pernah mengarsipkan"""
+    try:
+        ringkasan = storage.read(WORKSHEETS['ringkasan'])
+        if ringkasan.empty:
+            ringkasan = pd.DataFrame(columns=ARCHIVE_SUMMARY_COLUMNS)
+        else:
+            ringkasan['Periode'] = ringkasan['Periode'].astype(str)
+            for col in ['Nominal', 'Jumlah', 'ID Max']:
+                ringkasan[col] = pd.to_numeric(ringkasan[col], errors='coerce').fillna(0)
+    except BackendUnavailable:
+        raise  # Backend down: jangan anggap sheet kosong, Ledger tetap pakai cache lama
+    except:
+        ringkasan = pd.DataFrame(columns=ARCHIVE_SUMMARY_COLUMNS)
+    return ringkasan
+
+def load_checkpoint(storage):
+    """Load sheet Checkpoint Saldo, kosong jika belum ada"""
+    try:
+        return load_checkpoints(storage.read(WORKSHEETS['checkpoint']))
+    except BackendUnavailable:
+        raise  # Backend down: jangan anggap sheet kosong, Ledger tetap pakai cache lama
+    except:
+        return empty_checkpoints()
+
+TABLE_LOADERS = {
+    'transaksi': load_transaksi,
+    'dompet': load_dompet,
+    'target': load_target,
+    'recurring': load_recurring,
+    'ringkasan': load_ringkasan,
+    'checkpoint': load_checkpoint,
+}
+
+# ============================================================
+# LEDGER ENGINE
+# ============================================================
+
+class Ledger:
+    """Cache tabel + operasi CRUD di atas 1 storage backend
+
+    Tabel di-load lazy per nama. Setiap perubahan menaikkan `version`, yang dipakai
+    sebagai cache key untuk laporan dan struktur turunan (index, agregat).
+    Transaksi lama bisa dipindah ke `archive` (default: worksheet 'Arsip <tahun>').
+    """
+
+    def __init__(self, storage, archive=None):
+        self.storage = storage
+        self.archive = archive if archive is not None else SheetArchive(storage)
+        self._archive_years = {}  # tahun -> DataFrame arsip (arsip jarang berubah, cache tanpa versi)
+        self.tables = {name: None for name in TABLE_NAMES}
+        self.stale = set()  # Tabel yang perlu di-load ulang, isi lama tetap dipakai jika backend down
+        self.load_failed = set()  # Tabel yang gagal di-load (isi cache kosong, bukan isi sheet)
+        self.version = 0
+        self.last_update = None
+        self.load_errors = []
+        self.recent_ops = RecentKeyIndex()
+        self._derived = {}
+        self._running = None  # RunningBalance, di-patch tiap commit transaksi
+        self._debts = None  # DebtIndex, di-patch tiap commit transaksi
+        self._targets = None  # TargetIndex, di-patch tiap commit transaksi
+
+    # --- Cache & versi ---
+
+    def table(self, name, force_refresh=False):
+        """Get 1 tabel dari cache, load dari storage hanya jika belum ada / perlu refresh"""
+        with span(f"table:{name}", 'load') as info:
+            if force_refresh or self.tables[name] is None or name in self.stale:
+                info['cache'] = 'miss'
+                # Load pertama tidak menaikkan versi: belum ada laporan yang bergantung pada tabel ini
+                if force_refresh and self.tables[name] is not None:
+                    self.version += 1
+                try:
+                    self.tables[name] = TABLE_LOADERS[name](self.storage)
+                    self.stale.discard(name)
+                    self.load_failed.discard(name)
+                    if name == 'transaksi':
+                        self._seed_recent_ops(self.tables[name])
+                        self._running = None
+                        self._debts = None
+                        self._targets = None
+                    self.last_update = datetime.now()
+                except BackendUnavailable as e:
+                    # 🚀 Mode baca dari cache: tetap pakai data lama, coba load lagi di rerun berikutnya
+                    if self.tables[name] is None:
+                        self.load_errors.append(f"Error loading data: {e}")
+                        self.tables[name] = pd.DataFrame()
+                        self.load_failed.add(name)
+                    self.stale.add(name)
+                    info['cache'] = 'stale'
+                except Exception as e:
+                    self.load_errors.append(f"Error loading data: {e}")
+                    self.tables[name] = pd.DataFrame()
+                    self.stale.discard(name)
+                    self.load_failed.add(name)
+                    self.last_update = datetime.now()
+            else:
+                info['cache'] = 'hit'
+            info['rows'] = len(self.tables[name])
+        return self.tables[name]
+
+    def invalidate(self):
+        """Tandai semua tabel perlu di-load ulang (dilakukan lazy saat tabel diminta)"""
+        self.stale = {name for name in TABLE_NAMES if self.tables[name] is not None}
+        self._archive_years.clear()  # Session lain mungkin sudah menambah arsip
+        self.version += 1
+
+    def set_table(self, name, value):
+        """Ganti isi cache 1 tabel (tanpa write) dan naikkan versi data"""
+        self.tables[name] = value
+        if name in ('transaksi', 'ringkasan'):
+            self._running = None
+        if name == 'transaksi':
+            self._debts = None
+            self._targets = None
+        self.version += 1
+
+    def writable(self, name):
+        """True jika tabel sudah ter-load utuh dari storage dan backend tidak sedang read-only
+
+        Tabel stale / gagal load hanya berisi cache lama atau DataFrame kosong: menulisnya
+        (full overwrite) akan menimpa isi sheet di server.
+        """
+        return (self.tables[name] is not None and name not in self.stale and name not in self.load_failed
+                and not getattr(self.storage, 'read_only', False))
+
+    def _require_writable(self, *names):
+        """Tolak write (BackendUnavailable) jika salah satu tabel belum bisa ditulis dengan aman"""
+        blocked = [WORKSHEETS[name] for name in names if not self.writable(name)]
+        if blocked:
+            raise BackendUnavailable(f"Mode baca saja: {', '.join(blocked)} belum ter-load dari Google Sheets, "
+                                     "perubahan tidak disimpan. Coba lagi setelah koneksi pulih.")
+
+    def derived(self, key, builder):
+        """Struktur turunan (index, agregat) yang di-cache per versi data"""
+        with span(f"derived:{key}", 'aggregate') as info:
+            cached = self._derived.get(key)
+            info['cache'] = 'hit'
+            if cached is None or cached[0] != self.version:
+                info['cache'] = 'miss'
+                cached = (self.version, builder())
+                self._derived[key] = cached
+        return cached[1]
+
+    @timed('crud')
+    def save_table(self, name, value, delay=1):
+        """Tulis tabel non-transaksi (Dompet/Target/Recurring) ke storage lalu update cache"""
+        self._require_writable(name)
+        self.storage.update(WORKSHEETS[name], value, delay=delay)
+        self.set_table(name, value)
+
+    # --- Arsip & pembaca gabungan ---
+
+    def id_floor(self):
+        """ID terbesar yang sudah dipindah ke arsip (0 jika belum pernah mengarsipkan)"""
+        ringkasan = self.table('ringkasan')
+        return 0 if ringkasan.empty else int(ringkasan['ID Max'].max())
+
+    def _next_id(self, df):
+        return max(next_transaction_id(df), self.id_floor() + 1)
+
+    def archive_cutoff(self):
+        """Awal bulan pertama yang belum diarsipkan (None jika arsip kosong)"""
+        ringkasan = self.table('ringkasan')
+        if ringkasan.empty:
+            return None
+        return month_start(ringkasan['Periode'].max()) + pd.offsets.MonthBegin(1)
+
+    def archived_years(self):
+        ringkasan = self.table('ringkasan')
+        return sorted({int(periode[:4]) for periode in ringkasan['Periode'].unique()})
+
+    def _archive_year(self, year):
+        """Isi arsip 1 tahun (sudah di-prepare), kosong jika arsip tahun itu belum ada"""
+        if year not in self._archive_years:
+            with span(f"archive:{year}", 'load') as info:
+                try:
+                    rows = self.archive.read(year)
+                except BackendUnavailable:
+                    raise
+                except Exception:
+                    rows = pd.DataFrame()
+                self._archive_years[year] = prepare_transaksi(rows) if not rows.empty else rows
+                info['rows'] = len(rows)
+        return self._archive_years[year]
+
+    def full_history(self):
+        """Arsip semua tahun + tabel Transaksi (hot), untuk pencarian global & laporan multi-tahun"""
+        def build():
+            hot = self.table('transaksi')
+            parts = [self._archive_year(year) for year in self.archived_years()]
+            parts = [part for part in parts if not part.empty]
+            if not parts:
+                return hot
+            # Baris yang sempat ada di arsip & hot (arsip terputus di tengah): versi hot menang
+            combined = pd.concat(parts + [hot], ignore_index=True)
+            return combined.drop_duplicates('ID', keep='last').reset_index(drop=True)
+        return self.derived('full_history', build)
+
+    def monthly_totals(self):
+        """Total per bulan x tipe x kategori x wallet (hot + Ringkasan Arsip) untuk perbandingan periode"""
+        return self.derived('monthly_totals', lambda: build_monthly_totals(self.table('transaksi'), self.table('ringkasan')))
+
+    def history(self, start_date=None):
+        """Tabel yang cukup untuk query mulai start_date: hot saja jika tidak menyentuh arsip"""
+        cutoff = self.archive_cutoff()
+        if cutoff is None or (start_date is not None and pd.Timestamp(start_date) >= cutoff):
+            return self.table('transaksi')
+        return self.full_history()
+
+    def totals_by_tipe(self, before=None):
+        """Total Nominal per Tipe (all-time, atau sebelum tanggal `before`) tanpa membaca arsip jika bisa
+
+        Transfer antar wallet tidak dihitung (net-nya 0, tapi menggelembungkan total masuk/keluar).
+        """
+        cutoff = self.archive_cutoff()
+        if cutoff is not None and before is not None and pd.Timestamp(before) < cutoff:
+            rows = self.full_history()
+            rows = rows.loc[(rows['Tanggal'] < pd.Timestamp(before)) & ~rows[TRANSFER_MASK_COLUMN]]
+            return rows.groupby('Tipe')['Nominal'].sum()
+
+        hot = self.table('transaksi')
+        if not hot.empty:
+            hot = hot.loc[~hot[TRANSFER_MASK_COLUMN]]
+            if before is not None:
+                hot = hot.loc[hot['Tanggal'] < pd.Timestamp(before)]
+        totals = hot.groupby('Tipe')['Nominal'].sum() if not hot.empty else pd.Series(dtype=float)
+        ringkasan = self.table('ringkasan')
+        if not ringkasan.empty:
+            ringkasan = ringkasan[ringkasan['Kategori'] != KATEGORI_TRANSFER]
+            totals = totals.add(ringkasan.groupby('Tipe')['Nominal'].sum(), fill_value=0)
+        return totals
+
+    def archive_before(self, cutoff):
+        """Pindahkan transaksi sebelum bulan `cutoff` ke arsip per tahun
+
+        Yang tetap di sheet Transaksi: utang 'Belum Lunas' (+ cicilannya), setoran ke Target Impian
+        yang masih ada, dan semua transaksi sejak Tanggal Reset wallet paling awal (cutoff dimundurkan
+        ke bulan itu), supaya saldo wallet tetap bisa dihitung dari tabel hot saja.
+        Urutan write: arsip -> ringkasan -> Transaksi, jadi gagal di tengah tidak
+        menghilangkan data (paling buruk baris ada di arsip & hot, dan bisa diulang).
+        """
+        try:
+            cutoff = month_start(cutoff)
+            dompet = self.table('dompet')
+            if not dompet.empty and 'Tanggal Reset' in dompet.columns:
+                cutoff = min(cutoff, month_start(dompet['Tanggal Reset'].min()))
+
+            df = self.table('transaksi')
+            self.table('ringkasan')
+            self._require_writable('transaksi', 'ringkasan')
+            if df.empty:
+                return False, "Tidak ada transaksi."
+            # Cicilan dari utang yang belum lunas juga tetap hot agar progres cicilan tetap lengkap
+            open_links = [debt_link_for(debt_id) for debt_id in df.loc[df['Status'] == DEBT_STATUS, 'ID']]
+            move = (df['Tanggal'] < cutoff) & (df['Status'] != DEBT_STATUS) & ~df[DEBT_ID_COLUMN].isin(open_links)
+            # Setoran ke target yang masih ada juga tetap hot agar dana terkumpul tetap dihitung dari ledger
+            target = self.table('target')
+            if 'Nama Impian' in target.columns:
+                move &= ~df[TARGET_LINK_COLUMN].isin(target['Nama Impian'])
+            if not move.any():
+                return False, f"Tidak ada transaksi sebelum {cutoff:%b %Y} yang bisa diarsipkan."
+            moving = df.loc[move]
+
+            years = sorted(moving['Tanggal'].dt.year.unique())
+            summaries = []
+            for year in years:
+                merged = pd.concat([self._archive_year(year), moving[moving['Tanggal'].dt.year == year]], ignore_index=True)
+                merged = merged.drop_duplicates('ID', keep='last').sort_values(['Tanggal', 'ID'], kind='stable')
+                self.archive.write(year, to_sheet_format(merged))
+                self._archive_years[year] = merged.reset_index(drop=True)
+                summaries.append(summarize_archive(merged))
+
+            # Ringkasan tahun yang disentuh dihitung ulang dari isi arsip (aman diulang)
+            ringkasan = self.table('ringkasan')
+            kept = ringkasan[~ringkasan['Periode'].str[:4].isin([str(y) for y in years])]
+            ringkasan = pd.concat([kept] + summaries, ignore_index=True).sort_values('Periode', kind='stable')
+            self.storage.update(WORKSHEETS['ringkasan'], ringkasan)
+            self.set_table('ringkasan', ringkasan.reset_index(drop=True))
+
+            hot = df.loc[~move].reset_index(drop=True)
+            self.storage.update(WORKSHEETS['transaksi'], to_sheet_format(hot))
+            self.set_table('transaksi', hot)
+            return True, f"{len(moving):,} transaksi sebelum {cutoff:%b %Y} dipindah ke arsip ({', '.join(map(str, years))})."
+        except Exception as e:
+            return False, f"Error: {e}"
+
+    # --- Checkpoint saldo wallet ---
+
+    def _save_checkpoints(self, checkpoints):
+        self._require_writable('checkpoint')
+        self.storage.update(WORKSHEETS['checkpoint'], checkpoints_to_sheet(checkpoints))
+        self.set_table('checkpoint', checkpoints)
+
+    def checkpoints(self):
+        """Checkpoint tersimpan + checkpoint 'awal' dari sheet Dompet untuk wallet yang belum punya"""
+        return self.derived('checkpoints', lambda: seed_checkpoints(self.table('dompet'), self.table('checkpoint')))
+
+    def _drop_stale_checkpoints(self, before, after):
+        """Hapus checkpoint akhir bulan setelah tanggal transaksi yang berubah (dibuat ulang oleh roll_checkpoints)"""
+        checkpoints = self.table('checkpoint')
+        stale = stale_month_end_mask(checkpoints, before, after)
+        if stale.any():
+            self._save_checkpoints(checkpoints[~stale].reset_index(drop=True))
+
+    def wallet_balances(self, date=None):
+        """Saldo per wallet di akhir hari `date` (default hari ini) dari checkpoint terdekat
+
+        Return salinan sheet Dompet + kolom Total Masuk, Total Keluar, Saldo Sekarang
+        (Total Masuk/Keluar = transaksi sejak checkpoint yang dipakai).
+        """
+        date = pd.Timestamp(date or datetime.today()).normalize()
+        checkpoints = self.checkpoints()
+        base = latest_checkpoints(checkpoints, date + pd.Timedelta(days=1))
+        rows = self.history(base['Tanggal Reset'].min() if not base.empty else None)
+        balances = balances_at(rows, checkpoints, date).set_index('Wallet')
+
+        live_wallets = self.table('dompet').copy()
+        if live_wallets.empty:
+            return live_wallets
+        for col in ['Total Masuk', 'Total Keluar', 'Saldo Sekarang']:
+            live_wallets[col] = live_wallets['Wallet'].map(balances[col]).astype(float)
+        live_wallets['Checkpoint'] = live_wallets['Wallet'].map(balances['Tanggal Reset'])
+        return live_wallets
+
+    @timed('crud')
+    def roll_checkpoints(self, today=None):
+        """Tulis checkpoint awal bulan yang belum ada (dan checkpoint 'awal' hasil seed). Return jumlah baru"""
+        checkpoints = self.checkpoints()
+        stored = self.table('checkpoint')
+        new_rows = month_end_checkpoints(self.history(checkpoints['Tanggal'].max() if not checkpoints.empty else None),
+                                         checkpoints, today)
+        added = len(checkpoints) - len(stored) + len(new_rows)
+        if added > 0:
+            self._save_checkpoints(sort_checkpoints(pd.concat([checkpoints, new_rows], ignore_index=True)))
+        return added
+
+    @timed('crud')
+    def reset_wallets(self, edited_wallets, reset_date):
+        """Atur Saldo Awal: catat checkpoint 'reset' (+ drift) lalu simpan sheet Dompet
+
+        Saldo yang diinput = saldo riil di awal `reset_date`. Selisih = saldo riil - saldo hitungan.
+        """
+        reset_date = pd.Timestamp(reset_date).normalize()
+        computed = self.wallet_balances(reset_date - pd.Timedelta(days=1)).set_index('Wallet')['Saldo Sekarang']
+        self._require_writable('checkpoint', 'dompet')  # Cek keduanya sebelum write pertama
+        resets = pd.DataFrame({
+            'Wallet': edited_wallets['Wallet'].values,
+            'Tanggal': reset_date,
+            'Saldo': edited_wallets['Saldo Awal'].astype(float).values,
+            'Jenis': 'reset',
+            'Dicatat': datetime.now().strftime('%Y-%m-%d %H:%M'),
+        })
+        resets['Selisih'] = resets['Saldo'] - resets['Wallet'].map(computed).fillna(resets['Saldo'])
+        checkpoints = self.checkpoints()
+        # Checkpoint setelah reset tidak berlaku lagi
+        checkpoints = checkpoints[~(checkpoints['Wallet'].isin(resets['Wallet']) & (checkpoints['Tanggal'] >= reset_date))]
+        # Checkpoint dulu: jika simpan Dompet gagal, saldo tetap dihitung dari reset ini
+        self._save_checkpoints(sort_checkpoints(pd.concat([checkpoints, resets], ignore_index=True)))
+
+        dompet = edited_wallets.copy()
+        dompet['Tanggal Reset'] = reset_date.strftime('%Y-%m-%d')
+        self.save_table('dompet', dompet, delay=2)
+        return resets
+
+    def reset_history(self):
+        """Riwayat reset saldo per wallet (terbaru di atas) untuk audit drift"""
+        checkpoints = self.table('checkpoint')
+        return checkpoints[checkpoints['Jenis'] == 'reset'].sort_values('Tanggal', ascending=False, kind='stable')
+
+    # --- Saldo berjalan ---
+
+    def running_balance(self):
+        """RunningBalance atas transaksi sejak checkpoint paling awal (dibangun 1x, lalu di-patch)"""
+        if self._running is None:
+            checkpoints = self.checkpoints()
+            rows = self.history(checkpoints['Tanggal'].min() if not checkpoints.empty else None)
+            offset = 0.0
+            if rows is self.table('transaksi'):
+                # Net transaksi yang sudah diarsipkan jadi saldo awal global
+                archived = self.table('ringkasan').groupby('Tipe')['Nominal'].sum()
+                offset = float(archived.get('Pemasukan', 0) - archived.get('Pengeluaran', 0))
+            with span("running_balance:build", 'aggregate', rows=len(rows)):
+                self._running = RunningBalance(rows, global_offset=offset)
+        return self._running
+
+    def balance_series(self, dates, wallet=None):
+        """Saldo di akhir tiap tanggal: global, atau saldo riil 1 wallet (checkpoint + kumulatif)
+
+        Per wallet: saldo = checkpoint terdekat + (kumulatif(tanggal) - kumulatif(sebelum checkpoint)).
+        NaN untuk tanggal sebelum checkpoint pertama wallet tersebut.
+        """
+        running = self.running_balance()
+        dates = pd.DatetimeIndex(pd.to_datetime(dates)).normalize()
+        if wallet is None:
+            return pd.Series(running.balance_series(dates), index=dates)
+
+        checkpoints = self.checkpoints()
+        cps = checkpoints[checkpoints['Wallet'] == wallet]
+        # Checkpoint bertanggal T = saldo awal hari T, berlaku untuk tanggal >= T-1 (akhir hari sebelumnya)
+        cp_idx = cps['Tanggal'].searchsorted(dates + pd.Timedelta(days=1), side='right') - 1
+        valid = cp_idx >= 0
+        cp_rows = cps.iloc[cp_idx.clip(0)] if len(cps) else cps
+        values = np.full(len(dates), np.nan)
+        if valid.any():
+            cp_dates = pd.DatetimeIndex(cp_rows['Tanggal']) - pd.Timedelta(days=1)
+            values[valid] = (cp_rows['Saldo'].to_numpy()[valid]
+                             + running.balance_series(dates[valid], wallet)
+                             - running.balance_series(cp_dates[valid], wallet))
+        return pd.Series(values, index=dates)
+
+    def balance_at(self, date, wallet=None):
+        """Saldo di akhir tanggal `date` (global atau per wallet), O(log n)"""
+        return float(self.balance_series([date], wallet).iloc[0])
+
+    def statement_balances(self, start_date, end_date, wallet=None):
+        """(saldo_awal, saldo_akhir) untuk e-statement: saldo akhir hari sebelum start & akhir end"""
+        values = self.balance_series([pd.Timestamp(start_date) - pd.Timedelta(days=1), end_date], wallet).fillna(0)
+        return float(values.iloc[0]), float(values.iloc[1])
+
+    # --- Idempotensi ---
+
+    def _seed_recent_ops(self, transaksi):
+        if transaksi.empty or OP_KEY_COLUMN not in transaksi.columns:
+            return
+        keys = transaksi[OP_KEY_COLUMN].iloc[-RECENT_OP_KEYS:]
+        self.recent_ops.seed(keys[keys != ""].unique(), (True, "Operasi ini sudah tersimpan sebelumnya."))
+
+    def _replay(self, op_key):
+        """Hasil operasi jika op_key sudah pernah diterapkan (None jika belum)
+
+        Operasi tidak diterapkan ulang. Jika write-nya dulu gagal, tabel di cache
+        (yang sudah berisi operasi ini) dikirim ulang ke storage.
+        """
+        entry = self.recent_ops.get(op_key)
+        if entry is None:
+            return None
+        if not entry['synced']:
+            self._require_writable('transaksi')
+            self.storage.update(WORKSHEETS['transaksi'], to_sheet_format(self.table('transaksi')))
+            self.recent_ops.mark_synced(op_key)
+        return entry['result']
+
+    def _commit_transaksi(self, final_df, op_key, result, touched_ids):
+        """Update cache lokal dulu, lalu sync seluruh tabel Transaksi ke storage
+
+        touched_ids: ID yang ditambah / diedit / dihapus operasi ini. Index turunan di-patch
+        dari baris-baris itu saja (+ kaki pasangan transfernya).
+        op_key dicatat sebelum write, jadi retry setelah timeout tidak menerapkan operasi 2x.
+        Dicek sebelum table() dipanggil lagi: final_df bisa saja dibangun dari cache kosong.
+        """
+        self.table('checkpoint')  # _drop_stale_checkpoints juga menulis sheet Checkpoint
+        self._require_writable('transaksi', 'checkpoint')
+        old_df = self.table('transaksi')
+        # Edit / hapus 1 kaki transfer ikut diterapkan ke pasangannya dalam write yang sama
+        final_df = mark_targets(mark_debts(sync_transfer_partners(old_df, mark_transfers(final_df.copy()))))
+        before, after = touched_rows(old_df, final_df, with_transfer_partners(old_df, touched_ids))
+        running, debts, targets = self._running, self._debts, self._targets
+        self.set_table('transaksi', final_df)
+        if running is not None and running.patch(before, after):
+            # 🚀 OPTIMASI: Patch saldo berjalan dari baris yang berubah saja, tanpa sort ulang
+            self._running = running
+        if debts is not None:
+            debts.patch(before, after)
+            self._debts = debts
+        if targets is not None:
+            targets.patch(before, after)
+            self._targets = targets
+        self.recent_ops.add(op_key, result)
+        self.storage.update(WORKSHEETS['transaksi'], to_sheet_format(final_df))
+        self.recent_ops.mark_synced(op_key)
+        self._drop_stale_checkpoints(before, after)
+        return result
+
+    # --- CRUD Transaksi ---
+
+    @timed('crud')
+    def add_transaction(self, new_data_dict, op_key=None):
+        """Add transaction dengan operasi yang dioptimasi"""
+        op_key = op_key or new_operation_key()
+        try:
+            replay = self._replay(op_key)
+            if replay is not None:
+                return replay
+
+            # Gunakan cache lokal, jangan fetch dari sheets lagi
+            df = self.table('transaksi')
+
+            new_row = pd.DataFrame([new_data_dict])
+
+            # Prepare new row data types
+            new_row['Tanggal'] = pd.to_datetime(new_row['Tanggal'])
+            new_row['Nominal'] = pd.to_numeric(new_row['Nominal'])
+            new_row['Month'] = new_row['Tanggal'].dt.month_name()
+            new_row['Year'] = new_row['Tanggal'].dt.year
+            new_row['ID'] = self._next_id(df)
+            new_row[OP_KEY_COLUMN] = op_key
+
+            return self._commit_transaksi(pd.concat([df, new_row], ignore_index=True), op_key,
+                                          (True, "Data berhasil disimpan!"), new_row['ID'])
+        except Exception as e:
+            return False, f"Error: {e}"
+
+    @timed('crud')
+    def add_transactions_bulk(self, new_rows, op_key=None):
+        """Tambah banyak transaksi sekaligus dengan 1x write ke storage"""
+        op_key = op_key or new_operation_key()
+        try:
+            if new_rows.empty:
+                return False, "Tidak ada transaksi untuk disimpan."
+            replay = self._replay(op_key)
+            if replay is not None:
+                return replay
+
+            df = self.table('transaksi')
+
+            new_rows = new_rows.copy()
+            new_rows['Tanggal'] = pd.to_datetime(new_rows['Tanggal'])
+            new_rows['Nominal'] = pd.to_numeric(new_rows['Nominal'], errors='coerce').fillna(0)
+            new_rows['Month'] = new_rows['Tanggal'].dt.month_name()
+            new_rows['Year'] = new_rows['Tanggal'].dt.year
+            first_id = self._next_id(df)
+            new_rows['ID'] = range(first_id, first_id + len(new_rows))
+            new_rows[OP_KEY_COLUMN] = op_key
+
+            return self._commit_transaksi(pd.concat([df, new_rows], ignore_index=True), op_key,
+                                          (True, f"{len(new_rows):,} transaksi berhasil diimport!"), new_rows['ID'])
+        except Exception as e:
+            return False, f"Error: {e}"
+
+    @timed('crud')
+    def update_transactions_batch(self, updated_df, month_filter, year_filter, op_key=None):
+        """Update multiple transactions sekaligus (batch operation)"""
+        op_key = op_key or new_operation_key()
+        try:
+            replay = self._replay(op_key)
+            if replay is not None:
+                return replay
+
+            orig = self.table('transaksi')
+
+            # Filter rows yang tidak diubah
+            mask = (orig['Month'] == month_filter) & (orig['Year'] == year_filter)
+            orig_kept = orig[~mask].copy()
+
+            # Prepare updated data
+            updated_clean = updated_df.copy()
+            updated_clean['Tanggal'] = pd.to_datetime(updated_clean['Tanggal'])
+            updated_clean['Month'] = updated_clean['Tanggal'].dt.month_name()
+            updated_clean['Year'] = updated_clean['Tanggal'].dt.year
+            updated_clean[OP_KEY_COLUMN] = op_key
+            if TRANSFER_ID_COLUMN not in updated_clean.columns and 'ID' in updated_clean.columns:
+                # Editor tidak membawa Transfer ID: ambil lagi dari tabel lama lewat ID
+                updated_clean[TRANSFER_ID_COLUMN] = updated_clean['ID'].map(orig.set_index('ID')[TRANSFER_ID_COLUMN])
+
+            final_df = ensure_transaction_ids(pd.concat([orig_kept, updated_clean], ignore_index=True), self.id_floor())
+            touched_ids = set(orig.loc[mask, 'ID']) | set(final_df['ID'].iloc[len(orig_kept):])
+            return self._commit_transaksi(final_df, op_key, (True, "Batch update berhasil!"), touched_ids)
+        except Exception as e:
+            return False, f"Error: {e}"
+
+    @timed('crud')
+    def update_transactions_by_id(self, original_ids, edited_df, op_key=None):
+        """Terapkan hasil edit 1 halaman tabel berdasarkan ID transaksi
+
+        original_ids: ID yang tampil di halaman sebelum diedit. ID yang hilang dari
+        edited_df dianggap dihapus, baris tanpa ID dianggap transaksi baru.
+        """
+        op_key = op_key or new_operation_key()
+        try:
+            replay = self._replay(op_key)
+            if replay is not None:
+                return replay
+
+            orig = self.table('transaksi')
+            edited = edited_df.copy()
+            edited['ID'] = pd.to_numeric(edited['ID'], errors='coerce')
+            edited['Tanggal'] = pd.to_datetime(edited['Tanggal'])
+            edited['Nominal'] = pd.to_numeric(edited['Nominal'], errors='coerce').fillna(0)
+
+            # Hapus: ID yang tadinya tampil tapi sudah tidak ada di editor
+            deleted_ids = set(original_ids) - set(edited['ID'].dropna().astype('int64'))
+            result = orig[~orig['ID'].isin(deleted_ids)]
+
+            # Update: tulis ulang kolom yang bisa diedit, dicocokkan lewat ID
+            existing = edited[edited['ID'].notna()].astype({'ID': 'int64'}).set_index('ID')
+            editable_cols = [c for c in existing.columns if c in result.columns]
+            result = result.set_index('ID')
+            common_ids = existing.index.intersection(result.index)
+            result.loc[common_ids, editable_cols] = existing.loc[common_ids, editable_cols]
+            result.loc[common_ids, OP_KEY_COLUMN] = op_key
+            result = result.reset_index()
+
+            # Insert: baris baru dari editor
+            new_rows = edited[edited['ID'].isna()].drop(columns=['ID'])
+            if not new_rows.empty:
+                first_id = self._next_id(orig)
+                new_rows['ID'] = range(first_id, first_id + len(new_rows))
+                new_rows[OP_KEY_COLUMN] = op_key
+                result = pd.concat([result, new_rows], ignore_index=True)
+
+            result['Tanggal'] = pd.to_datetime(result['Tanggal'])
+            result['Month'] = result['Tanggal'].dt.month_name()
+            result['Year'] = result['Tanggal'].dt.year
+            touched_ids = set(original_ids) | set(common_ids) | set(new_rows.get('ID', []))
+            return self._commit_transaksi(result[list(orig.columns)], op_key, (True, "Batch update berhasil!"), touched_ids)
+        except Exception as e:
+            return False, f"Error: {e}"
+
+    @timed('crud')
+    def add_internal_transfer(self, transfer_date, nominal, source_wallet, target_wallet, note="", op_key=None):
+        """Catat top up antar wallet sebagai 2 transaksi agar saldo sumber/tujuan otomatis terhitung."""
+        op_key = op_key or new_operation_key()
+        try:
+            if nominal <= 0:
+                return False, "Nominal transfer harus lebih dari 0."
+            if source_wallet == target_wallet:
+                return False, "Wallet sumber dan tujuan harus berbeda."
+            replay = self._replay(op_key)
+            if replay is not None:
+                return replay
+
+            df = self.table('transaksi')
+            base_note = note.strip() if note else "Transfer antar dompet"
+
+            transfer_rows = pd.DataFrame([
+                {
+                    "Tanggal": pd.to_datetime(transfer_date).strftime("%Y-%m-%d"),
+                    "Item": f"Top Up ke {target_wallet}",
+                    "Kategori": KATEGORI_TRANSFER,
+                    "Nominal": nominal,
+                    "Tipe": "Pengeluaran",
+                    "Status": "Lunas",
+                    "Keterangan": f"{base_note} | Dari {source_wallet} ke {target_wallet}",
+                    "Metode Pembayaran": source_wallet
+                },
+                {
+                    "Tanggal": pd.to_datetime(transfer_date).strftime("%Y-%m-%d"),
+                    "Item": f"Top Up dari {source_wallet}",
+                    "Kategori": KATEGORI_TRANSFER,
+                    "Nominal": nominal,
+                    "Tipe": "Pemasukan",
+                    "Status": "Lunas",
+                    "Keterangan": f"{base_note} | Dari {source_wallet} ke {target_wallet}",
+                    "Metode Pembayaran": target_wallet
+                }
+            ])
+
+            transfer_rows['Tanggal'] = pd.to_datetime(transfer_rows['Tanggal'])
+            transfer_rows['Nominal'] = pd.to_numeric(transfer_rows['Nominal'], errors='coerce').fillna(0)
+            transfer_rows['Month'] = transfer_rows['Tanggal'].dt.month_name()
+            transfer_rows['Year'] = transfer_rows['Tanggal'].dt.year
+            first_id = self._next_id(df)
+            transfer_rows['ID'] = [first_id, first_id + 1]
+            transfer_rows[OP_KEY_COLUMN] = op_key  # Sepasang baris transfer berbagi 1 op key
+            transfer_rows[TRANSFER_ID_COLUMN] = transfer_id_for(first_id)
+
+            return self._commit_transaksi(pd.concat([df, transfer_rows], ignore_index=True), op_key,
+                                          (True, f"Top up Rp {nominal:,.0f} dari {source_wallet} ke {target_wallet} berhasil!"),
+                                          transfer_rows['ID'])
+        except Exception as e:
+            return False, f"Error: {e}"
+
+    def debts(self):
+        """DebtIndex: sisa utang per transaksi 'Belum Lunas' + cicilannya (dibangun 1x, lalu di-patch)"""
+        if self._debts is None:
+            with span("debts:build", 'aggregate'):
+                self._debts = DebtIndex(self.table('transaksi'))
+        return self._debts
+
+    def targets(self):
+        """TargetIndex: dana per Target Impian dari transaksi ber-tag (dibangun 1x, lalu di-patch)"""
+        if self._targets is None:
+            with span("targets:build", 'aggregate'):
+                self._targets = TargetIndex(self.table('transaksi'))
+        return self._targets
+
+    def target_progress(self, today=None):
+        """Progres + ETA semua Target Impian (1 pass atas TargetIndex)"""
+        return self.targets().progress(self.table('target'), today)
+
+    @timed('crud')
+    def pay_debts(self, payments, payment_date=None, op_key=None):
+        """Bayar banyak utang sekaligus: 1 update vectorized + 1x write
+
+        payments: kolom ID, Bayar (kosong / >= sisa = lunas penuh, selain itu harus > 0), Metode Pembayaran.
+        Bayar < sisa (atau pelunasan utang yang sudah dicicil) dicatat sebagai pasangan transfer
+        cicilan bertanggal payment_date (default hari ini); Nominal utang asal tidak diubah.
+        Return (ok, pesan, total_per_wallet, item_tanpa_metode). ok False + pesan kosong = tidak ada perubahan.
+        """
+        op_key = op_key or new_operation_key()
+        try:
+            payments = payments.drop_duplicates('ID', keep='last')
+            no_method = payments['Metode Pembayaran'].isna() | (payments['Metode Pembayaran'] == "-")
+            missing_method = payments.loc[no_method, 'Item'].tolist() if 'Item' in payments.columns else []
+            payments = payments[~no_method]
+            invalid = payments['Bayar'].notna() & ~(pd.to_numeric(payments['Bayar'], errors='coerce') > 0)
+            if invalid.any():
+                items = payments.loc[invalid, 'Item'].tolist() if 'Item' in payments.columns else payments.loc[invalid, 'ID'].tolist()
+                return False, f"Nominal bayar harus lebih dari 0: {', '.join(map(str, items))}", {}, missing_method
+            replay = self._replay(op_key)
+            if replay is not None:
+                # Key hasil seed dari sheet hanya menyimpan (ok, msg): anggap tidak ada perubahan baru
+                return replay if len(replay) == 4 else (replay[0], replay[1], {}, [])
+            if payments.empty:
+                return False, "", {}, missing_method
+
+            df = self.table('transaksi')
+            final_df, changes_count, payment_summary = apply_debt_payments(
+                df, payments, payment_date or datetime.today(), self._next_id(df), op_key, OP_KEY_COLUMN,
+                paid=self.debts().paid_by_debt(),
+            )
+            if changes_count == 0:
+                return False, "", {}, missing_method
+            touched_ids = set(payments['ID']) | set(final_df['ID'].iloc[len(df):])
+            return self._commit_transaksi(final_df, op_key, (True, f"Berhasil membayar {changes_count} utang!",
+                                                             payment_summary, missing_method), touched_ids)
+        except Exception as e:
+            return False, f"Error: {e}", {}, []
+
+    def settle_debts(self, edited_unpaid, op_key=None):
+        """Lunasi penuh utang yang Status-nya diubah ke 'Lunas' di editor (dicocokkan lewat ID)
+
+        Return sama seperti pay_debts: (ok, pesan, total_per_wallet, item_tanpa_metode).
+        """
+        settled = edited_unpaid[edited_unpaid['Status'] == 'Lunas']
+        payments = settled[['ID', 'Item', 'Metode Pembayaran']].assign(Bayar=np.nan)
+        return self.pay_debts(payments, op_key=op_key)
@@ -0,0 +1,191 @@
+"""Metrik I/O storage (latency, retry, payload) dalam format teks Prometheus
+
+Registry dibuat 1x per proses (STORAGE_METRICS). SheetStorage mencatat tiap panggilan
+backend (1 percobaan), ResilientStorage mencatat hasil akhir tiap write logis, jumlah
+percobaan / retry-nya, dan penolakan oleh circuit breaker / rate limiter.
+Hasilnya bisa dibaca lewat render(), ditulis berkala ke file (textfile collector)
+oleh thread background, atau di-serve di endpoint HTTP lokal /metrics. observe() hanya
+menaikkan counter di memori, jadi tidak menambah biaya ke panggilan storage.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import threading
+import time
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PAYLOAD_BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+WRITE_ATTEMPT_BUCKETS = (1, 2, 3, 5, 10, 20)
+TEXTFILE_INTERVAL = 15.0  # Detik antar penulisan textfile
+
+def payload_size(data):
+    """Ukuran payload (bytes) + jumlah baris, tanpa serialisasi tabel
+
+    Pakai memory_usage(deep=True): kolom string dihitung isi teksnya (bukan pointer 8 byte),
+    jadi dekat dengan ukuran yang benar-benar dikirim, tanpa membuat CSV penuh.
+    """
+    try:
+        return int(data.memory_usage(index=False, deep=True).sum()), len(data)
+    except AttributeError:
+        return 0, 0
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels):
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+class StorageMetrics:
+    """Counter & histogram per (operation, worksheet)"""
+
+    def __init__(self):
+        self.textfile_path = None
+        self._writer = None
+        self._lock = threading.Lock()
+        self.requests = {}       # (operation, worksheet, outcome) -> jumlah panggilan backend
+        self.retries = {}        # (operation, worksheet) -> jumlah retry
+        self.writes = {}         # (worksheet, outcome) -> jumlah write logis per hasil
+        self.rejections = {}     # (operation, worksheet, reason) -> ditolak sebelum ke backend
+        self.write_attempts = {}  # worksheet -> _Histogram percobaan per write yang selesai
+        self.rows = {}           # (operation, worksheet) -> total baris
+        self.latency = {}        # (operation, worksheet) -> _Histogram detik
+        self.payload_bytes = {}  # (operation, worksheet) -> _Histogram bytes
+
+    def observe(self, operation, worksheet, seconds, outcome, rows=0, payload_bytes=0, retries=0):
+        """Catat 1 panggilan storage"""
+        key = (operation, worksheet)
+        with self._lock:
+            self.requests[key + (outcome,)] = self.requests.get(key + (outcome,), 0) + 1
+            self.retries[key] = self.retries.get(key, 0) + retries
+            self.rows[key] = self.rows.get(key, 0) + rows
+            self.latency.setdefault(key, _Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.payload_bytes.setdefault(key, _Histogram(PAYLOAD_BYTES_BUCKETS)).observe(payload_bytes)
+
+    def observe_write(self, worksheet, outcome, attempts=0):
+        """Catat hasil 1 write logis: saved / queued / superseded / dropped
+
+        'queued' bukan hasil akhir: write itu nanti tercatat lagi sebagai saved, dropped,
+        atau superseded (digantikan snapshot yang lebih baru sebelum terkirim).
+        attempts > 0 hanya untuk write yang selesai (saved / dropped).
+        """
+        with self._lock:
+            self.writes[(worksheet, outcome)] = self.writes.get((worksheet, outcome), 0) + 1
+            if attempts:
+                key = ('update', worksheet)
+                self.retries[key] = self.retries.get(key, 0) + attempts - 1
+                self.write_attempts.setdefault(worksheet, _Histogram(WRITE_ATTEMPT_BUCKETS)).observe(attempts)
+
+    def observe_rejection(self, operation, worksheet, reason):
+        """Catat panggilan yang ditolak sebelum ke backend: breaker_open / rate_limited"""
+        key = (operation, worksheet, reason)
+        with self._lock:
+            self.rejections[key] = self.rejections.get(key, 0) + 1
+
+    def render(self):
+        """Semua metrik dalam Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines += ["# HELP bento_storage_requests_total Jumlah panggilan backend per hasil (1 per percobaan).",
+                      "# TYPE bento_storage_requests_total counter"]
+            for (operation, worksheet, outcome), count in sorted(self.requests.items()):
+                labels = _format_labels([('operation', operation), ('worksheet', worksheet), ('outcome', outcome)])
+                lines.append(f"bento_storage_requests_total{{{labels}}} {count}")
+
+            lines += ["# HELP bento_storage_writes_total Jumlah write logis per hasil (saved/queued/superseded/dropped).",
+                      "# TYPE bento_storage_writes_total counter"]
+            for (worksheet, outcome), count in sorted(self.writes.items()):
+                lines.append(f"bento_storage_writes_total{{{_format_labels([('worksheet', worksheet), ('outcome', outcome)])}}} {count}")
+
+            lines += ["# HELP bento_storage_rejections_total Panggilan yang ditolak circuit breaker / rate limiter.",
+                      "# TYPE bento_storage_rejections_total counter"]
+            for (operation, worksheet, reason), count in sorted(self.rejections.items()):
+                labels = _format_labels([('operation', operation), ('worksheet', worksheet), ('reason', reason)])
+                lines.append(f"bento_storage_rejections_total{{{labels}}} {count}")
+
+            lines += ["# HELP bento_storage_retries_total Jumlah retry karena error koneksi / kuota.",
+                      "# TYPE bento_storage_retries_total counter"]
+            for (operation, worksheet), count in sorted(self.retries.items()):
+                lines.append(f"bento_storage_retries_total{{{_format_labels([('operation', operation), ('worksheet', worksheet)])}}} {count}")
+
+            lines += ["# HELP bento_storage_rows_total Jumlah baris yang dibaca / ditulis.",
+                      "# TYPE bento_storage_rows_total counter"]
+            for (operation, worksheet), count in sorted(self.rows.items()):
+                lines.append(f"bento_storage_rows_total{{{_format_labels([('operation', operation), ('worksheet', worksheet)])}}} {count}")
+
+            for metric, help_text, histograms in [
+                ('bento_storage_latency_seconds', "Durasi panggilan storage termasuk retry.", self.latency),
+                ('bento_storage_payload_bytes', "Ukuran payload per panggilan (memori tabel, termasuk isi string).", self.payload_bytes),
+                ('bento_storage_write_attempts', "Jumlah percobaan kirim per write yang selesai.",
+                 {('update', worksheet): hist for worksheet, hist in self.write_attempts.items()}),
+            ]:
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                for (operation, worksheet), hist in sorted(histograms.items()):
+                    base = [('operation', operation), ('worksheet', worksheet)]
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f"{metric}_bucket{{{_format_labels(base + [('le', bound)])}}} {count}")
+                    lines.append(f"{metric}_bucket{{{_format_labels(base + [('le', '+Inf')])}}} {hist.total}")
+                    lines.append(f"{metric}_sum{{{_format_labels(base)}}} {hist.sum}")
+                    lines.append(f"{metric}_count{{{_format_labels(base)}}} {hist.total}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Tulis metrik ke file secara atomic (format textfile collector node_exporter)"""
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def start_textfile_writer(self, path, interval=TEXTFILE_INTERVAL):
+        """Tulis textfile tiap `interval` detik di thread daemon (1x per proses)"""
+        self.textfile_path = path
+        if self._writer is not None:
+            return self._writer
+
+        def write_loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write_textfile(self.textfile_path)
+                except OSError:
+                    pass  # Disk penuh / folder hilang: coba lagi di putaran berikutnya
+
+        self._writer = threading.Thread(target=write_loop, name="bento-metrics-textfile", daemon=True)
+        self._writer.start()
+        return self._writer
+
+def serve_metrics(metrics, port, host="127.0.0.1"):
+    """Serve GET /metrics di thread daemon. Return server (panggil shutdown() untuk berhenti)"""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Jangan spam log Streamlit
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="bento-metrics", daemon=True).start()
+    return server
+
+# Registry bersama untuk semua session dalam 1 proses server
+STORAGE_METRICS = StorageMetrics()
@@ -0,0 +1,115 @@
+"""Timing span untuk hot path (load, CRUD, filter, agregat, chart, export)
+
+Profiler hanya aktif di thread yang memanggil activate(), jadi tiap rerun Streamlit
+(dan tiap session) punya catatan sendiri. Saat tidak aktif, @timed hanya menambah
+1 lookup thread-local per pemanggilan.
+"""
+from contextlib import contextmanager
+from functools import wraps
+import json
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+_local = threading.local()
+
+class Profiler:
+    """Kumpulan span untuk 1 rerun, opsional ditulis ke file trace JSONL"""
+
+    def __init__(self, trace_path=None):
+        self.trace_path = trace_path
+        self.run_id = uuid.uuid4().hex[:8]
+        self.started = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()  # span dari thread job laporan bisa masuk bersamaan
+
+    def record(self, name, category, seconds, rows=None, cache=None, depth=0):
+        span = {
+            'run': self.run_id,
+            'ts': time.time(),
+            'name': name,
+            'category': category,
+            'ms': seconds * 1000,
+            'rows': rows,
+            'cache': cache,
+            'depth': depth,
+        }
+        with self._lock:
+            self.spans.append(span)
+            if self.trace_path:
+                with open(self.trace_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(span) + "\n")
+
+    def wall_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def summary(self):
+        """DataFrame span top-level + total per kategori (span nested tidak dihitung ganda)"""
+        spans = pd.DataFrame(self.spans, columns=['run', 'ts', 'name', 'category', 'ms', 'rows', 'cache', 'depth'])
+        per_category = spans[spans['depth'] == 0].groupby('category')['ms'].sum().sort_values(ascending=False)
+        return spans, per_category
+
+def activate(profiler):
+    """Pasang profiler untuk thread ini"""
+    _local.profiler = profiler
+    _local.depth = 0
+
+def deactivate():
+    _local.profiler = None
+
+def current():
+    return getattr(_local, 'profiler', None)
+
+@contextmanager
+def span(name, category, rows=None, cache=None):
+    """Catat durasi blok. Nilai 'rows' / 'cache' di dict yang di-yield boleh diisi di dalam blok"""
+    profiler = current()
+    info = {'rows': rows, 'cache': cache}
+    if profiler is None:
+        yield info
+        return
+    depth = _local.depth
+    _local.depth = depth + 1
+    started = time.perf_counter()
+    try:
+        yield info
+    finally:
+        _local.depth = depth
+        profiler.record(name, category, time.perf_counter() - started, info['rows'], info['cache'], depth)
+
+def _rows_of(args):
+    for arg in args:
+        if isinstance(arg, pd.DataFrame):
+            return len(arg)
+    return None
+
+def timed(category, name=None):
+    """Decorator span: rows = panjang DataFrame pertama di argumen"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if current() is None:
+                return func(*args, **kwargs)
+            with span(span_name, category, rows=_rows_of(args)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def bind(func):
+    """Bungkus func agar span-nya masuk ke profiler thread pemanggil (dipakai untuk job background)"""
+    profiler = current()
+    if profiler is None:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        activate(profiler)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            deactivate()
+    return wrapper
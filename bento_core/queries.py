@@ -0,0 +1,137 @@
+"""Query & filter transaksi (tanpa UI)"""
+from functools import lru_cache
+import math
+
+import pandas as pd
+
+from .profiling import timed
+from .transfers import TRANSFER_MASK_COLUMN
+
+@lru_cache(maxsize=128)
+def get_month_year_filter(month_name, year_val):
+    """Cache filter results untuk kombinasi month+year yang sama"""
+    return (month_name, year_val)
+
+@timed('filter')
+def filter_data_efficient(df, month, year):
+    """Filter data dengan operasi yang lebih cepat"""
+    if df.empty:
+        return df
+    
+    # 🚀 OPTIMASI: Gunakan boolean indexing langsung, sudah pre-computed
+    mask = (df['Month'] == month) & (df['Year'] == year)
+    return df.loc[mask].copy()
+
+def sort_by_latest_record(df):
+    """Urutkan transaksi berdasarkan nomor pencatatan terbaru (record terbaru di atas)."""
+    if df.empty:
+        return df
+
+    result = df.copy()
+
+    # Prioritaskan kolom ID jika tersedia dan numerik.
+    if 'ID' in result.columns:
+        id_numeric = pd.to_numeric(result['ID'], errors='coerce')
+        if id_numeric.notna().any():
+            result['_sort_record_id'] = id_numeric
+            result = result.sort_values('_sort_record_id', ascending=False, kind='stable')
+            return result.drop(columns=['_sort_record_id'])
+
+    # Fallback ke urutan baris asli (baris terakhir dianggap pencatatan terbaru).
+    result['_sort_record_idx'] = result.index
+    result = result.sort_values('_sort_record_idx', ascending=False, kind='stable')
+    return result.drop(columns=['_sort_record_idx'])
+
+@timed('filter')
+def search_transactions_optimized(df, keyword="", tipe_filter=None, kategori_filter=None):
+    """Search dengan optimasi untuk performa lebih baik"""
+    if df.empty:
+        return df
+    
+    # Tidak perlu copy: setiap filter di bawah menghasilkan DataFrame baru
+    result = df
+    
+    # 🚀 OPTIMASI: Apply filters secara berurutan, bukan create multiple masks
+    if keyword:
+        # Gunakan vectorized string operations
+        mask = result['Item'].str.contains(keyword, case=False, na=False) | \
+               result['Keterangan'].str.contains(keyword, case=False, na=False)
+        result = result[mask]
+    
+    if tipe_filter:
+        result = result[result['Tipe'].isin(tipe_filter)]
+    
+    if kategori_filter:
+        result = result[result['Kategori'].isin(kategori_filter)]
+    
+    return result
+
+@timed('filter')
+def filter_by_date_range(df, start_date, end_date):
+    """Filter data berdasarkan custom date range"""
+    if df.empty:
+        return df
+    mask = (df['Tanggal'] >= pd.Timestamp(start_date)) & (df['Tanggal'] <= pd.Timestamp(end_date))
+    return df.loc[mask].copy()
+
+INCOME_INDEX_COLUMNS = ['ID', 'Tanggal', 'Item', 'Nominal']
+
+@timed('aggregate')
+def build_income_index(df):
+    """Pemasukan saja (tanpa transfer masuk), urut Tanggal, untuk slicing periode dengan binary search"""
+    if df.empty:
+        return pd.DataFrame(columns=INCOME_INDEX_COLUMNS)
+    income = df.loc[(df['Tipe'] == 'Pemasukan') & ~df[TRANSFER_MASK_COLUMN] & df['Tanggal'].notna(), INCOME_INDEX_COLUMNS]
+    return income.sort_values('Tanggal', kind='stable').reset_index(drop=True)
+
+@timed('filter')
+def slice_by_date(sorted_df, start_date, end_date):
+    """Baris dengan start_date <= Tanggal <= end_date dari df yang sudah urut Tanggal (O(log n))"""
+    if sorted_df.empty:
+        return sorted_df
+    lo = sorted_df['Tanggal'].searchsorted(pd.Timestamp(start_date), side='left')
+    hi = sorted_df['Tanggal'].searchsorted(pd.Timestamp(end_date), side='right')
+    return sorted_df.iloc[lo:hi]
+
+def summarize_selection(df, selected_ids):
+    """Total Nominal, jumlah, dan nama item dari baris yang ID-nya ada di selected_ids (1x isin)"""
+    chosen = df[df['ID'].isin(selected_ids)]
+    return chosen['Nominal'].sum(), len(chosen), chosen['Item'].tolist()
+
+TABLE_PAGE_SIZE = 50
+
+@timed('filter')
+def paginate_dataframe(df, page, page_size=TABLE_PAGE_SIZE, sort_by=None, ascending=False):
+    """Ambil 1 halaman data dengan sorting di server. Hanya baris halaman ini yang di-copy."""
+    total_pages = max(math.ceil(len(df) / page_size), 1)
+    page = min(max(int(page), 1), total_pages)
+    if sort_by:
+        order = df[sort_by].sort_values(ascending=ascending, kind='stable', na_position='last').index
+    else:
+        order = df.index
+    start = (page - 1) * page_size
+    return df.loc[order[start:start + page_size]], total_pages
+
+@timed('aggregate')
+def compute_wallet_balances(df, df_wallet):
+    """Saldo per wallet = Saldo Awal + transaksi sejak Tanggal Reset masing-masing (vectorized)
+
+    Return salinan df_wallet dengan kolom Total Masuk, Total Keluar, dan Saldo Sekarang.
+    """
+    live_wallets = df_wallet.copy()
+    if df.empty or live_wallets.empty:
+        live_wallets['Total Masuk'] = 0.0
+        live_wallets['Total Keluar'] = 0.0
+        live_wallets['Saldo Sekarang'] = live_wallets['Saldo Awal'].astype(float) if 'Saldo Awal' in live_wallets else 0.0
+        return live_wallets
+
+    # 🚀 OPTIMASI: Join Tanggal Reset ke tiap transaksi lalu 1x groupby, bukan filter per wallet
+    reset_map = live_wallets.drop_duplicates('Wallet').set_index('Wallet')['Tanggal Reset']
+    reset_per_row = df['Metode Pembayaran'].map(reset_map)
+    counted = df[reset_per_row.notna() & (df['Tanggal'] >= reset_per_row)]
+    totals = counted.pivot_table(index='Metode Pembayaran', columns='Tipe', values='Nominal', aggfunc='sum', fill_value=0)
+
+    live_wallets['Total Masuk'] = live_wallets['Wallet'].map(totals.get('Pemasukan', pd.Series(dtype=float))).fillna(0.0).astype(float)
+    live_wallets['Total Keluar'] = live_wallets['Wallet'].map(totals.get('Pengeluaran', pd.Series(dtype=float))).fillna(0.0).astype(float)
+    live_wallets['Saldo Sekarang'] = live_wallets['Saldo Awal'] + live_wallets['Total Masuk'] - live_wallets['Total Keluar']
+    return live_wallets
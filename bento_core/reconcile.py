@@ -0,0 +1,107 @@
+"""Rekonsiliasi saldo wallet: cari interval awal selisih dengan bisection, lalu daftar kandidat penyebab
+
+User memasukkan beberapa saldo riil (dari app bank) per tanggal. Tiap titik dibandingkan
+dengan saldo aplikasi (Ledger.balance_series, O(log n) per titik). Selisih mulai muncul
+di antara titik cocok terakhir dan titik beda pertama. Interval itu dipersempit dengan
+bisection: tanggal probe = tanggal transaksi tengah di interval, user cukup cek saldo
+riil di tanggal itu, jadi butuh ~log2(jumlah transaksi) kali cek.
+"""
+import numpy as np
+import pandas as pd
+
+from .duplicates import find_duplicate_clusters
+from .profiling import timed
+
+RECONCILE_TOLERANCE = 1.0  # Selisih < Rp 1 dianggap cocok (pembulatan)
+
+def reconcile_points(ledger, wallet, known_balances, tolerance=RECONCILE_TOLERANCE):
+    """Bandingkan saldo riil (kolom Tanggal, Saldo Riil) dengan saldo aplikasi di akhir tiap tanggal
+
+    Titik sebelum checkpoint pertama wallet dibuang (saldo aplikasi belum terdefinisi).
+    """
+    points = known_balances.dropna(subset=['Tanggal', 'Saldo Riil']).copy()
+    points['Tanggal'] = pd.to_datetime(points['Tanggal']).dt.normalize()
+    points = points.sort_values('Tanggal', kind='stable').drop_duplicates('Tanggal', keep='last')
+    points['Saldo Aplikasi'] = ledger.balance_series(points['Tanggal'], wallet).to_numpy()
+    points = points.dropna(subset=['Saldo Aplikasi']).reset_index(drop=True)
+    points['Selisih'] = points['Saldo Riil'].astype(float) - points['Saldo Aplikasi']
+    points['Cocok'] = points['Selisih'].abs() < tolerance
+    return points
+
+def divergence_interval(points):
+    """(tanggal_cocok_terakhir, tanggal_beda_pertama, selisih) atau None jika semua titik cocok
+
+    tanggal_cocok_terakhir = None jika titik pertama pun sudah beda (selisih sejak checkpoint pertama).
+    """
+    mismatch = points.index[~points['Cocok']]
+    if not len(mismatch):
+        return None
+    first_bad = mismatch[0]
+    good = points.loc[first_bad - 1, 'Tanggal'] if first_bad > 0 else None
+    return good, points.loc[first_bad, 'Tanggal'], float(points.loc[first_bad, 'Selisih'])
+
+def next_probe_date(running, wallet, good, bad):
+    """Tanggal transaksi tengah di interval (good, bad]: cek saldo riil di tanggal ini berikutnya
+
+    None jika interval sudah tinggal 1 tanggal transaksi (selisih pasti di tanggal `bad`).
+    """
+    dates = running.wallet_dates(wallet, good, bad)
+    distinct = np.unique(dates)
+    if len(distinct) <= 1:
+        return None
+    # Probe di tanggal transaksi tengah (bukan hari tengah): jumlah transaksi tersangka selalu terbelah dua
+    middle = pd.Timestamp(dates[(len(dates) - 1) // 2])
+    return middle if middle < bad else pd.Timestamp(distinct[-2])
+
+@timed('aggregate')
+def find_candidates(rows, wallet, difference):
+    """Transaksi di interval yang bisa menjelaskan selisih (saldo riil - saldo aplikasi)
+
+    - Nominal sama dengan selisih di wallet ini (tercatat dobel / tipe terbalik)
+    - Nominal sama dengan selisih di wallet lain (salah pilih wallet)
+    - Kelompok transaksi kembar di wallet ini (kemungkinan input ganda)
+    """
+    if rows.empty:
+        return rows.assign(Alasan=pd.Series(dtype=str))
+    amount = abs(difference)
+    # Saldo aplikasi kurang (selisih > 0): ada pengeluaran berlebih / pemasukan hilang, dan sebaliknya
+    extra_tipe = 'Pengeluaran' if difference > 0 else 'Pemasukan'
+    in_wallet = rows['Metode Pembayaran'] == wallet
+    same_amount = (rows['Nominal'] - amount).abs() < RECONCILE_TOLERANCE
+
+    parts = [
+        rows[in_wallet & same_amount & (rows['Tipe'] == extra_tipe)].assign(
+            Alasan=f"Nominal = selisih: {extra_tipe.lower()} ini mungkin tercatat dobel / tipenya terbalik"),
+        rows[~in_wallet & same_amount].assign(
+            Alasan=f"Nominal = selisih, tapi tercatat di wallet lain (mungkin seharusnya {wallet})"),
+    ]
+    clusters = find_duplicate_clusters(rows[in_wallet])
+    if not clusters.empty:
+        parts.append(clusters.drop(columns='Cluster').assign(Alasan="Transaksi kembar (kemungkinan input ganda)"))
+    candidates = pd.concat(parts)
+    candidates = candidates[~candidates.index.duplicated(keep='first')]
+    return candidates.sort_values('Tanggal', kind='stable')
+
+def reconcile_wallet(ledger, wallet, known_balances, tolerance=RECONCILE_TOLERANCE):
+    """Jalankan rekonsiliasi 1 wallet. Return dict points, interval, probe, transactions, candidates"""
+    points = reconcile_points(ledger, wallet, known_balances, tolerance)
+    result = {'points': points, 'interval': None, 'probe': None,
+              'transactions': pd.DataFrame(), 'candidates': pd.DataFrame()}
+    interval = divergence_interval(points)
+    if interval is None:
+        return result
+
+    good, bad, difference = interval
+    result['interval'] = interval
+    if good is None:
+        # Belum ada titik cocok: cari sejak checkpoint pertama (saldo awal hari itu dianggap benar)
+        checkpoints = ledger.checkpoints()
+        good = checkpoints.loc[checkpoints['Wallet'] == wallet, 'Tanggal'].min() - pd.Timedelta(days=1)
+    result['probe'] = next_probe_date(ledger.running_balance(), wallet, good, bad)
+
+    start, end = good + pd.Timedelta(days=1), bad + pd.Timedelta(days=1)
+    rows = ledger.history(start)
+    rows = rows.loc[(rows['Tanggal'] >= start) & (rows['Tanggal'] < end)]
+    result['transactions'] = rows[rows['Metode Pembayaran'] == wallet].sort_values('Tanggal', kind='stable')
+    result['candidates'] = find_candidates(rows, wallet, difference)
+    return result
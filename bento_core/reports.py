@@ -0,0 +1,348 @@
+"""Laporan: export Excel & e-statement PDF (tanpa UI)"""
+from datetime import datetime
+from io import BytesIO
+import time
+
+import pandas as pd
+
+from .lazy import lazy_import
+from .ledger import OP_KEY_COLUMN
+from .profiling import timed
+from .queries import filter_by_date_range
+from .transfers import TRANSFER_MASK_COLUMN
+
+EXPORT_DROP_COLUMNS = ['Month', 'Year', OP_KEY_COLUMN, TRANSFER_MASK_COLUMN]
+
+@timed('export')
+def export_to_excel(df, df_wallet, df_target, start_date, end_date, progress_callback=None):
+    """Export data ke Excel dengan format profesional
+
+    Sheet Transaksi berisi semua baris; Summary, Pemasukan, Pengeluaran, dan Per Kategori
+    tidak menghitung transfer antar dompet.
+    """
+    output = BytesIO()
+    lazy_import('openpyxl')  # dipakai pd.ExcelWriter, dicatat di laporan startup
+    aggregates = compute_export_aggregates(df)
+    df_real = df[~df[TRANSFER_MASK_COLUMN]]
+    
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        # Sheet 1: Summary
+        summary_data = {
+            'Periode': [f"{start_date.strftime('%d %b %Y')} - {end_date.strftime('%d %b %Y')}"],
+            'Total Pemasukan': [aggregates['total_in']],
+            'Total Pengeluaran': [aggregates['total_out']],
+            'Net Cash Flow': [aggregates['total_in'] - aggregates['total_out']],
+            'Transfer Antar Dompet': [aggregates['total_transfer']],
+            'Jumlah Transaksi': [len(df)],
+            'Tanggal Export': [datetime.now().strftime('%d %b %Y %H:%M')]
+        }
+        pd.DataFrame(summary_data).T.to_excel(writer, sheet_name='Summary', header=False)
+        
+        # Sheet 2: All Transactions
+        df_export = df.drop(columns=EXPORT_DROP_COLUMNS, errors='ignore').copy()
+        df_export['Tanggal'] = pd.to_datetime(df_export['Tanggal']).dt.strftime('%Y-%m-%d')
+        df_export.to_excel(writer, sheet_name='Transaksi', index=False)
+        
+        # Sheet 3: Pemasukan
+        df_income = df_real[df_real['Tipe'] == 'Pemasukan'].drop(columns=EXPORT_DROP_COLUMNS, errors='ignore').copy()
+        if not df_income.empty:
+            df_income['Tanggal'] = pd.to_datetime(df_income['Tanggal']).dt.strftime('%Y-%m-%d')
+            df_income.to_excel(writer, sheet_name='Pemasukan', index=False)
+        
+        # Sheet 4: Pengeluaran
+        df_expense = df_real[df_real['Tipe'] == 'Pengeluaran'].drop(columns=EXPORT_DROP_COLUMNS, errors='ignore').copy()
+        if not df_expense.empty:
+            df_expense['Tanggal'] = pd.to_datetime(df_expense['Tanggal']).dt.strftime('%Y-%m-%d')
+            df_expense.to_excel(writer, sheet_name='Pengeluaran', index=False)
+        
+        # Sheet 5: Per Kategori
+        aggregates['category_summary'].to_excel(writer, sheet_name='Per Kategori', index=False)
+        
+        # Sheet 6: Wallet Balance
+        df_wallet.to_excel(writer, sheet_name='Saldo Dompet', index=False)
+        
+        # Sheet 7: Targets
+        if not df_target.empty:
+            df_target.to_excel(writer, sheet_name='Target Impian', index=False)
+    
+    if progress_callback:
+        progress_callback(len(df), len(df))
+    output.seek(0)
+    return output
+
+# ============================================================
+# 🚀 STREAMING EXCEL EXPORT (CONSTANT MEMORY)
+# ============================================================
+
+STREAMING_EXPORT_THRESHOLD = 20000  # Di atas jumlah baris ini export otomatis pakai mode streaming
+EXPORT_CHUNK_SIZE = 5000
+
+def compute_export_aggregates(df):
+    """Hitung semua agregat Summary & Per Kategori dalam satu kali groupby (transfer dipisah lewat mask)"""
+    grouped = df.groupby([TRANSFER_MASK_COLUMN, 'Kategori', 'Tipe'])['Nominal'].agg(['sum', 'count']).reset_index()
+    is_transfer = grouped[TRANSFER_MASK_COLUMN].astype(bool)
+    category_summary = grouped[~is_transfer]
+    per_tipe = category_summary.groupby('Tipe')[['sum', 'count']].sum()
+    total_in = per_tipe['sum'].get('Pemasukan', 0)
+    total_out = per_tipe['sum'].get('Pengeluaran', 0)
+    return {
+        'total_in': total_in,
+        'total_out': total_out,
+        'total_transfer': grouped.loc[is_transfer & (grouped['Tipe'] == 'Pengeluaran'), 'sum'].sum(),
+        'count_in': int(per_tipe['count'].get('Pemasukan', 0)),
+        'count_out': int(per_tipe['count'].get('Pengeluaran', 0)),
+        'category_summary': category_summary[['Kategori', 'Tipe', 'sum']].rename(columns={'sum': 'Nominal'})
+    }
+
+def _iter_export_chunks(df_export, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield baris siap tulis per chunk: tanggal jadi teks, NaN jadi None agar valid di Excel"""
+    date_cols = [c for c in df_export.columns if pd.api.types.is_datetime64_any_dtype(df_export[c])]
+    for start in range(0, len(df_export), chunk_size):
+        chunk = df_export.iloc[start:start + chunk_size]
+        if date_cols:
+            chunk = chunk.assign(**{c: chunk[c].dt.strftime('%Y-%m-%d') for c in date_cols})
+        chunk = chunk.astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        yield chunk.itertuples(index=False, name=None)
+
+@timed('export')
+def export_to_excel_streaming(df, df_wallet, df_target, start_date, end_date, progress_callback=None):
+    """Export Excel dengan write-only workbook: baris ditulis bertahap, tanpa copy per sheet
+
+    Return (BytesIO, stats) dengan stats berisi jumlah baris, durasi, dan rows/detik.
+    """
+    Workbook = lazy_import('openpyxl').Workbook
+
+    started = time.perf_counter()
+    aggregates = compute_export_aggregates(df)
+    total_rows = len(df)
+
+    wb = Workbook(write_only=True)
+
+    # Sheet 1: Summary (dari agregat yang sudah dihitung)
+    ws_summary = wb.create_sheet('Summary')
+    ws_summary.append(['Periode', f"{start_date.strftime('%d %b %Y')} - {end_date.strftime('%d %b %Y')}"])
+    ws_summary.append(['Total Pemasukan', float(aggregates['total_in'])])
+    ws_summary.append(['Total Pengeluaran', float(aggregates['total_out'])])
+    ws_summary.append(['Net Cash Flow', float(aggregates['total_in'] - aggregates['total_out'])])
+    ws_summary.append(['Transfer Antar Dompet', float(aggregates['total_transfer'])])
+    ws_summary.append(['Jumlah Transaksi', total_rows])
+    ws_summary.append(['Tanggal Export', datetime.now().strftime('%d %b %Y %H:%M')])
+
+    # Sheet 2-4: Transaksi, Pemasukan, Pengeluaran ditulis dalam satu pass
+    columns = [c for c in df.columns if c not in EXPORT_DROP_COLUMNS]
+    ws_all = wb.create_sheet('Transaksi')
+    ws_all.append(columns)
+    ws_in = wb.create_sheet('Pemasukan') if aggregates['count_in'] else None
+    ws_out = wb.create_sheet('Pengeluaran') if aggregates['count_out'] else None
+    for ws in (ws_in, ws_out):
+        if ws is not None:
+            ws.append(columns)
+
+    route_pos = len(columns)  # Kolom tambahan untuk routing: transfer tidak masuk sheet Pemasukan/Pengeluaran
+    routing = df['Tipe'].where(~df[TRANSFER_MASK_COLUMN], 'Transfer')
+    written = 0
+    for rows in _iter_export_chunks(df[columns].assign(_route=routing.values)):
+        for row in rows:
+            route, row = row[route_pos], row[:route_pos]
+            ws_all.append(row)
+            if route == 'Pemasukan' and ws_in is not None:
+                ws_in.append(row)
+            elif route == 'Pengeluaran' and ws_out is not None:
+                ws_out.append(row)
+        written = min(written + EXPORT_CHUNK_SIZE, total_rows)
+        if progress_callback:
+            progress_callback(written, total_rows)
+
+    # Sheet 5: Per Kategori (dari agregat yang sama)
+    ws_cat = wb.create_sheet('Per Kategori')
+    ws_cat.append(['Kategori', 'Tipe', 'Nominal'])
+    for row in aggregates['category_summary'].itertuples(index=False, name=None):
+        ws_cat.append([row[0], row[1], float(row[2])])
+
+    # Sheet 6-7: tabel kecil, ditulis langsung
+    small_tables = [('Saldo Dompet', df_wallet)]
+    if not df_target.empty:
+        small_tables.append(('Target Impian', df_target))
+    for sheet_name, table in small_tables:
+        ws = wb.create_sheet(sheet_name)
+        ws.append(list(table.columns))
+        for rows in _iter_export_chunks(table):
+            for row in rows:
+                ws.append(row)
+
+    output = BytesIO()
+    wb.save(output)
+    output.seek(0)
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        'rows': total_rows,
+        'seconds': elapsed,
+        'rows_per_sec': total_rows / elapsed if elapsed > 0 else float(total_rows)
+    }
+    return output, stats
+
+# ============================================================
+# 🚀 E-STATEMENT PDF (MULTI-PERIODE, PER WALLET)
+# ============================================================
+
+STATEMENT_ROW_HEIGHT = 7
+STATEMENT_PAGE_MARGIN = 15
+
+def prepare_statement_rows(df_laporan, opening_balance=0.0):
+    """Format semua baris statement sekaligus (vectorized) sebelum ditulis ke PDF
+
+    Kolom Saldo = saldo_awal + kumulatif transaksi periode ini.
+    """
+    df_sorted = df_laporan.sort_values('Tanggal', ascending=True, kind='stable')
+
+    is_out = df_sorted['Tipe'] == 'Pengeluaran'
+    nominal = pd.to_numeric(df_sorted['Nominal'], errors='coerce').fillna(0)
+    signed = nominal.where(~is_out, -nominal)
+    nominal_str = nominal.map('{:,.2f}'.format)
+
+    tgl = pd.to_datetime(df_sorted['Tanggal'], errors='coerce').dt.strftime('%d/%m/%Y').fillna('')
+    desc = (df_sorted['Item'].fillna('').astype(str) + " (" + df_sorted['Metode Pembayaran'].fillna('-').astype(str) + ")").str.slice(0, 45)
+    # FPDF 1.x hanya mendukung latin-1, karakter lain (emoji dll) diganti '?'
+    desc = desc.str.encode('latin-1', errors='replace').str.decode('latin-1')
+    debit = nominal_str.where(is_out, '')
+    kredit = nominal_str.where(~is_out, '')
+    saldo = (opening_balance + signed.cumsum()).map('{:,.2f}'.format)
+
+    rows = list(zip(tgl, desc, debit, kredit, saldo))
+    totals = {
+        'debit': nominal[is_out].sum(),
+        'kredit': nominal[~is_out].sum(),
+        'net': signed.sum(),
+        'opening': opening_balance,
+        'closing': opening_balance + signed.sum()
+    }
+    return rows, totals
+
+def _statement_table_header(pdf):
+    pdf.set_font("Arial", 'B', 9)
+    pdf.set_fill_color(37, 99, 235)
+    pdf.set_text_color(255, 255, 255)
+    pdf.cell(20, 8, "Tanggal", border=1, fill=True, align='C')
+    pdf.cell(75, 8, "Deskripsi", border=1, fill=True, align='C')
+    pdf.cell(30, 8, "Debit", border=1, fill=True, align='C')
+    pdf.cell(30, 8, "Kredit", border=1, fill=True, align='C')
+    pdf.cell(35, 8, "Saldo", border=1, fill=True, align='C')
+    pdf.ln()
+    pdf.set_font("Arial", '', 8)
+    pdf.set_text_color(0, 0, 0)
+
+def iter_statement_pages(rows, first_page_capacity, page_capacity):
+    """Potong baris statement per halaman tanpa menyalin ulang data"""
+    start = 0
+    capacity = first_page_capacity
+    while start < len(rows):
+        yield rows[start:start + capacity]
+        start += capacity
+        capacity = page_capacity
+
+@timed('export')
+def create_statement_pdf(df, start_date, end_date, wallet=None, opening_balance=0.0, closing_balance=None,
+                         progress_callback=None):
+    """Generate e-statement PDF untuk rentang tanggal bebas, opsional per wallet
+
+    opening_balance / closing_balance: saldo riil awal & akhir periode (lihat Ledger.statement_balances).
+    Jika saldo akhir riil beda dengan saldo awal + net periode (mis. ada reset saldo), selisihnya
+    ditulis sebagai penyesuaian.
+    """
+    df_laporan = filter_by_date_range(df, start_date, end_date)
+    if wallet:
+        df_laporan = df_laporan[df_laporan['Metode Pembayaran'] == wallet]
+    else:
+        # Statement gabungan: kedua kaki transfer saling meniadakan, jadi tidak ditampilkan
+        df_laporan = df_laporan[~df_laporan[TRANSFER_MASK_COLUMN]]
+    rows, totals = prepare_statement_rows(df_laporan, opening_balance)
+    if closing_balance is None:
+        closing_balance = totals['closing']
+
+    FPDF = lazy_import('fpdf').FPDF
+    pdf = FPDF()
+    # Page break diatur manual per halaman, bukan dicek per baris
+    pdf.set_auto_page_break(auto=False)
+    pdf.add_page()
+
+    pdf.set_font("Arial", 'B', 16)
+    pdf.set_text_color(37, 99, 235)
+    pdf.cell(0, 8, "BENTO PRO OPTIMIZED", ln=True, align='R')
+    pdf.set_font("Arial", '', 10)
+    pdf.set_text_color(100, 100, 100)
+    pdf.cell(0, 5, "PERSONAL FINANCE STATEMENT", ln=True, align='R')
+    pdf.ln(5)
+
+    pdf.set_font("Arial", 'B', 12)
+    pdf.set_text_color(0, 0, 0)
+    pdf.cell(0, 6, "Laporan Rekening / Statement of Account", ln=True, align='L')
+
+    pdf.set_font("Arial", '', 10)
+    pdf.cell(0, 6, f"Periode: {start_date.strftime('%d %B %Y')} - {end_date.strftime('%d %B %Y')}", ln=True, align='L')
+    pdf.ln(5)
+
+    pdf.cell(30, 6, "Jenis Produk", border=0)
+    pdf.cell(0, 6, ": Bento Finance Tracker", border=0, ln=True)
+    pdf.cell(30, 6, "Nama", border=0)
+    pdf.cell(0, 6, ": Pengguna Utama", border=0, ln=True)
+    pdf.cell(30, 6, "Wallet", border=0)
+    pdf.cell(0, 6, f": {wallet if wallet else 'Semua Wallet'}", border=0, ln=True)
+    pdf.cell(30, 6, "Mata Uang", border=0)
+    pdf.cell(0, 6, ": IDR", border=0, ln=True)
+    pdf.ln(5)
+
+    _statement_table_header(pdf)
+
+    # Hitung kapasitas baris per halaman sekali saja
+    usable_bottom = pdf.h - STATEMENT_PAGE_MARGIN
+    first_page_capacity = max(int((usable_bottom - pdf.get_y()) // STATEMENT_ROW_HEIGHT), 1)
+    page_capacity = max(int((usable_bottom - pdf.t_margin - 8) // STATEMENT_ROW_HEIGHT), 1)
+
+    written = 0
+    for page_no, page_rows in enumerate(iter_statement_pages(rows, first_page_capacity, page_capacity)):
+        if page_no > 0:
+            pdf.add_page()
+            _statement_table_header(pdf)
+        for tgl, desc, debit_str, kredit_str, saldo_str in page_rows:
+            pdf.cell(20, STATEMENT_ROW_HEIGHT, tgl, border=1, align='C')
+            pdf.cell(75, STATEMENT_ROW_HEIGHT, desc, border=1, align='L')
+            pdf.cell(30, STATEMENT_ROW_HEIGHT, debit_str, border=1, align='R')
+            pdf.cell(30, STATEMENT_ROW_HEIGHT, kredit_str, border=1, align='R')
+            pdf.cell(35, STATEMENT_ROW_HEIGHT, saldo_str, border=1, align='R')
+            pdf.ln()
+        written += len(page_rows)
+        if progress_callback:
+            progress_callback(written, len(rows))
+
+    # Ringkasan + footer butuh ~50mm, pindah halaman jika tidak muat
+    pdf.set_auto_page_break(auto=True, margin=STATEMENT_PAGE_MARGIN)
+    if pdf.get_y() + 50 > usable_bottom:
+        pdf.add_page()
+
+    pdf.ln(5)
+    pdf.set_font("Arial", 'B', 9)
+    pdf.cell(40, 6, "Saldo Awal", border=0)
+    pdf.cell(50, 6, f"IDR {totals['opening']:,.2f}", border=0, ln=True)
+    pdf.cell(40, 6, "Total Debit", border=0)
+    pdf.cell(50, 6, f"IDR {totals['debit']:,.2f}", border=0, ln=True)
+    pdf.cell(40, 6, "Total Kredit", border=0)
+    pdf.cell(50, 6, f"IDR {totals['kredit']:,.2f}", border=0, ln=True)
+    pdf.cell(40, 6, "Net Saldo Periode", border=0)
+    pdf.cell(50, 6, f"IDR {totals['net']:,.2f}", border=0, ln=True)
+    adjustment = closing_balance - totals['closing']
+    if abs(adjustment) >= 0.01:
+        pdf.cell(40, 6, "Penyesuaian (Reset)", border=0)
+        pdf.cell(50, 6, f"IDR {adjustment:,.2f}", border=0, ln=True)
+    pdf.cell(40, 6, "Saldo Akhir", border=0)
+    pdf.cell(50, 6, f"IDR {closing_balance:,.2f}", border=0, ln=True)
+
+    pdf.ln(10)
+    pdf.set_font("Arial", 'I', 8)
+    pdf.set_text_color(150, 150, 150)
+    pdf.cell(0, 5, "IMPORTANT!", ln=True)
+    pdf.cell(0, 5, "Dokumen e-statement ini di-generate secara otomatis oleh sistem aplikasi Bento Pro.", ln=True)
+    pdf.cell(0, 5, "Data keuangan Anda bersifat rahasia. Jangan membagikannya dengan alasan apa pun.", ln=True)
+
+    return pdf.output(dest='S').encode('latin-1')
@@ -0,0 +1,296 @@
+"""Rate limiter, backoff, dan circuit breaker untuk storage Google Sheets
+
+ResilientStorage membungkus storage lain (SheetStorage, MemoryStorage, FlakyStorage):
+- Semua panggilan mengambil token dari 1 token bucket bersama (kuota per menit).
+- Read tidak pernah retry dan tidak menunggu token: kuota habis / backend error langsung
+  BackendUnavailable, Ledger tetap memakai cache lama (dan menolak write ke tabel itu).
+- Write dicoba 1x di thread pemanggil. Jika gagal karena 429/timeout/koneksi, atau
+  breaker sedang open, write masuk antrian. Thread background mengirim ulang dengan
+  jittered exponential backoff, jadi thread UI tidak pernah sleep.
+- Antrian menyimpan snapshot TERBARU per worksheet (full overwrite), jadi write
+  yang tertunda tidak pernah menimpa data yang lebih baru.
+- metrics (opsional, StorageMetrics): hasil akhir tiap write logis (saved / queued /
+  superseded / dropped), jumlah percobaan per write, dan penolakan oleh breaker / limiter.
+  SheetStorage di dalamnya tetap mencatat tiap panggilan backend (1 percobaan).
+"""
+import random
+import re
+import threading
+import time
+
+RETRYABLE_PATTERN = re.compile(
+    r"\b(429|500|502|503|504)\b|quota|rate limit|resource_exhausted|timeout|timed out|connection|remote|aborted",
+    re.IGNORECASE,
+)
+
+class BackendUnavailable(Exception):
+    """Storage sedang tidak bisa dipakai (breaker open, kuota habis, atau error sementara)"""
+
+def is_retryable_error(error):
+    """True untuk error sementara: 429/kuota, 5xx, timeout, koneksi putus"""
+    return bool(RETRYABLE_PATTERN.search(str(error)))
+
+def jittered_backoff(attempt, base=1.0, max_delay=60.0, rng=random):
+    """Full jitter: acak antara 0 dan min(max_delay, base * 2^attempt)"""
+    return rng.uniform(0, min(max_delay, base * (2 ** attempt)))
+
+class TokenBucket:
+    """Token bucket thread-safe, dipakai bersama oleh semua session dalam 1 proses"""
+
+    def __init__(self, rate_per_minute=60, burst=10, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.clock = clock
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """Ambil 1 token. Return 0 jika berhasil, atau detik yang perlu ditunggu"""
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def drain(self):
+        """Kosongkan bucket (dipanggil saat server membalas 429)"""
+        with self._lock:
+            self._refill()
+            self.tokens = 0.0
+
+class CircuitBreaker:
+    """closed -> open setelah failure_threshold gagal berturut-turut -> half_open setelah reset_timeout
+
+    Di half_open hanya 1 panggilan percobaan yang diizinkan. Berhasil -> closed, gagal -> open lagi.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'open' and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._probe_in_flight = False
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def release(self):
+        """Lepas izin probe half_open yang tidak jadi dipakai"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = self.clock()
+
+    def seconds_until_retry(self):
+        with self._lock:
+            if self.state != 'open':
+                return 0.0
+            return max(self.reset_timeout - (self.clock() - self.opened_at), 0.0)
+
+class ResilientStorage:
+    """Storage dengan token bucket + circuit breaker + antrian write di background"""
+
+    def __init__(self, inner, limiter=None, breaker=None,
+                 backoff_base=1.0, backoff_max=60.0, sleep=time.sleep, rng=None, metrics=None):
+        self.inner = inner
+        self.metrics = metrics
+        self.limiter = limiter or TokenBucket()
+        self.breaker = breaker or CircuitBreaker()
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.pending = {}  # worksheet -> snapshot terbaru yang belum tersimpan
+        self.attempts = {}  # worksheet -> percobaan kirim untuk write yang sedang antri
+        self.last_error = None
+        self._cond = threading.Condition()
+        self._worker_running = False
+
+    # --- Status ---
+
+    @property
+    def read_only(self):
+        """True saat backend dianggap down: app membaca dari cache saja"""
+        return self.breaker.state == 'open'
+
+    def status(self):
+        with self._cond:
+            pending = sorted(self.pending)
+        return {
+            'state': self.breaker.state,
+            'pending': pending,
+            'last_error': self.last_error,
+            'retry_in': self.breaker.seconds_until_retry(),
+        }
+
+    # --- Metrik ---
+
+    def _reject(self, operation, worksheet, reason):
+        if self.metrics is not None:
+            self.metrics.observe_rejection(operation, worksheet, reason)
+
+    def _write_outcome(self, worksheet, outcome, attempts=0):
+        if self.metrics is not None:
+            self.metrics.observe_write(worksheet, outcome, attempts)
+
+    # --- Read ---
+
+    def read(self, worksheet):
+        with self._cond:
+            if worksheet in self.pending:
+                # Read-your-writes: snapshot lokal lebih baru dari isi server
+                return self.pending[worksheet].copy()
+        if not self.breaker.allow():
+            self._reject('read', worksheet, 'breaker_open')
+            raise BackendUnavailable(f"Google Sheets sedang bermasalah, coba lagi dalam {self.breaker.seconds_until_retry():.0f} detik")
+        wait = self.limiter.try_acquire()
+        if wait:
+            # Thread UI tidak sleep: sajikan cache, load ulang di rerun berikutnya
+            self.breaker.release()  # bukan kegagalan backend, jangan buka breaker
+            self._reject('read', worksheet, 'rate_limited')
+            raise BackendUnavailable(f"Kuota request habis, coba lagi dalam {max(wait, 1):.0f} detik")
+        try:
+            data = self.inner.read(worksheet)
+        except Exception as e:
+            if not is_retryable_error(e):
+                self.breaker.record_success()  # backend menjawab, error-nya bukan sementara
+                raise
+            self._record_failure(e)
+            raise BackendUnavailable(str(e)) from e
+        self.breaker.record_success()
+        return data
+
+    # --- Write ---
+
+    def update(self, worksheet, data, max_retries=3, delay=1):
+        """Tulis sekarang jika memungkinkan, selain itu antrikan. Return 'saved' atau 'queued'"""
+        with self._cond:
+            queued_already = worksheet in self.pending
+        attempts = 0
+        # Jika sudah ada snapshot antri, yang baru langsung menggantikannya (urutan write terjaga)
+        if not queued_already:
+            if not self.breaker.allow():
+                self._reject('update', worksheet, 'breaker_open')
+            elif self.limiter.try_acquire():
+                self.breaker.release()  # izin probe tidak terpakai
+                self._reject('update', worksheet, 'rate_limited')
+            else:
+                attempts = 1
+                try:
+                    self.inner.update(worksheet, data, max_retries=1)
+                    self.breaker.record_success()
+                    self._write_outcome(worksheet, 'saved', attempts)
+                    return 'saved'
+                except Exception as e:
+                    if not is_retryable_error(e):
+                        self.breaker.record_success()
+                        self._write_outcome(worksheet, 'dropped', attempts)
+                        raise
+                    self._record_failure(e)
+        self._enqueue(worksheet, data, attempts)
+        self._write_outcome(worksheet, 'queued')
+        return 'queued'
+
+    def _record_failure(self, error):
+        self.last_error = str(error)
+        if re.search(r"\b429\b|quota|rate limit|resource_exhausted", str(error), re.IGNORECASE):
+            self.limiter.drain()
+        self.breaker.record_failure()
+
+    def _enqueue(self, worksheet, data, attempts=0):
+        with self._cond:
+            if worksheet in self.pending:
+                # Snapshot lama tidak akan pernah dikirim; percobaannya ikut ke snapshot baru
+                self._write_outcome(worksheet, 'superseded')
+            self.pending[worksheet] = data.copy() if hasattr(data, 'copy') else data
+            self.attempts[worksheet] = self.attempts.get(worksheet, 0) + attempts
+            if not self._worker_running:
+                self._worker_running = True
+                threading.Thread(target=self._drain_queue, name="bento-sync", daemon=True).start()
+
+    def _drain_queue(self):
+        attempt = 0
+        while True:
+            with self._cond:
+                if not self.pending:
+                    self._worker_running = False
+                    self._cond.notify_all()  # bangunkan flush()
+                    return
+                worksheet, data = next(iter(self.pending.items()))
+
+            # Breaker open: tunggu sampai boleh probe lagi
+            open_for = self.breaker.seconds_until_retry()
+            if open_for or not self.breaker.allow():
+                self.sleep(min(max(open_for, 0.05), 1.0))
+                continue
+            wait = self.limiter.try_acquire()
+            if wait:
+                self.breaker.release()
+                self._reject('update', worksheet, 'rate_limited')
+                self.sleep(wait)
+                continue
+            with self._cond:
+                self.attempts[worksheet] = self.attempts.get(worksheet, 0) + 1
+            try:
+                self.inner.update(worksheet, data, max_retries=1)
+            except Exception as e:
+                if is_retryable_error(e):
+                    self._record_failure(e)
+                    self.sleep(jittered_backoff(attempt, self.backoff_base, self.backoff_max, self.rng))
+                    attempt += 1
+                    continue
+                # Error permanen: buang snapshot agar antrian tidak macet
+                self.breaker.record_success()
+                self.last_error = str(e)
+                outcome = 'dropped'
+            else:
+                self.breaker.record_success()
+                attempt = 0
+                outcome = 'saved'
+            with self._cond:
+                # Hapus hanya jika tidak ada snapshot lebih baru yang masuk selama write
+                if self.pending.get(worksheet) is data:
+                    del self.pending[worksheet]
+                    self._write_outcome(worksheet, outcome, self.attempts.pop(worksheet, 0))
+                self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Tunggu antrian write kosong. Return True jika semua sudah tersimpan"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self.pending:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                self._cond.wait(0.1)
+        return True
@@ -0,0 +1,125 @@
+"""Saldo berjalan (running balance) global & per wallet dengan query saldo-per-tanggal O(log n)
+
+Ledger diurutkan sekali per (Tanggal, ID), lalu disimpan sebagai array numpy:
+tanggal, nominal bertanda (+masuk / -keluar), dan jumlah kumulatifnya. Saldo di akhir
+tanggal D = nilai kumulatif pada baris terakhir dengan Tanggal <= D (binary search).
+Insert / edit / hapus transaksi di-patch langsung ke array, tidak perlu sort ulang.
+"""
+import numpy as np
+import pandas as pd
+
+from .profiling import timed
+
+RUNNING_COLUMNS = ['ID', 'Tanggal', 'Nominal', 'Tipe', 'Metode Pembayaran']
+RUNNING_REBUILD_THRESHOLD = 200  # Perubahan lebih banyak dari ini: bangun ulang, bukan patch
+
+def _signed_rows(df):
+    """Baris Pemasukan/Pengeluaran bertanggal valid + nominal bertanda, urut (Tanggal, ID)"""
+    if df.empty:
+        return pd.DataFrame(columns=RUNNING_COLUMNS + ['signed'])
+    rows = df.loc[df['Tipe'].isin(['Pemasukan', 'Pengeluaran']) & df['Tanggal'].notna(), RUNNING_COLUMNS]
+    nominal = pd.to_numeric(rows['Nominal'], errors='coerce').fillna(0).astype(float)
+    rows = rows.assign(signed=nominal.where(rows['Tipe'] == 'Pemasukan', -nominal))
+    rows['Metode Pembayaran'] = rows['Metode Pembayaran'].fillna('-').astype(str)
+    return rows.sort_values(['Tanggal', 'ID'], kind='stable')
+
+def _end_of_day(dates):
+    """Batas eksklusif akhir hari: saldo 'di tanggal D' = semua transaksi < D+1"""
+    return (pd.DatetimeIndex(pd.to_datetime(dates)).normalize() + pd.Timedelta(days=1)).to_numpy(dtype='datetime64[ns]')
+
+class RunningBalance:
+    """Array saldo kumulatif global + per wallet atas ledger urut (Tanggal, ID)
+
+    global_offset: saldo sebelum baris pertama (mis. net transaksi yang sudah diarsipkan).
+    """
+
+    def __init__(self, df, global_offset=0.0):
+        self.global_offset = global_offset
+        self._load(_signed_rows(df))
+
+    def _load(self, rows):
+        self.ids = rows['ID'].to_numpy(dtype='int64')
+        self.dates = rows['Tanggal'].to_numpy(dtype='datetime64[ns]')
+        self.wallets = rows['Metode Pembayaran'].to_numpy(dtype=object)
+        self.signed = rows['signed'].to_numpy(dtype=float)
+        self.cum = np.cumsum(self.signed)
+        self._per_wallet = {}  # wallet -> (dates, cum), dibuat lazy dari array global
+
+    def __len__(self):
+        return len(self.ids)
+
+    # --- Query ---
+
+    def _wallet_arrays(self, wallet):
+        if wallet not in self._per_wallet:
+            mask = self.wallets == wallet
+            self._per_wallet[wallet] = (self.dates[mask], np.cumsum(self.signed[mask]))
+        return self._per_wallet[wallet]
+
+    def balance_series(self, dates, wallet=None):
+        """Saldo kumulatif di akhir tiap tanggal (vectorized searchsorted)"""
+        if wallet is None:
+            dates_arr, cum, offset = self.dates, self.cum, self.global_offset
+        else:
+            (dates_arr, cum), offset = self._wallet_arrays(wallet), 0.0
+        idx = np.searchsorted(dates_arr, _end_of_day(dates), side='left') - 1
+        values = np.where(idx >= 0, cum[np.clip(idx, 0, None)] if len(cum) else 0.0, 0.0)
+        return values + offset
+
+    def balance_at(self, date, wallet=None):
+        """Saldo kumulatif di akhir tanggal `date` (global, atau 1 wallet tanpa saldo awal)"""
+        return float(self.balance_series([date], wallet)[0])
+
+    def wallet_dates(self, wallet, after, until):
+        """Tanggal transaksi 1 wallet setelah hari `after` s/d akhir hari `until` (urut, boleh duplikat)"""
+        dates_arr, _ = self._wallet_arrays(wallet)
+        lo, hi = np.searchsorted(dates_arr, _end_of_day([after, until]), side='left')
+        return dates_arr[lo:hi]
+
+    # --- Patch ---
+
+    def _position(self, date, row_id):
+        """Posisi sisip agar urutan (Tanggal, ID) tetap terjaga"""
+        lo = np.searchsorted(self.dates, date, side='left')
+        hi = np.searchsorted(self.dates, date, side='right')
+        return lo + int(np.searchsorted(self.ids[lo:hi], row_id, side='left'))
+
+    def _remove(self, row_id):
+        positions = np.flatnonzero(self.ids == row_id)
+        if not len(positions):
+            return
+        pos = positions[0]
+        self.cum[pos + 1:] -= self.signed[pos]
+        self.ids, self.dates, self.wallets, self.signed, self.cum = (
+            np.delete(arr, pos) for arr in (self.ids, self.dates, self.wallets, self.signed, self.cum)
+        )
+
+    def _insert(self, row):
+        date = np.datetime64(row['Tanggal'], 'ns')
+        pos = self._position(date, row['ID'])
+        before = self.cum[pos - 1] if pos > 0 else 0.0
+        self.cum[pos:] += row['signed']
+        self.ids = np.insert(self.ids, pos, row['ID'])
+        self.dates = np.insert(self.dates, pos, date)
+        self.wallets = np.insert(self.wallets, pos, row['Metode Pembayaran'])
+        self.signed = np.insert(self.signed, pos, row['signed'])
+        self.cum = np.insert(self.cum, pos, before + row['signed'])
+
+    @timed('aggregate')
+    def patch(self, before, after):
+        """Terapkan baris yang berubah di 1 commit (versi lama -> versi baru) ke array saldo
+
+        before / after hanya berisi baris yang disentuh commit, bukan seluruh ledger.
+        Return False jika perubahannya terlalu banyak: lebih murah dibangun ulang.
+        """
+        old_rows = _signed_rows(before)
+        new_rows = _signed_rows(after)
+        if len(old_rows) + len(new_rows) > RUNNING_REBUILD_THRESHOLD:
+            return False
+        for row_id in old_rows['ID']:
+            self._remove(row_id)
+        for row in new_rows.to_dict('records'):
+            self._insert(row)
+        for wallet in set(old_rows['Metode Pembayaran']) | set(new_rows['Metode Pembayaran']):
+            self._per_wallet.pop(wallet, None)
+        return True
@@ -0,0 +1,86 @@
+"""Seri pengeluaran harian (tanggal x kategori) untuk analisis tanggal & kalender (tanpa UI)"""
+from functools import lru_cache
+import re
+
+import pandas as pd
+
+from .config import ANALISIS_EXCLUDE_ITEMS
+from .profiling import timed
+from .transfers import TRANSFER_MASK_COLUMN
+
+@lru_cache(maxsize=32)
+def compile_exclusion(items):
+    """1 regex (case-insensitive) untuk semua pola item yang dikecualikan, None jika kosong"""
+    if not items:
+        return None
+    return re.compile("|".join(re.escape(item) for item in items), re.IGNORECASE)
+
+class DailySpend:
+    """Pengeluaran per hari dari seluruh transaksi, dibangun 1x per versi data
+
+    - total_all: total semua pengeluaran per hari (transfer antar dompet tidak dihitung)
+    - by_category: pengeluaran per hari x kategori, item yang dikecualikan tidak dihitung
+    - total: jumlah by_category per hari
+    - weekday: hari dalam minggu (0 = Senin) untuk tiap tanggal di index
+    Semua seri memakai index tanggal (jam 00:00) yang sama dan sudah urut.
+    """
+
+    def __init__(self, df, exclude_items=ANALISIS_EXCLUDE_ITEMS):
+        if df.empty:
+            expense = pd.DataFrame(columns=['ID', 'Tanggal', 'Item', 'Kategori', 'Nominal'])
+            expense['Tanggal'] = pd.to_datetime(expense['Tanggal'])
+        else:
+            expense = df.loc[(df['Tipe'] == 'Pengeluaran') & ~df[TRANSFER_MASK_COLUMN] & df['Tanggal'].notna(),
+                             ['ID', 'Tanggal', 'Item', 'Kategori', 'Nominal']]
+        day = expense['Tanggal'].dt.normalize()
+
+        pattern = compile_exclusion(tuple(exclude_items))
+        if pattern is None or expense.empty:
+            excluded = pd.Series(False, index=expense.index)
+        else:
+            excluded = expense['Item'].str.contains(pattern, na=False)
+
+        self.total_all = expense['Nominal'].groupby(day).sum().sort_index()
+        kept = expense.loc[~excluded].assign(Hari=day[~excluded])
+        self.by_category = kept.pivot_table(
+            index='Hari', columns='Kategori', values='Nominal', aggfunc='sum', fill_value=0
+        ).reindex(self.total_all.index, fill_value=0)
+        self.total = self.by_category.sum(axis=1)
+        self.weekday = self.total_all.index.dayofweek
+
+        # Untuk rincian baris: tanggal per ID transaksi tanpa item dikecualikan. Pakai ID, bukan
+        # index baris, karena seri bisa dibangun dari riwayat lengkap (arsip + hot)
+        self._row_day = pd.Series(day[~excluded].values, index=expense.loc[~excluded, 'ID'].values)
+
+    def _range(self, start_date, end_date):
+        index = self.total_all.index
+        lo = index.searchsorted(pd.Timestamp(start_date), side='left')
+        hi = index.searchsorted(pd.Timestamp(end_date), side='right')
+        return slice(lo, hi)
+
+    def dates(self, start_date, end_date):
+        """Tanggal yang ada pengeluarannya dalam rentang (binary search di index urut)"""
+        return self.total_all.index[self._range(start_date, end_date)]
+
+    def weekend_dates(self, start_date, end_date):
+        """Tanggal Sabtu/Minggu yang ada pengeluarannya dalam rentang"""
+        period = self._range(start_date, end_date)
+        return self.total_all.index[period][self.weekday[period] >= 5]
+
+    def total_between(self, start_date, end_date):
+        """Total semua pengeluaran dalam rentang (termasuk item dikecualikan)"""
+        return self.total_all.iloc[self._range(start_date, end_date)].sum()
+
+    def total_for(self, dates):
+        """Total pengeluaran (tanpa item dikecualikan) untuk sekumpulan tanggal"""
+        return self.total.reindex(pd.DatetimeIndex(dates), fill_value=0).sum()
+
+    def rows_for(self, df, dates):
+        """Baris df (dicocokkan lewat ID) untuk sekumpulan tanggal, tanpa item dikecualikan"""
+        row_ids = self._row_day.index[self._row_day.isin(pd.DatetimeIndex(dates))]
+        return df[df['ID'].isin(row_ids)]
+
+@timed('aggregate')
+def build_daily_spend(df, exclude_items=ANALISIS_EXCLUDE_ITEMS):
+    """Bangun DailySpend (panggil lewat Ledger.derived agar cuma 1x per versi data)"""
+    return DailySpend(df, exclude_items)
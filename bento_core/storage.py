@@ -0,0 +1,147 @@
+"""Storage backend untuk tabel ledger (Google Sheets atau in-memory)"""
+import random
+import time
+
+import pandas as pd
+
+from .metrics import payload_size
+from .profiling import span
+
+def retry_operation(func, max_retries=3, delay=2, on_retry=None, on_give_up=None):
+    """Retry operation jika ada connection error
+
+    on_retry(wait_time, attempt, max_retries) dan on_give_up(max_retries) opsional,
+    dipakai UI untuk menampilkan notifikasi.
+    """
+    for attempt in range(max_retries):
+        try:
+            return func()
+        except Exception as e:
+            error_msg = str(e).lower()
+            # Check jika error adalah connection issue
+            if any(keyword in error_msg for keyword in ['connection', 'timeout', 'remote', 'aborted']):
+                if attempt < max_retries - 1:
+                    wait_time = delay * (attempt + 1)  # Exponential backoff
+                    if on_retry:
+                        on_retry(wait_time, attempt + 2, max_retries)
+                    time.sleep(wait_time)
+                    continue
+                else:
+                    if on_give_up:
+                        on_give_up(max_retries)
+                    raise
+            else:
+                # Error lain, langsung raise
+                raise
+    return None
+
+class SheetStorage:
+    """Storage di atas koneksi streamlit-gsheets (atau objek lain dengan read/update yang sama)
+
+    metrics (opsional): StorageMetrics yang mencatat latency, retry, dan payload tiap panggilan.
+    """
+
+    def __init__(self, conn, on_retry=None, on_give_up=None, metrics=None):
+        self.conn = conn
+        self.on_retry = on_retry
+        self.on_give_up = on_give_up
+        self.metrics = metrics
+
+    def _observe(self, operation, worksheet, started, outcome, data=None, retries=0):
+        if self.metrics is None:
+            return
+        payload_bytes, rows = payload_size(data)
+        self.metrics.observe(operation, worksheet, time.perf_counter() - started, outcome,
+                             rows=rows, payload_bytes=payload_bytes, retries=retries)
+
+    def read(self, worksheet):
+        with span(f"read:{worksheet}", 'io') as info:
+            started = time.perf_counter()
+            try:
+                data = self.conn.read(worksheet=worksheet, ttl=0)
+            except Exception:
+                self._observe('read', worksheet, started, 'error')
+                raise
+            self._observe('read', worksheet, started, 'success', data)
+            info['rows'] = len(data)
+        return data
+
+    def update(self, worksheet, data, max_retries=3, delay=1):
+        def update_operation():
+            return self.conn.update(worksheet=worksheet, data=data)
+
+        retries = 0
+
+        def on_retry(wait_time, attempt, max_retries):
+            nonlocal retries
+            retries += 1
+            if self.on_retry:
+                self.on_retry(wait_time, attempt, max_retries)
+
+        with span(f"update:{worksheet}", 'io', rows=len(data)):
+            started = time.perf_counter()
+            try:
+                result = retry_operation(update_operation, max_retries=max_retries, delay=delay,
+                                         on_retry=on_retry, on_give_up=self.on_give_up)
+            except Exception:
+                self._observe('update', worksheet, started, 'error', data, retries)
+                raise
+            self._observe('update', worksheet, started, 'success', data, retries)
+            return result
+
+class MemoryStorage:
+    """Storage in-memory untuk batch job, benchmark, dan testing"""
+
+    def __init__(self, tables=None):
+        self.tables = {name: df.copy() for name, df in (tables or {}).items()}
+
+    def read(self, worksheet):
+        if worksheet not in self.tables:
+            raise KeyError(f"Worksheet '{worksheet}' tidak ditemukan")
+        return self.tables[worksheet].copy()
+
+    def update(self, worksheet, data, max_retries=3, delay=1):
+        self.tables[worksheet] = pd.DataFrame(data).copy()
+
+class FlakyStorage:
+    """Storage palsu untuk testing: bungkus storage lain dan suntikkan 429 / timeout secara acak
+
+    Setiap panggilan gagal dengan peluang error_rate (429) atau timeout_rate (timeout).
+    fail_next(n, kind) memaksa n panggilan berikutnya gagal, untuk skenario outage.
+    """
+
+    def __init__(self, inner, error_rate=0.0, timeout_rate=0.0, seed=None):
+        self.inner = inner
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.rng = random.Random(seed)
+        self.forced = []
+        self.calls = 0
+        self.failures = 0
+
+    def fail_next(self, n, kind='429'):
+        self.forced.extend([kind] * n)
+
+    def _maybe_fail(self, operation, worksheet):
+        self.calls += 1
+        kind = self.forced.pop(0) if self.forced else None
+        if kind is None:
+            roll = self.rng.random()
+            if roll < self.error_rate:
+                kind = '429'
+            elif roll < self.error_rate + self.timeout_rate:
+                kind = 'timeout'
+        if kind == '429':
+            self.failures += 1
+            raise Exception(f"APIError: [429]: Quota exceeded for {operation} {worksheet}")
+        if kind == 'timeout':
+            self.failures += 1
+            raise TimeoutError(f"Read timed out ({operation} {worksheet})")
+
+    def read(self, worksheet):
+        self._maybe_fail('read', worksheet)
+        return self.inner.read(worksheet)
+
+    def update(self, worksheet, data, max_retries=3, delay=1):
+        self._maybe_fail('update', worksheet)
+        return self.inner.update(worksheet, data)
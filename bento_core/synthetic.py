@@ -0,0 +1,145 @@
+"""Generator ledger sintetis (seeded) untuk benchmark & uji skala"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .config import KATEGORI_PEMASUKAN, KATEGORI_PENGELUARAN, KATEGORI_TRANSFER, METODE_PEMBAYARAN
+from .ledger import TARGET_COLUMNS, RECURRING_COLUMNS, WORKSHEETS
+
+# Contoh nama item per kategori, supaya search & deteksi duplikat realistis
+SYNTHETIC_ITEMS = {
+    "Gaji": ["Gaji Bulanan", "Gaji Freelance"],
+    "Bonus": ["Bonus Proyek", "THR"],
+    "Hadiah": ["Angpao", "Hadiah Ulang Tahun"],
+    "Pembayaran": ["Bayar Utang Teman", "Refund"],
+    "Penjualan": ["Jual Barang Bekas", "Jualan Online"],
+    "Makan": ["Nasi Padang", "Ayam Geprek", "Warteg", "Bakso", "Mie Ayam"],
+    "Jajan": ["Kopi Susu", "Boba", "Gorengan", "Martabak"],
+    "Belanja": ["Indomaret", "Alfamart", "Shopee", "Tokopedia"],
+    "Hiburan": ["Netflix", "Bioskop", "Spotify", "Game"],
+    "Transport": ["Gojek", "Grab", "Bensin", "KRL", "Parkir"],
+    "Kesehatan": ["Apotek", "Dokter", "Vitamin"],
+    "Tagihan": ["Listrik", "Internet", "Pulsa", "Bayar Kos"],
+    "Amal": ["Sedekah Jumat", "Donasi"],
+    "Saving": ["Nabung Darurat", "Nabung Impian"],
+    "Lainnya": ["Lain-lain", "Fotokopi"],
+}
+
+# Rata-rata nominal (Rp) per kategori, nominal di-sample lognormal di sekitar nilai ini
+SYNTHETIC_NOMINAL = {
+    "Gaji": 5_000_000, "Bonus": 1_500_000, "Hadiah": 300_000, "Pembayaran": 200_000, "Penjualan": 250_000,
+    "Makan": 25_000, "Jajan": 20_000, "Belanja": 150_000, "Hiburan": 75_000, "Transport": 30_000,
+    "Kesehatan": 100_000, "Tagihan": 400_000, "Amal": 50_000, "Saving": 500_000, "Lainnya": 50_000,
+}
+
+INCOME_SHARE = 0.12       # Porsi transaksi pemasukan
+TRANSFER_SHARE = 0.04     # Porsi baris top up antar dompet (selalu berpasangan)
+UNPAID_SHARE = 0.03       # Porsi pengeluaran yang masih 'Belum Lunas'
+
+def _sample_nominal(rng, kategori):
+    base = pd.Series(kategori).map(SYNTHETIC_NOMINAL).fillna(50_000).to_numpy(dtype=float)
+    nominal = base * rng.lognormal(mean=0.0, sigma=0.5, size=len(base))
+    return (np.round(nominal / 500) * 500).clip(min=500)
+
+def _sample_items(rng, kategori):
+    # Pilih index item per baris secara vectorized, per kategori
+    items = np.empty(len(kategori), dtype=object)
+    for kat in np.unique(kategori):
+        rows = np.flatnonzero(kategori == kat)
+        choices = np.array(SYNTHETIC_ITEMS.get(kat, [kat]), dtype=object)
+        items[rows] = choices[rng.integers(0, len(choices), len(rows))]
+    return items
+
+def generate_transactions(n_rows, seed=42, end_date=None, days=730):
+    """Transaksi sintetis dalam format sheet (Tanggal string, tanpa kolom Month/Year)
+
+    Berisi pemasukan, pengeluaran, pasangan top up antar dompet, dan utang 'Belum Lunas'.
+    """
+    rng = np.random.default_rng(seed)
+    end_date = pd.Timestamp(end_date or datetime.today()).normalize()
+
+    n_transfer_pairs = int(n_rows * TRANSFER_SHARE) // 2
+    n_regular = n_rows - n_transfer_pairs * 2
+
+    income_kats = [k for k in KATEGORI_PEMASUKAN if k != KATEGORI_TRANSFER]
+    expense_kats = [k for k in KATEGORI_PENGELUARAN if k != KATEGORI_TRANSFER]
+
+    is_income = rng.random(n_regular) < INCOME_SHARE
+    kategori = np.where(
+        is_income,
+        np.array(income_kats, dtype=object)[rng.integers(0, len(income_kats), n_regular)],
+        np.array(expense_kats, dtype=object)[rng.integers(0, len(expense_kats), n_regular)],
+    )
+    unpaid = ~is_income & (rng.random(n_regular) < UNPAID_SHARE)
+    metode = np.array(METODE_PEMBAYARAN, dtype=object)[rng.integers(0, len(METODE_PEMBAYARAN), n_regular)]
+    metode[unpaid] = "-"
+
+    regular = pd.DataFrame({
+        'Tanggal': end_date - pd.to_timedelta(rng.integers(0, days, n_regular), unit='D'),
+        'Item': _sample_items(rng, kategori),
+        'Kategori': kategori,
+        'Nominal': _sample_nominal(rng, kategori),
+        'Tipe': np.where(is_income, 'Pemasukan', 'Pengeluaran'),
+        'Status': np.where(unpaid, 'Belum Lunas', 'Lunas'),
+        'Keterangan': "",
+        'Metode Pembayaran': metode,
+    })
+
+    # Top up antar dompet: baris keluar + baris masuk dengan tanggal & nominal sama
+    wallets = np.array(METODE_PEMBAYARAN, dtype=object)
+    src_idx = rng.integers(0, len(wallets), n_transfer_pairs)
+    dst_idx = (src_idx + rng.integers(1, len(wallets), n_transfer_pairs)) % len(wallets)
+    src, dst = wallets[src_idx], wallets[dst_idx]
+    transfer_dates = end_date - pd.to_timedelta(rng.integers(0, days, n_transfer_pairs), unit='D')
+    transfer_nominal = (rng.integers(1, 100, n_transfer_pairs) * 10_000).astype(float)
+    keterangan = "Transfer antar dompet | Dari " + pd.Series(src) + " ke " + pd.Series(dst)
+    transfer_out = pd.DataFrame({
+        'Tanggal': transfer_dates, 'Item': "Top Up ke " + pd.Series(dst), 'Kategori': KATEGORI_TRANSFER,
+        'Nominal': transfer_nominal, 'Tipe': 'Pengeluaran', 'Status': 'Lunas',
+        'Keterangan': keterangan, 'Metode Pembayaran': src,
+    })
+    transfer_in = transfer_out.assign(
+        Item="Top Up dari " + pd.Series(src), Tipe='Pemasukan', **{'Metode Pembayaran': dst}
+    )
+
+    transaksi = pd.concat([regular, transfer_out, transfer_in], ignore_index=True)
+    transaksi = transaksi.sort_values('Tanggal', kind='stable').reset_index(drop=True)
+    transaksi['Tanggal'] = transaksi['Tanggal'].dt.strftime('%Y-%m-%d')
+    transaksi['ID'] = np.arange(1, len(transaksi) + 1)
+    return transaksi
+
+def generate_ledger(n_rows, seed=42, end_date=None, days=730):
+    """Semua tabel ledger sintetis, siap dipakai MemoryStorage(generate_ledger(...))"""
+    rng = np.random.default_rng(seed + 1)
+    end_date = pd.Timestamp(end_date or datetime.today()).normalize()
+    transaksi = generate_transactions(n_rows, seed=seed, end_date=end_date, days=days)
+
+    dompet = pd.DataFrame({
+        'Wallet': METODE_PEMBAYARAN,
+        'Saldo Awal': (rng.integers(1, 50, len(METODE_PEMBAYARAN)) * 100_000).astype(float),
+        'Tanggal Reset': (end_date - pd.Timedelta(days=days // 2)).strftime('%Y-%m-%d'),
+    })
+
+    target = pd.DataFrame([
+        ["Dana Darurat", 30_000_000, 12_500_000],
+        ["Laptop Baru", 15_000_000, 4_000_000],
+        ["Liburan", 8_000_000, 1_000_000],
+    ], columns=TARGET_COLUMNS)
+
+    recurring = pd.DataFrame([
+        ["Gaji Bulanan", "Gaji", 5_000_000, "Pemasukan", METODE_PEMBAYARAN[1], "Bulanan", "Aktif"],
+        ["Bayar Kos", "Tagihan", 1_200_000, "Pengeluaran", METODE_PEMBAYARAN[1], "Bulanan", "Aktif"],
+        ["Internet", "Tagihan", 350_000, "Pengeluaran", METODE_PEMBAYARAN[2], "Bulanan", "Aktif"],
+        ["Spotify", "Hiburan", 55_000, "Pengeluaran", METODE_PEMBAYARAN[3], "Bulanan", "Aktif"],
+        ["Zakat", "Amal", 500_000, "Pengeluaran", METODE_PEMBAYARAN[0], "Tahunan", "Nonaktif"],
+    ], columns=[c for c in RECURRING_COLUMNS if c != 'Tanggal Mulai'])
+    recurring.insert(RECURRING_COLUMNS.index('Tanggal Mulai'), 'Tanggal Mulai',
+                     (end_date - pd.Timedelta(days=days)).strftime('%Y-%m-%d'))
+
+    return {
+        WORKSHEETS['transaksi']: transaksi,
+        WORKSHEETS['dompet']: dompet,
+        WORKSHEETS['target']: target,
+        WORKSHEETS['recurring']: recurring,
+    }
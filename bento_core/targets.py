@@ -0,0 +1,96 @@
+"""Target Impian: progres dana dari transaksi tabungan yang di-tag ke target
+
+Transaksi (biasanya kategori 'Saving') bisa diberi nama target di kolom 'Target Impian'.
+Pengeluaran ke target = setoran (+), Pemasukan dari target = penarikan (-). TargetIndex
+menyimpan baris ber-tag (kecil dibanding ledger) + total per target, di-patch tiap commit
+transaksi. Progres & ETA semua target dihitung dalam 1 groupby, bukan per kartu.
+'Dana Terkumpul' di sheet Target tetap dipakai sebagai dana awal di luar transaksi.
+"""
+import numpy as np
+import pandas as pd
+
+from .profiling import timed
+
+TARGET_LINK_COLUMN = 'Target Impian'
+TARGET_ROW_COLUMNS = ['ID', 'Tanggal', 'Target', 'signed']
+TARGET_RATE_DAYS = 90  # Laju menabung = rata-rata setoran bersih N hari terakhir
+DAYS_PER_MONTH = 30.4375
+
+def mark_targets(df):
+    """Pastikan kolom Target Impian ada (string, kosong = tidak di-tag)"""
+    if TARGET_LINK_COLUMN not in df.columns:
+        df[TARGET_LINK_COLUMN] = ""
+    df[TARGET_LINK_COLUMN] = df[TARGET_LINK_COLUMN].fillna("").astype(str).str.strip()
+    return df
+
+def _target_rows(df):
+    """Baris ber-tag target + nominal bertanda (+setoran / -penarikan)"""
+    if df.empty or TARGET_LINK_COLUMN not in df.columns:
+        return pd.DataFrame(columns=TARGET_ROW_COLUMNS)
+    rows = df.loc[(df[TARGET_LINK_COLUMN] != "") & df['Tipe'].isin(['Pemasukan', 'Pengeluaran']),
+                  ['ID', 'Tanggal', TARGET_LINK_COLUMN, 'Tipe', 'Nominal']]
+    nominal = pd.to_numeric(rows['Nominal'], errors='coerce').fillna(0).astype(float)
+    return pd.DataFrame({
+        'ID': rows['ID'],
+        'Tanggal': rows['Tanggal'],
+        'Target': rows[TARGET_LINK_COLUMN],
+        'signed': nominal.where(rows['Tipe'] == 'Pengeluaran', -nominal),
+    })
+
+class TargetIndex:
+    """Baris ber-tag (index ID) + total dana per target, di-patch tiap commit transaksi"""
+
+    def __init__(self, df):
+        self.rows = _target_rows(df).set_index('ID')
+        self.totals = self.rows.groupby('Target')['signed'].sum()
+
+    def __len__(self):
+        return len(self.rows)
+
+    @timed('aggregate')
+    def patch(self, before, after):
+        """Terapkan baris yang berubah di 1 commit (versi lama -> versi baru), total disesuaikan selisihnya"""
+        removed = _target_rows(before)
+        added = _target_rows(after).set_index('ID')
+        if removed.empty and added.empty:
+            return
+        rows = self.rows.drop(index=removed['ID'], errors='ignore')
+        self.rows = pd.concat([rows.drop(index=added.index, errors='ignore'), added])
+
+        delta = added.groupby('Target')['signed'].sum().sub(removed.groupby('Target')['signed'].sum(), fill_value=0)
+        totals = self.totals.add(delta, fill_value=0)
+        # Target yang tidak punya baris ber-tag lagi dibuang dari total
+        self.totals = totals[totals.index.isin(self.rows['Target'])]
+
+    @timed('aggregate')
+    def progress(self, target_df, today=None, rate_days=TARGET_RATE_DAYS):
+        """Progres semua target dalam 1 pass: Dana Awal, Dari Transaksi, Terkumpul, Sisa,
+        Progress (%), Tabungan / Bulan (laju rate_days terakhir), dan ETA (NaT jika laju <= 0)
+        """
+        today = pd.Timestamp(today if today is not None else pd.Timestamp.today()).normalize()
+        recent = self.rows[self.rows['Tanggal'] > today - pd.Timedelta(days=rate_days)]
+        daily_rate = recent.groupby('Target')['signed'].sum() / rate_days
+
+        names = target_df['Nama Impian'].fillna("").astype(str).str.strip()
+        goal = pd.to_numeric(target_df['Target Harga'], errors='coerce').fillna(0).astype(float)
+        table = pd.DataFrame({
+            'Nama Impian': names,
+            'Target Harga': goal,
+            'Dana Awal': pd.to_numeric(target_df['Dana Terkumpul'], errors='coerce').fillna(0).astype(float),
+            'Dari Transaksi': names.map(self.totals).fillna(0.0).astype(float),
+        }, index=target_df.index)
+        table['Terkumpul'] = table['Dana Awal'] + table['Dari Transaksi']
+        table['Sisa'] = (goal - table['Terkumpul']).clip(lower=0)
+        table['Progress (%)'] = np.where(goal > 0, (table['Terkumpul'] / goal.where(goal > 0) * 100).clip(0, 100), 0.0)
+
+        rate = names.map(daily_rate).fillna(0.0).astype(float)
+        table['Tabungan / Bulan'] = rate * DAYS_PER_MONTH
+        days_left = np.ceil(table['Sisa'] / rate.where(rate > 0))
+        eta = today + pd.to_timedelta(days_left, unit='D')
+        table['ETA'] = eta.where(table['Sisa'] > 0, today)
+        return table
+
+    def untracked(self, target_df):
+        """Nama target di transaksi yang tidak ada (lagi) di sheet Target, mis. karena di-rename"""
+        names = set(target_df['Nama Impian'].fillna("").astype(str).str.strip())
+        return sorted(t for t in self.totals.index if t not in names)
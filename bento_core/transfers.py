@@ -0,0 +1,104 @@
+"""Pasangan transfer antar wallet: Transfer ID bersama, mask transfer, dan sinkron kaki pasangan
+
+Top up dicatat sebagai 2 baris Transfer Internal (Pengeluaran di sumber, Pemasukan di
+tujuan). Keduanya berbagi 'Transfer ID' agar edit / hapus satu kaki ikut diterapkan ke
+pasangannya. Kolom bantu 'Is Transfer' dihitung sekali saat load / commit, jadi agregat
+pemasukan / pengeluaran cukup memakai mask boolean, tanpa membandingkan string kategori lagi.
+"""
+import pandas as pd
+
+from .config import KATEGORI_TRANSFER
+from .profiling import timed
+
+TRANSFER_ID_COLUMN = 'Transfer ID'
+TRANSFER_MASK_COLUMN = 'Is Transfer'  # Kolom bantu (tidak ditulis ke sheet)
+TRANSFER_SYNC_COLUMNS = ['Tanggal', 'Nominal', 'Status']  # Disamakan ke kaki pasangan saat diedit
+
+def transfer_id_for(first_id):
+    """Transfer ID dari ID kaki pertama (unik karena ID transaksi unik)"""
+    return f"TRF-{int(first_id)}"
+
+def mark_transfers(df):
+    """Isi kolom Transfer ID (string, kosong = bukan pasangan) + mask 'Is Transfer'"""
+    if TRANSFER_ID_COLUMN not in df.columns:
+        df[TRANSFER_ID_COLUMN] = ""
+    df[TRANSFER_ID_COLUMN] = df[TRANSFER_ID_COLUMN].fillna("").astype(str)
+    df[TRANSFER_MASK_COLUMN] = (df['Kategori'] == KATEGORI_TRANSFER).to_numpy()
+    return df
+
+@timed('aggregate')
+def link_transfer_pairs(df):
+    """Beri Transfer ID ke pasangan transfer lama yang belum punya
+
+    Kedua kaki dari top up punya Tanggal, Nominal, dan Keterangan yang sama; kaki ke-n
+    Pengeluaran dipasangkan dengan kaki ke-n Pemasukan. Kaki tanpa pasangan dibiarkan kosong.
+    """
+    unlinked = df.loc[df[TRANSFER_MASK_COLUMN] & (df[TRANSFER_ID_COLUMN] == ""), ['ID', 'Tanggal', 'Nominal', 'Keterangan', 'Tipe']]
+    if unlinked.empty:
+        return df
+    keys = ['Tanggal', 'Nominal', 'Keterangan']
+    legs = unlinked.assign(
+        Keterangan=unlinked['Keterangan'].fillna(""),
+        _leg=unlinked.groupby(keys + ['Tipe'], dropna=False).cumcount(),
+    )
+    out_legs = legs.loc[legs['Tipe'] == 'Pengeluaran', keys + ['_leg', 'ID']]
+    in_legs = legs.loc[legs['Tipe'] == 'Pemasukan', keys + ['_leg', 'ID']]
+    pairs = out_legs.merge(in_legs, on=keys + ['_leg'], suffixes=('_out', '_in'))
+    if pairs.empty:
+        return df
+    pair_ids = [transfer_id_for(first) for first in pairs[['ID_out', 'ID_in']].min(axis=1)]
+    assigned = pd.Series(pair_ids * 2, index=pd.concat([pairs['ID_out'], pairs['ID_in']], ignore_index=True))
+    linked = df['ID'].map(assigned)
+    df[TRANSFER_ID_COLUMN] = linked.fillna(df[TRANSFER_ID_COLUMN])
+    return df
+
+def with_transfer_partners(df, ids):
+    """ids + ID kaki pasangan transfernya (ikut diedit / dihapus oleh sync_transfer_partners)"""
+    ids = set(ids)
+    links = df.loc[df['ID'].isin(list(ids)), TRANSFER_ID_COLUMN]
+    links = links[links != ""]
+    if links.empty:
+        return ids
+    return ids | set(df.loc[df[TRANSFER_ID_COLUMN].isin(links), 'ID'])
+
+@timed('aggregate')
+def sync_transfer_partners(old_df, new_df):
+    """Terapkan edit / hapus 1 kaki transfer ke pasangannya (dipanggil sebelum 1x write)
+
+    - Kaki yang hilang: pasangannya ikut dihapus
+    - Tanggal / Nominal / Status berubah di 1 kaki saja: disalin ke kaki pasangannya
+    """
+    if old_df.empty or new_df.empty or TRANSFER_ID_COLUMN not in new_df.columns:
+        return new_df
+    cols = ['ID', TRANSFER_ID_COLUMN] + TRANSFER_SYNC_COLUMNS
+    old_legs = old_df.loc[old_df[TRANSFER_ID_COLUMN] != "", cols]
+    if old_legs.empty:
+        return new_df
+    new_legs = new_df.loc[new_df['ID'].isin(old_legs['ID']), cols]
+
+    # Hapus: transfer yang kehilangan salah satu kaki
+    surviving = new_legs.groupby(TRANSFER_ID_COLUMN)['ID'].size()
+    original = old_legs.groupby(TRANSFER_ID_COLUMN)['ID'].size()
+    broken = surviving.index[surviving < original.reindex(surviving.index)]
+    if len(broken):
+        new_df = new_df[~(new_df['ID'].isin(old_legs['ID']) & new_df[TRANSFER_ID_COLUMN].isin(broken))]
+        new_legs = new_legs[~new_legs[TRANSFER_ID_COLUMN].isin(broken)]
+
+    # Edit: kaki yang berubah jadi sumber nilai untuk kaki pasangannya
+    compared = new_legs.merge(old_legs, on=['ID', TRANSFER_ID_COLUMN], suffixes=('', '_old'))
+    changed = pd.Series(False, index=compared.index)
+    for col in TRANSFER_SYNC_COLUMNS:
+        changed |= compared[col].ne(compared[f'{col}_old']) & ~(compared[col].isna() & compared[f'{col}_old'].isna())
+    edited = compared[changed]
+    # Kalau kedua kaki diedit bersamaan, user sudah menentukan keduanya: tidak disinkronkan
+    edited = edited[edited.groupby(TRANSFER_ID_COLUMN)['ID'].transform('size') == 1]
+    if edited.empty:
+        return new_df
+
+    source = edited.set_index(TRANSFER_ID_COLUMN)[TRANSFER_SYNC_COLUMNS]
+    partner = (new_df[TRANSFER_ID_COLUMN].isin(source.index) & ~new_df['ID'].isin(edited['ID'])
+               & new_df['ID'].isin(old_legs['ID']))
+    new_df = new_df.copy()
+    for col in TRANSFER_SYNC_COLUMNS:
+        new_df.loc[partner, col] = new_df.loc[partner, TRANSFER_ID_COLUMN].map(source[col])
+    return new_df
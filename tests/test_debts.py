@@ -0,0 +1,86 @@
+"""Regresi utang: cicilan sebagai pasangan transfer, DebtIndex hasil patch = dibangun ulang"""
+import numpy as np
+import pandas as pd
+
+from bento_core import DEBT_ACCOUNT, DEBT_ID_COLUMN, DebtIndex, Ledger, MemoryStorage, apply_debt_payments, OP_KEY_COLUMN
+from bento_core.synthetic import generate_ledger
+
+DEBT_ROW = {
+    "Tanggal": "2024-03-01", "Item": "Pinjam teman", "Kategori": "Lainnya", "Nominal": 300,
+    "Tipe": "Pengeluaran", "Status": "Belum Lunas", "Keterangan": "", "Metode Pembayaran": DEBT_ACCOUNT,
+}
+
+def make_ledger_with_debt():
+    tables = generate_ledger(200, seed=11, end_date="2026-01-31")
+    df = tables["Transaksi"]
+    # Hanya utang buatan test yang belum lunas / memakai akun utang
+    df.loc[df['Status'] != "Lunas", 'Metode Pembayaran'] = "Cash"
+    df['Status'] = "Lunas"
+    ledger = Ledger(MemoryStorage(tables))
+    ledger.debts()  # Bangun index dulu, supaya commit berikutnya lewat patch
+    ok, _ = ledger.add_transaction(DEBT_ROW)
+    assert ok
+    debt_id = int(ledger.table('transaksi')['ID'].max())
+    return ledger, debt_id
+
+def pay(ledger, debt_id, amount, date="2024-04-01"):
+    payments = pd.DataFrame({'ID': [debt_id], 'Item': [DEBT_ROW['Item']], 'Metode Pembayaran': ['Cash'], 'Bayar': [amount]})
+    return ledger.pay_debts(payments, date)
+
+def assert_index_matches_rebuild(ledger):
+    patched, fresh = ledger.debts(), DebtIndex(ledger.table('transaksi'))
+    pd.testing.assert_series_equal(patched.remaining().sort_index(), fresh.remaining().sort_index())
+    pd.testing.assert_frame_equal(patched.installments.sort_index(), fresh.installments.sort_index(), check_dtype=False)
+    assert np.isclose(patched.total, fresh.total)
+
+def debt_account_net(ledger):
+    df = ledger.table('transaksi')
+    rows = df[df['Metode Pembayaran'] == DEBT_ACCOUNT]
+    return rows['Nominal'].where(rows['Tipe'] == 'Pemasukan', -rows['Nominal']).sum()
+
+def test_partial_then_full_payment():
+    ledger, debt_id = make_ledger_with_debt()
+    assert ledger.debts().table().set_index('ID').loc[debt_id, 'Sisa'] == 300
+
+    ok, _, summary, _ = pay(ledger, debt_id, 100)
+    assert ok and summary == {'Cash': 100.0}
+    table = ledger.debts().table().set_index('ID')
+    assert table.loc[debt_id, 'Sisa'] == 200 and table.loc[debt_id, 'Total Awal'] == 300
+    assert_index_matches_rebuild(ledger)
+
+    ok, _, summary, _ = pay(ledger, debt_id, np.nan, "2024-05-01")
+    assert ok and summary == {'Cash': 200.0}
+    assert len(ledger.debts()) == 0
+    assert debt_account_net(ledger) == 0
+    # Nominal utang asal tidak pernah diubah
+    assert ledger.table('transaksi').set_index('ID').loc[debt_id, 'Nominal'] == 300
+    assert_index_matches_rebuild(ledger)
+
+def test_non_positive_payment_is_rejected():
+    ledger, debt_id = make_ledger_with_debt()
+    rows = len(ledger.table('transaksi'))
+    for amount in (-100, 0):
+        ok, message, summary, _ = pay(ledger, debt_id, amount)
+        assert not ok and "lebih dari 0" in message and summary == {}
+    assert len(ledger.table('transaksi')) == rows
+    assert ledger.debts().remaining()[debt_id] == 300
+
+    df = ledger.table('transaksi')
+    payments = pd.DataFrame({'ID': [debt_id], 'Metode Pembayaran': ['Cash'], 'Bayar': [-100]})
+    try:
+        apply_debt_payments(df, payments, "2024-04-01", int(df['ID'].max()) + 1, "op", OP_KEY_COLUMN)
+        raise AssertionError("Bayar <= 0 harus ditolak")
+    except ValueError:
+        pass
+
+def test_archive_keeps_installments_of_open_debts():
+    ledger, debt_id = make_ledger_with_debt()
+    pay(ledger, debt_id, 100)
+    ok, _ = ledger.archive_before("2025-06-01")
+    assert ok
+
+    hot = ledger.table('transaksi')
+    assert debt_id in set(hot['ID'])
+    assert (hot[DEBT_ID_COLUMN] != "").sum() == 2  # Kedua kaki cicilan tetap di tabel hot
+    assert ledger.debts().remaining()[debt_id] == 200
+    assert_index_matches_rebuild(ledger)
@@ -0,0 +1,110 @@
+"""Regresi mode baca saja: write tidak boleh menimpa sheet saat tabel gagal / belum ter-load"""
+import pandas as pd
+
+from bento_core import (
+    BackendUnavailable, CircuitBreaker, FlakyStorage, Ledger, MemoryStorage, ResilientStorage, StorageMetrics,
+    TokenBucket,
+)
+from bento_core.synthetic import generate_ledger
+
+NEW_ROW = {
+    "Tanggal": "2026-01-15", "Item": "Kopi", "Kategori": "Jajan", "Nominal": 25_000,
+    "Tipe": "Pengeluaran", "Status": "Lunas", "Keterangan": "", "Metode Pembayaran": "Cash",
+}
+
+def make_ledger(n_rows=200):
+    tables = generate_ledger(n_rows, seed=7, end_date="2026-01-31")
+    memory = MemoryStorage(tables)
+    flaky = FlakyStorage(memory)
+    sleeps = []
+    storage = ResilientStorage(flaky, limiter=TokenBucket(rate_per_minute=6000, burst=1000),
+                               breaker=CircuitBreaker(failure_threshold=3, reset_timeout=30.0),
+                               sleep=sleeps.append)
+    return Ledger(storage), memory, flaky, sleeps
+
+def test_failed_first_load_refuses_writes_and_keeps_sheet():
+    ledger, memory, flaky, _ = make_ledger()
+    original_rows = len(memory.tables["Transaksi"])
+
+    flaky.fail_next(1, 'timeout')
+    assert ledger.table('transaksi').empty
+    assert not ledger.writable('transaksi')
+
+    # Backend masih down: write ditolak, tidak ada snapshot 1 baris yang diantrikan
+    flaky.fail_next(1, 'timeout')
+    ok, message = ledger.add_transaction(NEW_ROW)
+    assert not ok and "Mode baca saja" in message
+    assert not ledger.storage.pending
+    assert len(memory.tables["Transaksi"]) == original_rows
+
+    # Backend pulih: tabel di-load ulang utuh sebelum transaksi baru ditambahkan
+    ok, _ = ledger.add_transaction(NEW_ROW)
+    assert ok
+    assert ledger.storage.flush(timeout=5)
+    assert len(memory.tables["Transaksi"]) == original_rows + 1
+
+def test_open_breaker_refuses_writes_to_loaded_tables():
+    ledger, memory, flaky, _ = make_ledger()
+    ledger.table('transaksi')
+    ledger.table('checkpoint')
+    original = memory.tables["Transaksi"].copy()
+
+    flaky.fail_next(3, 'timeout')
+    for _ in range(3):
+        try:
+            ledger.storage.read("Dompet")
+        except BackendUnavailable:
+            pass
+    assert ledger.storage.read_only
+
+    ok, message = ledger.add_transaction(NEW_ROW)
+    assert not ok and "Mode baca saja" in message
+    ok, _ = ledger.archive_before("2025-06-01")
+    assert not ok
+    try:
+        ledger.save_table('target', pd.DataFrame(columns=['Nama Impian', 'Target Harga', 'Dana Terkumpul']))
+        raise AssertionError("save_table harus ditolak saat breaker open")
+    except BackendUnavailable:
+        pass
+    assert not ledger.storage.pending
+    pd.testing.assert_frame_equal(memory.tables["Transaksi"], original)
+
+def test_read_without_token_serves_cache_instead_of_sleeping():
+    memory = MemoryStorage(generate_ledger(50, seed=3, end_date="2026-01-31"))
+    sleeps = []
+    storage = ResilientStorage(memory, limiter=TokenBucket(rate_per_minute=1, burst=1), sleep=sleeps.append)
+    ledger = Ledger(storage)
+    assert len(ledger.table('transaksi')) > 0
+
+    ledger.invalidate()
+    cached = ledger.table('transaksi')  # Token habis: cache lama dipakai, tabel ditandai stale
+    assert len(cached) > 0
+    assert sleeps == []
+    assert 'transaksi' in ledger.stale and not ledger.writable('transaksi')
+
+def test_metrics_record_write_outcomes_attempts_and_rejections():
+    metrics = StorageMetrics()
+    memory = MemoryStorage(generate_ledger(50, seed=5, end_date="2026-01-31"))
+    flaky = FlakyStorage(memory)
+    storage = ResilientStorage(flaky, limiter=TokenBucket(rate_per_minute=6000, burst=1000),
+                               breaker=CircuitBreaker(failure_threshold=5, reset_timeout=30.0),
+                               sleep=lambda seconds: None, metrics=metrics)
+    df = memory.tables["Transaksi"]
+
+    assert storage.update("Transaksi", df) == 'saved'
+    flaky.fail_next(3, 'timeout')  # 1 percobaan di thread pemanggil + 2 di background
+    assert storage.update("Transaksi", df) == 'queued'
+    assert storage.flush(timeout=5)
+
+    assert metrics.writes[("Transaksi", 'saved')] == 2
+    assert metrics.writes[("Transaksi", 'queued')] == 1
+    assert metrics.write_attempts["Transaksi"].sum == 1 + 4
+    assert metrics.retries[('update', "Transaksi")] == 3
+
+    storage.breaker.state, storage.breaker.opened_at = 'open', storage.breaker.clock()
+    try:
+        storage.read("Dompet")
+    except BackendUnavailable:
+        pass
+    assert metrics.rejections[('read', "Dompet", 'breaker_open')] == 1
+    assert 'bento_storage_rejections_total{operation="read",worksheet="Dompet",reason="breaker_open"} 1' in metrics.render()
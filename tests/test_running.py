@@ -0,0 +1,59 @@
+"""Regresi saldo berjalan: hasil patch per commit harus sama dengan dibangun ulang"""
+import numpy as np
+
+from bento_core import Ledger, MemoryStorage
+from bento_core.synthetic import generate_ledger
+
+NEW_ROW = {
+    "Tanggal": "2025-03-15", "Item": "Makan siang", "Kategori": "Makan", "Nominal": 45_000,
+    "Tipe": "Pengeluaran", "Status": "Lunas", "Keterangan": "", "Metode Pembayaran": "Cash",
+}
+EDITOR_COLUMNS = ['ID', 'Tanggal', 'Item', 'Kategori', 'Nominal', 'Tipe', 'Status', 'Keterangan', 'Metode Pembayaran']
+
+def assert_matches_rebuild(ledger, memory, running):
+    # Patch, bukan bangun ulang: objek yang sama tetap dipakai
+    assert ledger.running_balance() is running
+    fresh = Ledger(memory).running_balance()
+    np.testing.assert_array_equal(running.ids, fresh.ids)
+    np.testing.assert_array_equal(running.dates, fresh.dates)
+    np.testing.assert_array_equal(running.wallets, fresh.wallets)
+    np.testing.assert_allclose(running.cum, fresh.cum)
+    for wallet in ["Cash", "DANA", "-"]:
+        np.testing.assert_allclose(running.balance_series(["2025-01-31", "2026-01-31"], wallet),
+                                   fresh.balance_series(["2025-01-31", "2026-01-31"], wallet))
+
+def test_patched_running_balance_matches_rebuild():
+    memory = MemoryStorage(generate_ledger(500, seed=19, end_date="2026-01-31"))
+    ledger = Ledger(memory)
+    running = ledger.running_balance()
+
+    ok, _ = ledger.add_transaction(NEW_ROW)
+    assert ok
+    assert_matches_rebuild(ledger, memory, running)
+
+    # Edit: geser tanggal ke belakang + ganti wallet & nominal (posisi urut berubah)
+    df = ledger.table('transaksi')
+    ids = df['ID'].iloc[[10, 200, -1]].tolist()
+    edited = df.loc[df['ID'].isin(ids), EDITOR_COLUMNS].reset_index(drop=True)
+    edited.loc[0, 'Tanggal'] = edited['Tanggal'].max()
+    edited.loc[1, 'Metode Pembayaran'] = "DANA"
+    edited.loc[2, 'Nominal'] = 99_000
+    ok, _ = ledger.update_transactions_by_id(ids, edited)
+    assert ok
+    assert_matches_rebuild(ledger, memory, running)
+
+    # Hapus
+    df = ledger.table('transaksi')
+    ids = df['ID'].iloc[[5, 50]].tolist()
+    ok, _ = ledger.update_transactions_by_id(ids, df.loc[df['ID'].isin(ids), EDITOR_COLUMNS].iloc[:0])
+    assert ok
+    assert_matches_rebuild(ledger, memory, running)
+
+    # Transfer, lalu hapus 1 kakinya (pasangannya ikut terhapus)
+    ok, _ = ledger.add_internal_transfer("2025-06-01", 150_000, "Cash", "DANA")
+    assert ok
+    assert_matches_rebuild(ledger, memory, running)
+    out_id = int(ledger.table('transaksi')['ID'].max()) - 1
+    ok, _ = ledger.update_transactions_by_id([out_id], ledger.table('transaksi')[EDITOR_COLUMNS].iloc[:0])
+    assert ok
+    assert_matches_rebuild(ledger, memory, running)
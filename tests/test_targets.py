@@ -0,0 +1,56 @@
+"""Regresi Target Impian: progres & ETA hasil patch per commit harus sama dengan dibangun ulang"""
+import pandas as pd
+
+from bento_core import TARGET_LINK_COLUMN, Ledger, MemoryStorage, TargetIndex
+from bento_core.synthetic import generate_ledger
+
+TODAY = "2026-01-31"
+EDITOR_COLUMNS = ['ID', 'Tanggal', 'Item', 'Kategori', 'Nominal', 'Tipe', 'Status', 'Keterangan',
+                  'Metode Pembayaran', TARGET_LINK_COLUMN]
+
+def saving(date, nominal, target="Laptop Baru"):
+    return {
+        "Tanggal": date, "Item": "Nabung", "Kategori": "Saving", "Nominal": nominal, "Tipe": "Pengeluaran",
+        "Status": "Lunas", "Keterangan": "", "Metode Pembayaran": "Cash", TARGET_LINK_COLUMN: target,
+    }
+
+def assert_matches_rebuild(ledger):
+    target_df = ledger.table('target')
+    patched = ledger.target_progress(TODAY)
+    fresh = TargetIndex(ledger.table('transaksi')).progress(target_df, TODAY)
+    pd.testing.assert_frame_equal(patched, fresh)
+    return patched.set_index('Nama Impian')
+
+def edit(ledger, row_id, **changes):
+    df = ledger.table('transaksi')
+    page = df.loc[df['ID'] == row_id, EDITOR_COLUMNS].reset_index(drop=True)
+    for col, value in changes.items():
+        page.loc[0, col] = value
+    ok, _ = ledger.update_transactions_by_id([row_id], page)
+    assert ok
+
+def test_tagging_untagging_and_editing_update_progress():
+    ledger = Ledger(MemoryStorage(generate_ledger(300, seed=23, end_date=TODAY)))
+    ledger.targets()  # Bangun index dulu, supaya commit berikutnya lewat patch
+    start = assert_matches_rebuild(ledger).loc["Laptop Baru"]
+
+    ok, _ = ledger.add_transaction(saving("2026-01-10", 1_000_000))
+    assert ok
+    row_id = int(ledger.table('transaksi')['ID'].max())
+    progress = assert_matches_rebuild(ledger).loc["Laptop Baru"]
+    assert progress['Terkumpul'] == start['Terkumpul'] + 1_000_000
+    assert progress['Tabungan / Bulan'] > 0 and pd.notna(progress['ETA'])
+
+    # Edit nominal + pindah target
+    edit(ledger, row_id, Nominal=2_000_000)
+    assert assert_matches_rebuild(ledger).loc["Laptop Baru", 'Terkumpul'] == start['Terkumpul'] + 2_000_000
+    edit(ledger, row_id, **{TARGET_LINK_COLUMN: "Liburan"})
+    progress = assert_matches_rebuild(ledger)
+    assert progress.loc["Laptop Baru", 'Terkumpul'] == start['Terkumpul']
+    assert progress.loc["Liburan", 'Dari Transaksi'] == 2_000_000
+
+    # Lepas tag: kembali seperti semula, tanpa laju menabung
+    edit(ledger, row_id, **{TARGET_LINK_COLUMN: ""})
+    progress = assert_matches_rebuild(ledger)
+    assert progress.loc["Liburan", 'Dari Transaksi'] == 0
+    assert progress.loc["Liburan", 'Tabungan / Bulan'] == 0 and pd.isna(progress.loc["Liburan", 'ETA'])
@@ -0,0 +1,78 @@
+"""Regresi pasangan transfer: edit / hapus 1 kaki ikut diterapkan ke pasangannya"""
+import pandas as pd
+
+from bento_core import KATEGORI_TRANSFER, TRANSFER_ID_COLUMN, Ledger, MemoryStorage
+from bento_core.synthetic import generate_ledger
+
+EDITOR_COLUMNS = ['ID', 'Tanggal', 'Item', 'Kategori', 'Nominal', 'Tipe', 'Status', 'Keterangan', 'Metode Pembayaran']
+
+def make_ledger_with_transfer():
+    ledger = Ledger(MemoryStorage(generate_ledger(200, seed=13, end_date="2026-01-31")))
+    ok, _ = ledger.add_internal_transfer("2026-01-10", 200, "Cash", "DANA", note="Isi saldo")
+    assert ok
+    df = ledger.table('transaksi')
+    legs = df[df[TRANSFER_ID_COLUMN] == df[TRANSFER_ID_COLUMN].iloc[-1]]
+    assert len(legs) == 2
+    return ledger, legs['ID'].tolist()
+
+def page(ledger, ids):
+    df = ledger.table('transaksi')
+    return df.loc[df['ID'].isin(ids), EDITOR_COLUMNS].reset_index(drop=True)
+
+def rows_by_id(ledger, ids):
+    df = ledger.table('transaksi')
+    return df[df['ID'].isin(ids)].set_index('ID')
+
+def test_editing_one_leg_syncs_partner():
+    ledger, (out_id, in_id) = make_ledger_with_transfer()
+    edited = page(ledger, [out_id, in_id])
+    edited.loc[edited['ID'] == out_id, 'Nominal'] = 250
+    edited.loc[edited['ID'] == out_id, 'Tanggal'] = pd.Timestamp("2026-01-12")
+
+    ok, _ = ledger.update_transactions_by_id([out_id, in_id], edited)
+    assert ok
+    rows = rows_by_id(ledger, [out_id, in_id])
+    assert rows['Nominal'].tolist() == [250, 250]
+    assert (rows['Tanggal'] == pd.Timestamp("2026-01-12")).all()
+
+def test_editing_both_legs_keeps_user_values():
+    ledger, (out_id, in_id) = make_ledger_with_transfer()
+    edited = page(ledger, [out_id, in_id])
+    edited.loc[edited['ID'] == out_id, 'Nominal'] = 250
+    edited.loc[edited['ID'] == in_id, 'Nominal'] = 240  # mis. ada biaya admin
+
+    ok, _ = ledger.update_transactions_by_id([out_id, in_id], edited)
+    assert ok
+    rows = rows_by_id(ledger, [out_id, in_id])
+    assert rows.loc[out_id, 'Nominal'] == 250 and rows.loc[in_id, 'Nominal'] == 240
+
+def test_deleting_one_leg_removes_partner():
+    ledger, (out_id, in_id) = make_ledger_with_transfer()
+    rows_before = len(ledger.table('transaksi'))
+    edited = page(ledger, [out_id, in_id])
+    edited = edited[edited['ID'] != out_id]
+
+    ok, _ = ledger.update_transactions_by_id([out_id, in_id], edited)
+    assert ok
+    df = ledger.table('transaksi')
+    assert len(df) == rows_before - 2
+    assert not df['ID'].isin([out_id, in_id]).any()
+
+def test_legacy_transfer_rows_are_linked_on_load():
+    tables = generate_ledger(50, seed=17, end_date="2026-01-31")
+    df = tables["Transaksi"]
+    next_id = int(df['ID'].max()) + 1
+    legacy = pd.DataFrame([
+        {"Tanggal": "2026-01-05", "Item": "Top Up ke DANA", "Tipe": "Pengeluaran", "Metode Pembayaran": "Cash",
+         "Keterangan": "Dari Cash ke DANA"},
+        {"Tanggal": "2026-01-05", "Item": "Top Up dari Cash", "Tipe": "Pemasukan", "Metode Pembayaran": "DANA",
+         "Keterangan": "Dari Cash ke DANA"},
+        # Kaki tanpa pasangan (Keterangan beda): dibiarkan tanpa Transfer ID
+        {"Tanggal": "2026-01-05", "Item": "Top Up dari BCA", "Tipe": "Pemasukan", "Metode Pembayaran": "DANA",
+         "Keterangan": "Dari BCA ke DANA"},
+    ]).assign(Kategori=KATEGORI_TRANSFER, Nominal=100_000, Status="Lunas", ID=range(next_id, next_id + 3))
+    tables["Transaksi"] = pd.concat([df, legacy], ignore_index=True)
+
+    linked = Ledger(MemoryStorage(tables)).table('transaksi').set_index('ID')[TRANSFER_ID_COLUMN]
+    assert linked[next_id] == linked[next_id + 1] != ""
+    assert linked[next_id + 2] == ""